@@ -1,9 +1,9 @@
 import sys
 import os
 import threading
-import random
 import time
 import json
+from rng import SessionRNG, get_rng, use_rng
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QTextEdit, QLineEdit, QPushButton, QLabel)
 from PySide6.QtGui import QFont, QTextCursor, QColor
@@ -51,7 +51,7 @@ class Colors:
     GRAY = "#95a5a6"
 
 def roll_dice(sides, modifier=0):
-    return random.randint(1, sides) + modifier
+    return get_rng().roll(sides, modifier)
 
 def load_data():
     monsters = {
@@ -70,30 +70,30 @@ def load_data():
     }
     return monsters
 
+# โบนัส (max_hp, base_damage) ตามเผ่า ถ้าเผ่าไม่มีโบนัสจึงดูตามอาชีพ
+RACE_BONUS = {"orc": (10, 2)}
+CLASS_BONUS = {"warrior": (5, 2)}
+
 class Character:
+    __slots__ = (
+        "name", "race", "char_class", "max_hp", "hp", "base_damage", "armor",
+        "gold", "exp", "level", "inventory", "status_effects",
+    )
+
     def __init__(self, name, race, char_class):
+        bonus_hp, bonus_damage = RACE_BONUS.get(race) or CLASS_BONUS.get(char_class, (0, 0))
         self.name = name
         self.race = race
         self.char_class = char_class
-        self.max_hp = 20
-        self.hp = 20
-        self.base_damage = 5
+        self.max_hp = 20 + bonus_hp
+        self.hp = self.max_hp
+        self.base_damage = 5 + bonus_damage
         self.armor = 0
         self.gold = 50
         self.exp = 0
         self.level = 1
         self.inventory = []
         self.status_effects = []
-        
-        # ปรับ Stat ตามเผ่า/อาชีพ (ย่อเพื่อความกระชับ)
-        if race == "orc":
-            self.max_hp += 10
-            self.base_damage += 2
-        elif char_class == "warrior":
-            self.max_hp += 5
-            self.base_damage += 2
-
-        self.hp = self.max_hp
 
     def show_stats(self):
         log("═" * 30, "#555")
@@ -149,6 +149,7 @@ def combat_turn(player, monster):
 
 def run_rpg_game():
     """ฟังก์ชันหลักของเกมที่จะรันใน Thread"""
+    use_rng(SessionRNG())
     time.sleep(0.5) # รอ UI โหลดเสร็จนิดนึง
     log("=== ยินดีต้อนรับสู่ RPG TERMINAL ===", Colors.YELLOW)
     
@@ -171,7 +172,7 @@ def run_rpg_game():
             
             if roll_dice(20) > 10:
                 # เจอศัตรู
-                m_key = random.choice(list(monsters.keys()))
+                m_key = get_rng().choice(list(monsters.keys()))
                 monster = monsters[m_key].copy()
                 
                 log(f"\n⚠️ พบ {monster['name']}! {monster['description']}", Colors.RED)
@@ -0,0 +1,163 @@
+# autosave.py - บันทึกอัตโนมัติเบื้องหลัง รวมการเปลี่ยนแปลงที่มาติดๆ กันเป็นการเขียนครั้งเดียว
+#
+# เกมเรียก Autosaver.save(snapshot) หลังเหตุการณ์สำคัญ (ชนะการต่อสู้ ซื้อของ ปรุงยา) ซึ่งแค่จด snapshot ล่าสุดไว้
+# thread เขียนตัวเดียว (ใช้ร่วมกันทุกเซสชัน) จะเขียน snapshot ล่าสุดของแต่ละเซสชันหลังคำขอแรกผ่านไป
+# AUTOSAVE_DELAY วินาที คำขอที่มาระหว่างนั้นจึงรวมเป็นการเขียนครั้งเดียว
+import atexit
+import contextvars
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+
+from iodriver import say
+
+AUTOSAVE_DELAY = float(os.environ.get("RPG_AUTOSAVE_DELAY", "2.0"))
+AUTOSAVE_ENABLED = os.environ.get("RPG_AUTOSAVE", "1") != "0"
+EXIT_FLUSH_TIMEOUT = 10.0
+
+class AutosaveService:
+    """thread เขียนเซฟเบื้องหลังหนึ่งตัวสำหรับทุกเซสชัน"""
+    def __init__(self, delay=AUTOSAVE_DELAY):
+        self.delay = delay
+        self._reset()
+
+    def _reset(self):
+        self.requests = 0
+        self.writes = 0
+        self.last_error = None
+        self._errors = {}   # key -> ข้อผิดพลาดที่เจ้าของเซสชันยังไม่เห็น
+        self._cond = threading.Condition()
+        self._pending = {}  # key -> [due, context, write, snapshot]
+        self._due = []      # heap ของ (due, ลำดับ, key)
+        self._order = itertools.count()
+        self._writing = None
+        self._thread = None
+
+    def submit(self, key, write, snapshot):
+        """จด snapshot ล่าสุดของ key ไว้เขียนภายหลัง (ไม่บล็อกเกม)"""
+        context = contextvars.copy_context()  # เขียนด้วย profile/ตัวตั้งค่าของเซสชันที่ขอ
+        with self._cond:
+            self.requests += 1
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[1:] = context, write, snapshot  # รวมกับคำขอเดิม กำหนดเวลาเขียนคงเดิม
+                return
+            due = time.monotonic() + self.delay
+            self._pending[key] = [due, context, write, snapshot]
+            heapq.heappush(self._due, (due, next(self._order), key))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush, timeout=EXIT_FLUSH_TIMEOUT)
+            self._cond.notify()
+
+    def _next_due(self):
+        # คืน key ที่ถึงเวลาเขียน หรือ None (หลังรอจนถึงกำหนดถัดไป)
+        while self._due:
+            due, _, key = self._due[0]
+            entry = self._pending.get(key)
+            if entry is None or entry[0] != due:
+                heapq.heappop(self._due)  # ถูกเขียนหรือเลื่อนกำหนดไปแล้ว
+                continue
+            wait = due - time.monotonic()
+            if wait <= 0:
+                heapq.heappop(self._due)
+                return key
+            self._cond.wait(wait)
+            return None
+        self._cond.wait()
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                key = self._next_due()
+                if key is None:
+                    continue
+                _, context, write, snapshot = self._pending.pop(key)
+                self._writing = key
+            try:
+                context.run(write, snapshot)
+            except Exception as e:
+                # เขียนไม่สำเร็จ: ไม่ทำให้เกมล่ม snapshot ถัดไปจะลองใหม่ แต่ต้องไม่เงียบ
+                self.last_error = e
+                self._errors[key] = e
+                print(f"autosave failed: {e!r}", file=sys.stderr)
+            finally:
+                with self._cond:
+                    self._writing = None
+                    self.writes += 1
+                    self._cond.notify_all()
+
+    def take_error(self, key):
+        """คืนแล้วล้างข้อผิดพลาดล่าสุดของ key (None ถ้าเขียนสำเร็จทั้งหมด)"""
+        with self._cond:
+            return self._errors.pop(key, None)
+
+    def discard(self, key):
+        """ทิ้งคำขอที่ค้างของ key แล้วรอการเขียนของ key ที่กำลังทำอยู่ (ถ้ามี) ให้เสร็จ
+
+        เรียกก่อนบันทึกเองแบบ synchronous: snapshot ที่ค้างเก่ากว่า ต้องไม่ถูกเขียนทับทีหลัง
+        """
+        with self._cond:
+            self._pending.pop(key, None)  # รายการใน heap ที่ค้างอยู่ _next_due จะข้ามไปเอง
+            self._cond.wait_for(lambda: self._writing != key)
+
+    def flush(self, key=None, timeout=None):
+        """เขียนคำขอที่ค้างอยู่ทันที (ของ key เดียว หรือทั้งหมด) แล้วรอจนเขียนเสร็จ"""
+        with self._cond:
+            keys = [key] if key is not None else list(self._pending)
+            for k in keys:
+                entry = self._pending.get(k)
+                if entry is not None:
+                    entry[0] = 0.0
+                    heapq.heappush(self._due, (0.0, next(self._order), k))
+            self._cond.notify_all()
+            self._cond.wait_for(
+                lambda: not any(k in self._pending or k == self._writing for k in keys), timeout
+            )
+
+_service = AutosaveService()
+
+if hasattr(os, "register_at_fork"):
+    # โปรเซสลูกหลัง fork (server.py --workers) ไม่มี thread เขียนของแม่ และล็อกอาจค้างอยู่: เริ่มใหม่หมด
+    os.register_at_fork(after_in_child=_service._reset)
+
+def get_service():
+    return _service
+
+class Autosaver:
+    """autosave ของเซสชันเดียว: write(snapshot) จะถูกเรียกใน thread เบื้องหลัง"""
+    def __init__(self, write, service=None):
+        self.write = write
+        self.service = service or _service
+
+    def save(self, snapshot):
+        self.report()
+        self.service.submit(self, self.write, snapshot)
+
+    def discard(self):
+        self.service.discard(self)
+
+    def flush(self, timeout=None):
+        self.service.flush(self, timeout)
+        self.report()
+
+    def report(self):
+        """แจ้งผู้เล่นหนึ่งบรรทัดถ้า autosave ครั้งก่อนของเซสชันนี้เขียนไม่สำเร็จ"""
+        error = self.service.take_error(self)
+        if error is not None:
+            say(f"⚠️ บันทึกอัตโนมัติล้มเหลว: {error}")
+
+_current = ContextVar("autosaver", default=None)
+
+def get_autosaver():
+    return _current.get()
+
+def use_autosaver(autosaver):
+    _current.set(autosaver)
+    return autosaver
@@ -0,0 +1,104 @@
+# balance.py - ปรับสเตตัสของแต่ละสำนักให้ได้อัตราชนะตามเป้าหมาย
+# Run: python balance.py --schools Cat Lynx --policy smart
+#
+# ใช้ solver.py (คำนวณโอกาสชนะแบบแม่นยำ) เป็นตัวประเมิน แล้วไต่เขา (coordinate descent)
+# บน max_hp / base_dmg / sign_power / crit_chance ทีละสำนักแบบขนานบน process pool
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import witcher
+from simulator import POLICIES, SCHOOLS
+from solver import solve
+
+# อัตราชนะเป้าหมายของผู้เล่นเลเวล 1 ที่ HP เต็ม
+DEFAULT_TARGETS = {
+    "drowner": 0.99, "ghoul": 0.97, "bandit": 0.95,
+    "bear": 0.85, "bruxa": 0.65, "fiend": 0.05,
+}
+
+# (ชื่อสเตตัส, ระยะก้าว, ค่าต่ำสุด, ค่าสูงสุด)
+STAT_STEPS = [
+    ("max_hp", 5, 10, 400),
+    ("base_dmg", 1, 1, 50),
+    ("sign_power", 1, 0, 10),
+    ("crit_chance", 5, 0, 100),
+]
+
+def make_player(school, stats):
+    player = witcher.Witcher("Sim", school)
+    for name, value in stats.items():
+        setattr(player, name, value)
+    player.hp = player.max_hp
+    return player
+
+def evaluate(school, stats, targets, conjunction, policy):
+    """คืน (loss, {monster: win_rate}) ของชุดสเตตัสหนึ่ง"""
+    player = make_player(school, stats)
+    rates = {}
+    loss = 0.0
+    for monster_key, target in targets.items():
+        win, _ = solve(player, monster_key, conjunction, policy)
+        rates[monster_key] = win
+        loss += (win - target) ** 2
+    return loss, rates
+
+def tune_school(task):
+    """ไต่เขาหาสเตตัสของสำนักเดียว"""
+    school, targets, conjunction, policy_name, max_iters = task
+    policy = POLICIES[policy_name]
+    base = witcher.Witcher("Sim", school)
+    stats = {name: getattr(base, name) for name, _, _, _ in STAT_STEPS}
+    start = dict(stats)
+    best_loss, best_rates = evaluate(school, stats, targets, conjunction, policy)
+
+    for _ in range(max_iters):
+        improved = False
+        for name, step, lo, hi in STAT_STEPS:
+            for delta in (step, -step, 4 * step, -4 * step):
+                value = stats[name] + delta
+                if not lo <= value <= hi:
+                    continue
+                candidate = dict(stats, **{name: value})
+                loss, rates = evaluate(school, candidate, targets, conjunction, policy)
+                if loss < best_loss:
+                    stats, best_loss, best_rates = candidate, loss, rates
+                    improved = True
+                    break
+        if not improved:
+            break
+    return school, start, stats, best_loss, best_rates
+
+def tune(schools, targets, conjunction=False, policy_name="smart", max_iters=25, workers=None):
+    tasks = [(school, targets, conjunction, policy_name, max_iters) for school in schools]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(tune_school, tasks))
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune school stats towards target win rates")
+    parser.add_argument("--schools", nargs="+", choices=SCHOOLS, default=SCHOOLS)
+    parser.add_argument("--targets", help="ไฟล์ JSON {monster: win_rate} (ค่าเริ่มต้น: DEFAULT_TARGETS)")
+    parser.add_argument("--conjunction", action="store_true", help="ปรับกับมอนสเตอร์ช่วง Conjunction")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="smart")
+    parser.add_argument("--max-iters", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    targets = DEFAULT_TARGETS
+    if args.targets:
+        with open(args.targets, "r", encoding="utf-8") as f:
+            targets = json.load(f)
+
+    results = tune(args.schools, targets, args.conjunction, args.policy, args.max_iters, args.workers)
+    for school, start, stats, loss, rates in results:
+        witcher.print_separator()
+        print(f"{school}  (loss {loss:.4f})")
+        for name, _, _, _ in STAT_STEPS:
+            mark = "" if start[name] == stats[name] else f"  (เดิม {start[name]})"
+            print(f"  {name:<12} {stats[name]:>4}{mark}")
+        for monster_key, target in targets.items():
+            print(f"  vs {monster_key:<9} {100 * rates[monster_key]:>6.1f}%  (เป้า {100 * target:.0f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# bench/bench.py - benchmark ของ hot path ในเกม เทียบกับ baseline ที่บันทึกไว้
+# Run:    python bench/bench.py               (เทียบกับ bench/baseline.json)
+#         python bench/bench.py --update      (บันทึก baseline ใหม่)
+#         python bench/bench.py -k combat     (เฉพาะ benchmark ที่ชื่อมีคำนี้)
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import game
+import witcher
+from iodriver import HeadlessDriver, use_driver
+from rng import SessionRNG, use_rng
+from simulator import fast_policy
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 1.5
+REPEAT = 7
+
+BENCHES = []
+
+class SkipBench(Exception):
+    pass
+
+def bench(name, number):
+    """ลงทะเบียน benchmark: ฟังก์ชัน setup คืน callable ที่จะถูกจับเวลา"""
+    def register(setup):
+        BENCHES.append((name, number, setup))
+        return setup
+    return register
+
+# === witcher.py ===
+@bench("witcher.roll_dice", 500000)
+def _roll_dice():
+    return lambda: witcher.roll_dice(20)
+
+@bench("witcher.get_monsters", 20000)
+def _get_monsters():
+    return lambda: witcher.get_monsters(True)
+
+@bench("witcher.pick_encounter", 200000)
+def _pick_encounter():
+    player = witcher.Witcher("Bench", "Wolf")
+    player.active_quests.extend(["drowner", "bear"])
+    return lambda: witcher.pick_encounter(player, True)
+
+@bench("witcher.combat", 2000)
+def _combat():
+    def fight():
+        witcher.combat(witcher.Witcher("Bench", "Wolf"), "bandit", False, policy=fast_policy)
+    return fight
+
+@bench("witcher.brew_potion", 50000)
+def _brew_potion():
+    player = witcher.Witcher("Bench", "Wolf")
+    def brew():
+        player.inventory.append("Drowner Brain")
+        player.inventory.append("Dwarven Spirit")
+        player.brew_potion("Swallow")
+        player.inventory.remove("Swallow")
+    return brew
+
+@bench("witcher.plan_brews", 50000)
+def _plan_brews():
+    player = witcher.Witcher("Bench", "Wolf")
+    player.inventory.extend(["Drowner Brain", "Ghoul Blood", "Dwarven Spirit"] * 5)
+    return lambda: witcher.plan_brews(player.inventory)
+
+@bench("witcher.to_dict+from_dict", 50000)
+def _witcher_roundtrip():
+    player = witcher.Witcher("Bench", "Viper")
+    player.inventory.extend(["Drowner Brain", "Ghoul Blood"] * 20)
+    return lambda: witcher.Witcher.from_dict(player.to_dict())
+
+# === game.py ===
+@bench("game.load_data", 20000)
+def _load_data():
+    return game.load_data
+
+@bench("game.random_encounter", 20000)
+def _random_encounter():
+    return game.random_encounter
+
+@bench("game.save_game+load_game", 100)
+def _save_load():
+    driver = use_driver(HeadlessDriver())
+    player = game.Character("Bench", "human", "warrior")
+    player.inventory.extend(["น้ำยาบำบัด"] * 30)
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    def save_load():
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            driver.feed("1", "")
+            game.save_game(player, 3)
+            driver.feed("1", "")
+            game.load_game()
+        finally:
+            os.chdir(cwd)
+    return save_load
+
+# === RPG_PySide6.py ===
+@bench("RPG_PySide6.append_text", 2000)
+def _append_text():
+    try:
+        from PySide6.QtWidgets import QApplication
+        import RPG_PySide6
+    except ImportError as e:
+        raise SkipBench(f"PySide6 ไม่พร้อมใช้งาน ({e})")
+    app = QApplication.instance() or QApplication([])
+    window = RPG_PySide6.ModernTerminal()
+    def append():
+        window.append_text("⚔️ ก็อบลิน (HP: 15) <b>bench</b>", RPG_PySide6.Colors.RED)
+    append.keepalive = (app, window)
+    return append
+
+# === Runner ===
+def run_bench(number, fn):
+    """เวลาเฉลี่ยต่อครั้ง (วินาที) ที่ดีที่สุดจาก REPEAT รอบ"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def format_time(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.2f} us"
+    return f"{seconds * 1e3:8.2f} ms"
+
+def load_baseline():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine hot-path benchmarks")
+    parser.add_argument("-k", dest="pattern", default="", help="รันเฉพาะ benchmark ที่ชื่อมีคำนี้")
+    parser.add_argument("--update", action="store_true", help="เขียนผลลัพธ์ทับ baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="อัตราส่วนเวลาต่อ baseline ที่ถือว่าช้าลง (ค่าเริ่มต้น 1.5)")
+    args = parser.parse_args()
+
+    use_rng(SessionRNG(0))
+    use_driver(HeadlessDriver())
+    baseline = load_baseline()
+    results = {}
+    regressions = []
+
+    print(f"{'benchmark':<30} {'time/op':>11} {'baseline':>11} {'ratio':>7}")
+    for name, number, setup in BENCHES:
+        if args.pattern not in name:
+            continue
+        try:
+            fn = setup()
+        except SkipBench as e:
+            print(f"{name:<30} {'skipped':>11}  {e}")
+            continue
+        seconds = run_bench(number, fn)
+        results[name] = seconds
+        base = baseline.get(name)
+        if base:
+            ratio = seconds / base
+            flag = "  << REGRESSION" if ratio > args.threshold else ""
+            if flag:
+                regressions.append(name)
+            print(f"{name:<30} {format_time(seconds)} {format_time(base)} {ratio:>6.2f}x{flag}")
+        else:
+            print(f"{name:<30} {format_time(seconds)} {'-':>11}")
+
+    if args.update:
+        baseline.update(results)
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"บันทึก baseline ที่ {BASELINE_FILE}")
+    elif regressions:
+        print(f"ช้าลงเกิน {args.threshold}x: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
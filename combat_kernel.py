@@ -0,0 +1,145 @@
+# combat_kernel.py - NumPy combat kernel สำหรับการต่อสู้ d20 ของ game.py
+# Run: python combat_kernel.py --fights 100000
+#
+# จำลองการต่อสู้แบบ "โจมตีทุกเทิร์น" (ตัวเลือก 1 ใน combat_step ของ game.py) เป็นชุดใหญ่ทีละเทิร์น
+# กติกาตรงกับ player_attack, enemy_attack, critical_success_effect, critical_fail_effect
+# และ Character.take_damage ทุกประการ
+import argparse
+import time
+
+import numpy as np
+
+import game
+
+MAX_TURNS = 500
+
+# ตัวคูณจาก critical_success_effect (ตัดศรีษะ, แทงทะลุ, ทุบแหลก)
+CRIT_MULTIPLIERS = np.array([3.0, 2.5, 2.0])
+# critical_fail_effect: ความเสียหายต่อตัวเอง และโบนัสดาเมจศัตรู
+FAIL_SELF_DAMAGE = np.array([5, 3, 0])
+FAIL_ENEMY_BONUS = np.array([1, 1, 2])
+
+RACES = ["human", "elf", "orc", "vampire"]
+CLASSES = ["warrior", "rogue", "mage", "necromancer"]
+
+def character_arrays(characters):
+    """แปลงรายการ Character เป็น array ของ stat ที่ใช้ในการต่อสู้"""
+    return {
+        "hp": np.array([c.hp for c in characters], dtype=np.int64),
+        "base_damage": np.array([c.base_damage for c in characters], dtype=np.int64),
+        "armor": np.array([c.armor for c in characters], dtype=np.int64),
+    }
+
+def monster_arrays(templates):
+    """แปลง template มอนสเตอร์จาก load_data() เป็น array"""
+    return {
+        "hp": np.array([m["hp"] for m in templates], dtype=np.int64),
+        "min_dmg": np.array([m["min_dmg"] for m in templates], dtype=np.int64),
+        "max_dmg": np.array([m["max_dmg"] for m in templates], dtype=np.int64),
+    }
+
+def resolve_fights(players, monsters, rng=None, max_turns=MAX_TURNS):
+    """ต่อสู้ทุกคู่ (players[i] vs monsters[i]) พร้อมกันจนจบ
+
+    คืน dict ของ array: won, turns, player_hp, monster_hp
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    player_hp = players["hp"].copy()
+    base_damage = players["base_damage"]
+    armor = players["armor"]
+    monster_hp = monsters["hp"].copy()
+    min_dmg = monsters["min_dmg"]
+    max_dmg = monsters["max_dmg"]
+    turns = np.zeros(len(player_hp), dtype=np.int64)
+
+    active = np.arange(len(player_hp))
+    for _ in range(max_turns):
+        if active.size == 0:
+            break
+        k = active.size
+        base = base_damage[active]
+        arm = armor[active]
+        p_hp = player_hp[active]
+        m_hp = monster_hp[active]
+        lo = min_dmg[active]
+        hi = max_dmg[active]
+
+        # Player Turn: d20
+        roll = rng.integers(1, 21, k)
+        dmg_roll = rng.integers(1, base + 1)
+        crit = roll == 20
+        fumble = roll == 1
+        hit = (roll >= 10) & ~crit
+        crit_dmg = (dmg_roll * CRIT_MULTIPLIERS[rng.integers(0, 3, k)]).astype(np.int64)
+        player_dmg = np.where(crit, crit_dmg, np.where(hit, dmg_roll, 0))
+
+        fail = rng.integers(0, 3, k)
+        self_dmg = FAIL_SELF_DAMAGE[fail]
+        hurt = fumble & (self_dmg > 0)
+        p_hp = p_hp - np.where(hurt, np.maximum(1, self_dmg - arm), 0)
+        bonus = np.where(fumble, FAIL_ENEMY_BONUS[fail], 1)
+
+        # Enemy Turn: d20
+        e_roll = rng.integers(1, 21, k)
+        e_crit_dmg = (rng.integers(1, hi + 1) + lo) * 2 * bonus
+        e_hit_dmg = rng.integers(lo, hi + 1) * bonus
+        enemy_dmg = np.where(e_roll == 20, e_crit_dmg, np.where(e_roll >= 8, e_hit_dmg, 0))
+        enemy_dmg[e_roll == 1] = 0
+        m_hp = m_hp - np.where(e_roll == 1, rng.integers(1, 4, k), 0)
+        p_hp = p_hp - np.where(enemy_dmg > 0, np.maximum(1, enemy_dmg - arm), 0)
+
+        m_hp = m_hp - player_dmg
+        player_hp[active] = p_hp
+        monster_hp[active] = m_hp
+        turns[active] += 1
+        active = active[(m_hp > 0) & (p_hp > 0)]
+
+    return {
+        "won": (monster_hp <= 0) & (player_hp > 0),
+        "turns": turns,
+        "player_hp": player_hp,
+        "monster_hp": monster_hp,
+    }
+
+def sweep(fights, rng=None):
+    """ทุกเผ่า × อาชีพ × มอนสเตอร์ คู่ละ fights ครั้ง คืน {(race, class, monster): (win_rate, turns)}"""
+    monsters, _ = game.load_data()
+    monster_keys = list(monsters)
+    characters = [game.Character("Sim", race, cls) for race in RACES for cls in CLASSES]
+
+    pairs = [(c, key) for c in characters for key in monster_keys]
+    players = character_arrays([c for c, _ in pairs])
+    templates = monster_arrays([monsters[key] for _, key in pairs])
+    players = {k: np.repeat(v, fights) for k, v in players.items()}
+    templates = {k: np.repeat(v, fights) for k, v in templates.items()}
+
+    result = resolve_fights(players, templates, rng)
+    won = result["won"].reshape(len(pairs), fights)
+    turns = result["turns"].reshape(len(pairs), fights)
+    table = {}
+    for i, (c, key) in enumerate(pairs):
+        table[(c.race, c.char_class, key)] = (won[i].mean(), turns[i].mean())
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized d20 balance sweep for game.py")
+    parser.add_argument("--fights", type=int, default=10000, help="จำนวนการต่อสู้ต่อคู่")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = sweep(args.fights, np.random.default_rng(args.seed))
+    elapsed = time.perf_counter() - start
+
+    game.print_separator()
+    print(f"{'Race':<8} {'Class':<12} {'Monster':<11} {'Win %':>7} {'Turns':>6}")
+    game.print_separator()
+    for (race, cls, key), (win_rate, turns) in table.items():
+        print(f"{race:<8} {cls:<12} {key:<11} {100 * win_rate:>6.1f}% {turns:>6.1f}")
+    total = len(table) * args.fights
+    print(f"{total} fights in {elapsed:.2f}s ({total / elapsed:.0f} fights/s)")
+
+if __name__ == "__main__":
+    main()
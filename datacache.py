@@ -0,0 +1,63 @@
+# datacache.py - แคชไบนารีของไฟล์ข้อมูล JSON (คล้าย __pycache__)
+#
+# ครั้งแรกที่โหลด จะ parse JSON แล้วเขียนผลเป็น marshal ไว้ใน __datacache__/ ข้างไฟล์ต้นฉบับ
+# ครั้งต่อไปอ่านแคชทีเดียวทั้งไฟล์ ถ้า mtime/ขนาดของต้นฉบับเปลี่ยนจะตรวจ hash
+# แล้วคอมไพล์ใหม่เฉพาะเมื่อเนื้อหาเปลี่ยนจริง
+import hashlib
+import json
+import marshal
+import os
+import struct
+
+CACHE_DIR_NAME = "__datacache__"
+MAGIC = b"RPGC" + bytes([marshal.version])
+HEADER = struct.Struct("<5sqq20s")  # magic, mtime_ns, size, sha1
+
+def cache_path(path):
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIR_NAME, name + ".bin")
+
+def _read_cache(cpath):
+    try:
+        with open(cpath, "rb") as f:
+            blob = f.read()
+    except OSError:
+        return None, None
+    if len(blob) < HEADER.size:
+        return None, None
+    header = HEADER.unpack_from(blob)
+    if header[0] != MAGIC:
+        return None, None
+    return header, memoryview(blob)[HEADER.size:]
+
+def _write_cache(cpath, st, digest, payload):
+    try:
+        os.makedirs(os.path.dirname(cpath), exist_ok=True)
+        tmp = f"{cpath}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, st.st_mtime_ns, st.st_size, digest))
+            f.write(payload)
+        os.replace(tmp, cpath)
+    except OSError:
+        pass  # โฟลเดอร์อ่านอย่างเดียว: ใช้งานได้แต่ไม่มีแคช
+
+def load_json(path):
+    """โหลดไฟล์ JSON ผ่านแคชไบนารี"""
+    st = os.stat(path)
+    cpath = cache_path(path)
+    header, payload = _read_cache(cpath)
+    if header and header[1] == st.st_mtime_ns and header[2] == st.st_size:
+        return marshal.loads(payload)
+
+    with open(path, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha1(source).digest()
+    if header and header[3] == digest:
+        # เนื้อหาเดิม แค่ mtime เปลี่ยน (เช่น git checkout): อัปเดต header อย่างเดียว
+        data = payload.tobytes()
+        _write_cache(cpath, st, digest, data)
+        return marshal.loads(data)
+
+    obj = json.loads(source.decode("utf-8"))
+    _write_cache(cpath, st, digest, marshal.dumps(obj))
+    return obj
@@ -1,15 +1,23 @@
-import random
 import time
 import json
 import os
 import sys
 import io
 
+from datacache import load_json
+from inventory import Inventory
+from iodriver import ask, clear_screen, get_driver, pause, say, use_driver
+from journal import Journal, RecordingDriver, checkpoint, replay, replaying, resume, use_journal
+from rng import SessionRNG, get_rng, use_rng
+from saveformat import migrate, migration, stamp
+from savefile import atomic_write_json, read_save, save_log
+from savestore import get_profile, get_store, use_sqlite
+
 def setup_windows_encoding():
     if sys.platform == "win32":
         try:
             sys.stdout.reconfigure(encoding='utf-8')
-            print("Using sys.stdout.reconfigure() for UTF-8")
+            say("Using sys.stdout.reconfigure() for UTF-8")
         except (AttributeError, Exception):
             sys.stdout = io.TextIOWrapper(
                 sys.stdout.buffer, 
@@ -17,7 +25,7 @@ def setup_windows_encoding():
                 errors='replace',
                 line_buffering=True
             )
-            print("Using io wrapper for UTF-8 support")
+            say("Using io wrapper for UTF-8 support")
         import os
         os.environ['PYTHONIOENCODING'] = 'utf-8'
 setup_windows_encoding()
@@ -37,357 +45,390 @@ class Colors:
 
 def roll_dice(sides, modifier=0):
     """ทอยลูกเต๋า"""
-    return random.randint(1, sides) + modifier
-
-def clear_screen():
-    """ล้างหน้าจอ"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    return get_rng().roll(sides, modifier)
 
 def print_separator():
     """เส้นคั่น"""
-    print("="*50)
+    say("="*50)
+
+SAVE_SLOTS = 3
+SAVE_MANIFEST = "saves.json"  # สรุปข้อมูลของทุกสล็อต (ชื่อ/ระดับ/เวลา) ไม่ต้องเปิดไฟล์เซฟเต็ม
+JOURNAL_FILE = "game.journal"
+
+def save_path(slot):
+    return f"save{slot}.sav"
+
+def legacy_save_path(slot):
+    return f"save{slot}.json"  # เซฟ JSON ก่อนมี .sav
 
-def get_save_slots():
-    """ตรวจสอบสล็อตเซฟที่มีอยู่"""
-    save_slots = []
-    for i in range(3):
-        if os.path.exists(f"save{i}.json"):
-            save_slots.append(i)
-    return save_slots
+def existing_save_path(slot):
+    path = save_path(slot)
+    if not os.path.exists(path) and os.path.exists(legacy_save_path(slot)):
+        return legacy_save_path(slot)
+    return path
+
+@migration("game", 1)
+def _game_v1_to_v2(data):
+    # v2: กระเป๋าเก็บเป็น {ชื่อ: จำนวน} เสมอ (เซฟก่อนมี Inventory เป็น list)
+    player_data = data['player']
+    if not isinstance(player_data['inventory'], dict):
+        player_data['inventory'] = new_inventory(player_data['inventory']).quantities()
+    player_data.setdefault('status_effects', [])
+    return data
+
+def slot_summary(save_data):
+    """ข้อมูลย่อของเซฟหนึ่งสล็อตที่เก็บใน manifest"""
+    player_data = save_data['player']
+    return {
+        "name": player_data['name'],
+        "level": player_data['level'],
+        "race": player_data['race'],
+        "char_class": player_data['char_class'],
+        "save_timestamp": save_data['game_stats']['save_timestamp'],
+    }
+
+def write_manifest(manifest):
+    """เขียน manifest แบบ atomic (ไฟล์ชั่วคราว + rename)"""
+    atomic_write_json(SAVE_MANIFEST, manifest)
+
+def rebuild_manifest():
+    """สร้าง manifest จากไฟล์เซฟที่มีอยู่ (ครั้งแรก หรือเมื่อ manifest เสีย)"""
+    manifest = {}
+    for slot in range(SAVE_SLOTS):
+        try:
+            manifest[str(slot)] = slot_summary(read_save(existing_save_path(slot)))
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError, KeyError):
+            manifest[str(slot)] = None  # มีไฟล์แต่อ่านไม่ได้
+    write_manifest(manifest)
+    return manifest
+
+def read_manifest():
+    """{สล็อต (str): ข้อมูลย่อ หรือ None ถ้าอ่านเซฟไม่ได้}"""
+    if use_sqlite():
+        # แต่ละแถวใน SQLite มีข้อมูลย่ออยู่แล้ว ไม่ต้องมีไฟล์ manifest
+        return {
+            str(row["slot"]): {"name": row["name"], "level": row["level"], "save_timestamp": row["saved_at"]}
+            for row in get_store().slots("game", get_profile())
+        }
+    try:
+        with open(SAVE_MANIFEST, "r", encoding='utf-8') as f:
+            manifest = json.load(f)
+        if isinstance(manifest, dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return rebuild_manifest()
+
+def write_slot(slot, save_data):
+    """บันทึกเซฟหนึ่งสล็อตลง SQLite หรือไฟล์ (+ manifest)"""
+    if replaying():
+        return  # เล่น journal ซ้ำ: เซฟนี้เคยเขียนไปแล้ว และไม่ควรทับเซฟที่ใหม่กว่า
+    if use_sqlite():
+        player_data = save_data['player']
+        get_store().put(
+            "game", get_profile(), slot, save_data, player_data['name'], player_data['level'],
+            player_data['char_class'], save_data['game_stats']['save_timestamp'],
+        )
+        return
+    save_log(save_path(slot)).save(save_data)
+    update_manifest(slot, save_data)
+
+def read_slot(slot):
+    if use_sqlite():
+        data = get_store().get("game", get_profile(), slot)
+        if data is None:
+            raise FileNotFoundError(f"ไม่มีเซฟในสล็อต {slot+1}")
+        return data
+    return read_save(existing_save_path(slot))
+
+def update_manifest(slot, save_data):
+    manifest = read_manifest()
+    manifest[str(slot)] = slot_summary(save_data)
+    write_manifest(manifest)
+
+def get_save_slots(manifest=None):
+    """ตรวจสอบสล็อตเซฟที่มีอยู่ (จาก manifest)"""
+    if manifest is None:
+        manifest = read_manifest()
+    return sorted(int(slot) for slot in manifest)
 
 def save_game(player, enemies_defeated):
     """บันทึกเกม"""
     clear_screen()
-    print(f"{Colors.BOLD}=== บันทึกเกม ==={Colors.END}")
+    say(f"{Colors.BOLD}=== บันทึกเกม ==={Colors.END}")
     
-    save_slots = get_save_slots()
+    manifest = read_manifest()
+    save_slots = get_save_slots(manifest)
+    cancel = str(SAVE_SLOTS + 1)
     
-    if len(save_slots) < 3:
-        print(f"\n{Colors.CYAN}มีสล็อตเซฟว่างอยู่:{Colors.END}")
-        for i in range(3):
-            if i not in save_slots:
-                print(f"{i+1}. สร้างเซฟใหม่ในสล็อต {i+1}")
+    if len(save_slots) < SAVE_SLOTS:
+        say(f"\n{Colors.CYAN}มีสล็อตเซฟว่างอยู่:{Colors.END}")
+        for i in range(SAVE_SLOTS):
+            if str(i) not in manifest:
+                say(f"{i+1}. สร้างเซฟใหม่ในสล็อต {i+1}")
     
     if save_slots:
-        print(f"\n{Colors.YELLOW}สล็อตเซฟที่มีอยู่:{Colors.END}")
+        say(f"\n{Colors.YELLOW}สล็อตเซฟที่มีอยู่:{Colors.END}")
         for slot in save_slots:
-            try:
-                with open(f"save{slot}.json", "r", encoding='utf-8') as f:
-                    data = json.load(f)
-                    print(f"{slot+1}. เซฟสล็อต {slot+1}: {data['player']['name']} ระดับ {data['player']['level']}")
-            except:
-                print(f"{slot+1}. เซฟสล็อต {slot+1}: ไม่สามารถอ่านข้อมูลได้")
+            info = manifest[str(slot)]
+            if info:
+                say(f"{slot+1}. เซฟสล็อต {slot+1}: {info['name']} ระดับ {info['level']}")
+            else:
+                say(f"{slot+1}. เซฟสล็อต {slot+1}: ไม่สามารถอ่านข้อมูลได้")
     
-    print("\n4. ยกเลิกการบันทึก")
+    say(f"\n{cancel}. ยกเลิกการบันทึก")
     
     while True:
-        choice = input("\nเลือกสล็อตเซฟ (1-4): ")
+        choice = ask(f"\nเลือกสล็อตเซฟ (1-{cancel}): ")
         
-        if choice == "4":
-            print(f"{Colors.YELLOW}ยกเลิกการบันทึก{Colors.END}")
+        if choice == cancel:
+            say(f"{Colors.YELLOW}ยกเลิกการบันทึก{Colors.END}")
             return False
         
         try:
             slot = int(choice) - 1
-            if 0 <= slot <= 2:
+            if 0 <= slot < SAVE_SLOTS:
                 # เตรียมข้อมูลที่จะบันทึก
-                save_data = {
-                    "player": {
-                        "name": player.name,
-                        "race": player.race,
-                        "char_class": player.char_class,
-                        "max_hp": player.max_hp,
-                        "hp": player.hp,
-                        "base_damage": player.base_damage,
-                        "armor": player.armor,
-                        "gold": player.gold,
-                        "exp": player.exp,
-                        "level": player.level,
-                        "inventory": player.inventory,
-                        "status_effects": player.status_effects
-                    },
+                save_data = stamp("game", {
+                    "player": player.to_dict(),
                     "game_stats": {
                         "enemies_defeated": enemies_defeated,
                         "save_timestamp": time.time()
-                    }
-                }
-                with open(f"save{slot}.json", "w", encoding='utf-8') as f:
-                    json.dump(save_data, f, ensure_ascii=False, indent=2)
+                    },
+                    "rng": get_rng().to_dict()
+                })
+                write_slot(slot, save_data)
                 
-                print(f"{Colors.GREEN}บันทึกเกมสำเร็จในสล็อต {slot+1}!{Colors.END}")
-                input(f"\n{Colors.YELLOW}กด Enter เพื่อกลับไป...{Colors.END}")
+                say(f"{Colors.GREEN}บันทึกเกมสำเร็จในสล็อต {slot+1}!{Colors.END}")
+                ask(f"\n{Colors.YELLOW}กด Enter เพื่อกลับไป...{Colors.END}")
                 return True
             else:
-                print(f"{Colors.RED}โปรดเลือกสล็อต 1-3 หรือ 4 เพื่อยกเลิก{Colors.END}")
+                say(f"{Colors.RED}โปรดเลือกสล็อต 1-{SAVE_SLOTS} หรือ {cancel} เพื่อยกเลิก{Colors.END}")
         except ValueError:
-            print(f"{Colors.RED}โปรดป้อนตัวเลขที่ถูกต้อง{Colors.END}")
+            say(f"{Colors.RED}โปรดป้อนตัวเลขที่ถูกต้อง{Colors.END}")
 
 def load_game():
     """โหลดเกมจากไฟล์เซฟ"""
     clear_screen()
-    print(f"{Colors.BOLD}=== โหลดเกม ==={Colors.END}")
+    say(f"{Colors.BOLD}=== โหลดเกม ==={Colors.END}")
     
-    save_slots = get_save_slots()
+    manifest = read_manifest()
+    save_slots = get_save_slots(manifest)
     
     if not save_slots:
-        print(f"{Colors.RED}ไม่พบไฟล์เซฟเกม{Colors.END}")
-        input(f"\n{Colors.YELLOW}กด Enter เพื่อกลับไป...{Colors.END}")
+        say(f"{Colors.RED}ไม่พบไฟล์เซฟเกม{Colors.END}")
+        ask(f"\n{Colors.YELLOW}กด Enter เพื่อกลับไป...{Colors.END}")
         return None, 0
     
-    print(f"\n{Colors.CYAN}สล็อตเซฟที่มีอยู่:{Colors.END}")
+    say(f"\n{Colors.CYAN}สล็อตเซฟที่มีอยู่:{Colors.END}")
     for slot in save_slots:
-        try:
-            with open(f"save{slot}.json", "r", encoding='utf-8') as f:
-                data = json.load(f)
-                timestamp = data['game_stats']['save_timestamp']
-                save_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
-                print(f"{slot+1}. เซฟสล็อต {slot+1}: {data['player']['name']} (ระดับ {data['player']['level']}) - {save_time}")
-        except:
-            print(f"{slot+1}. เซฟสล็อต {slot+1}: ไม่สามารถอ่านข้อมูลได้")
+        info = manifest[str(slot)]
+        if info:
+            save_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(info['save_timestamp']))
+            say(f"{slot+1}. เซฟสล็อต {slot+1}: {info['name']} (ระดับ {info['level']}) - {save_time}")
+        else:
+            say(f"{slot+1}. เซฟสล็อต {slot+1}: ไม่สามารถอ่านข้อมูลได้")
     
-    print(f"\n{len(save_slots)+1}. ยกเลิกการโหลด")
+    say(f"\n{SAVE_SLOTS+1}. ยกเลิกการโหลด")
     
     while True:
         try:
-            choice = int(input("\nเลือกสล็อตเซฟที่จะโหลด: "))
+            choice = int(ask("\nเลือกสล็อตเซฟที่จะโหลด: "))
             
-            if choice == len(save_slots) + 1:
-                print(f"{Colors.YELLOW}ยกเลิกการโหลด{Colors.END}")
+            if choice == SAVE_SLOTS + 1:
+                say(f"{Colors.YELLOW}ยกเลิกการโหลด{Colors.END}")
                 return None, 0
             
             slot = choice - 1
             if slot in save_slots:
                 try:
-                    with open(f"save{slot}.json", "r", encoding='utf-8') as f:
-                        data = json.load(f)
+                    data = migrate("game", read_slot(slot))
                     
-                    player_data = data['player']
-                    player = Character(
-                        player_data['name'], 
-                        player_data['race'], 
-                        player_data['char_class']
-                    )
-
-                    player.max_hp = player_data['max_hp']
-                    player.hp = player_data['hp']
-                    player.base_damage = player_data['base_damage']
-                    player.armor = player_data['armor']
-                    player.gold = player_data['gold']
-                    player.exp = player_data['exp']
-                    player.level = player_data['level']
-                    player.inventory = player_data['inventory']
-                    player.status_effects = player_data['status_effects']
+                    player = Character.from_dict(data['player'])
                     
                     enemies_defeated = data['game_stats']['enemies_defeated']
+                    if "rng" in data:
+                        use_rng(SessionRNG.from_dict(data["rng"]))
                     
-                    print(f"{Colors.GREEN}โหลดเกมสำเร็จ!{Colors.END}")
-                    print(f"ยินดีต้อนรับกลับ {player.name} ระดับ {player.level}")
+                    say(f"{Colors.GREEN}โหลดเกมสำเร็จ!{Colors.END}")
+                    say(f"ยินดีต้อนรับกลับ {player.name} ระดับ {player.level}")
                     
-                    input(f"\n{Colors.YELLOW}กด Enter เพื่อเริ่มการผจญภัยต่อ...{Colors.END}")
+                    ask(f"\n{Colors.YELLOW}กด Enter เพื่อเริ่มการผจญภัยต่อ...{Colors.END}")
                     return player, enemies_defeated
                     
                 except Exception as e:
-                    print(f"{Colors.RED}เกิดข้อผิดพลาดในการโหลด: {e}{Colors.END}")
+                    say(f"{Colors.RED}เกิดข้อผิดพลาดในการโหลด: {e}{Colors.END}")
                     return None, 0
             else:
-                print(f"{Colors.RED}สล็อตที่เลือกไม่มีไฟล์เซฟ{Colors.END}")
+                say(f"{Colors.RED}สล็อตที่เลือกไม่มีไฟล์เซฟ{Colors.END}")
         except ValueError:
-            print(f"{Colors.RED}โปรดป้อนตัวเลขที่ถูกต้อง{Colors.END}")
+            say(f"{Colors.RED}โปรดป้อนตัวเลขที่ถูกต้อง{Colors.END}")
+
+# ข้อมูลเกมอยู่ใน data pack โหลดครั้งเดียว ส่วนชุดข้อความโหลดเมื่อเจอมอนสเตอร์ครั้งแรก
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+PACK_FILE = os.path.join(DATA_DIR, "game_pack.json")
+TEXT_POOL_DIR = os.path.join(DATA_DIR, "text_pools")
+
+_pack = None
+_text_pools = {}
+_monster_data = {}
+_item_categories = None
+
+def load_pack():
+    """โหลด data pack (template มอนสเตอร์และไอเทม)"""
+    global _pack
+    if _pack is None:
+        _pack = load_json(PACK_FILE)
+    return _pack
+
+def load_text_pool(name):
+    """ถอดรหัสชุดข้อความ (gore/nsfw/special) เมื่อถูกใช้ครั้งแรก"""
+    pool = _text_pools.get(name)
+    if pool is None:
+        pool = _text_pools[name] = load_json(os.path.join(TEXT_POOL_DIR, f"{name}.json"))
+    return pool
 
-# โหลดข้อมูลจาก JSON (ถ้ามี)
 def load_data():
     """โหลดข้อมูลมอนสเตอร์และไอเทม"""
-    monsters = {
-        "goblin": {
-            "name": "ก็อบลิน",
-            "hp": 15,
-            "min_dmg": 1,
-            "max_dmg": 6,
-            "description": "มอนสเตอร์ตัวเล็กตาแดง",
-            "gore_texts": {
-                "crit_hit": [
-                    "คุณฟันคอของก็อบลินขาดลอย! หัวมันกระเด็นไปกระแทกผนังพร้อมเสียงกระแทกเปียก",
-                    "คุณแทงดาบทะลุท้องก็อบลินแล้วฉีกขึ้นมาจนถึงคาง ไส้และเลือดทะลักท่วมพื้น",
-                    "คุณฟาดศอกกลางหน้า ก็อบลิน กะโหลกแตกเสียงดังกร๊อบ หนังตาข้างซ้ายหลุดจากเบ้า"
-                ],
-                "crit_fail": [
-                    "ดาบของคุณพลาดและเสียบลงพื้นจนด้ามหัก เศษไม้ทิ่มฝ่ามือคุณเลือดไหล",
-                    "คุณสะดุดกองอึก็อบลินล้มหน้าคว่ำ กลิ่นเหม็นสาปเข้าจมูก",
-                    "ก็อบลินหลบได้ คุณโจมตีพลาดและหกล้มก้นกระแทกพื้นจนกระดูกก้นกบร้าว"
-                ]
-            }
-        },
-        "orc": {
-            "name": "ออร์ค",
-            "hp": 25,
-            "min_dmg": 2,
-            "max_dmg": 8,
-            "description": "ยักษ์เขียวคล้ำหน้าตาโหดร้าย ฟันเหลืองและตัวเหม็น",
-            "gore_texts": {
-                "crit_hit": [
-                    "คุณฟันแขนขวาออร์คขาด เนื้อและเอ็นฉีกขาดพร้อมเสียงกรอบแกรน",
-                    "คุณแทงดาบเข้าตาออร์คด้านซ้ายทะลุออกหลังหัว น้ำตาและเลือดสมองกระเซ็น",
-                    "คุณจู่โจมที่หัวออร์คอย่างแรง ของเหลวสีแดงคลุ้งกระจาย"
-                ],
-                "crit_fail": [
-                    "ออร์คถ่มน้ำลายใส่หน้า คุณสูดเข้าไปสำลักและอาเจียนออกมา",
-                    "คุณลื่นบนเลือดตัวเองล้มทับตะเกียงไฟ เนื้อหลังไหม้ส่งเสียงฉ่ามีควันขึ้น",
-                    "ออร์คเตะถุงอัณฑะคุณเสียงดังเป๊ก คุณล้มลงปวดเบี้ยวไม่อาจลุก"
-                ]
-            }
-        },
-        "necrophile": {
-            "name": "เนโครไฟล์",
-            "hp": 35,
-            "min_dmg": 3,
-            "max_dmg": 10,
-            "description": "ร่างเน่าเปื่อยที่ยังเคลื่อนไหวได้และมีหนอนไต่",
-            "gore_texts": {
-                "crit_hit": [
-                    "คุณฟันร่างเนโครไฟล์เป็นสองท่อน หนอนนับร้อยร่วงหล่นดิ้นไปทั่ว",
-                    "คุณเผาร่างเนโครไฟล์ด้วยไฟ กลิ่นเนื้อคนไหม้ปนน้ำเหลืองโชยเข้าจมูก",
-                    "คุณทุบหัวเนโครไฟล์จนกะโหลกแบน สมองเน่าสีเขียวพุ่งออกทางรูตา"
-                ],
-                "crit_fail": [
-                    "เนโครไฟล์อ้วกน้ำเหลืองใส่คุณ คุณสำลักและอาเจียนตาม",
-                    "คุณเหยียบซากเน่าลื่นล้ม ตะปูสนิมทิ่มทะลุขา",
-                    "เนโครไฟล์ฉีกเสื้อคุณและเลียหน้าอก คุณสะท้อนจนตัวแข็งไม่ขยับ"
-                ]
-            }
-        },
-        "succubus": {
-            "name": "ซักคิวบัส",
-            "hp": 30,
-            "min_dmg": 2,
-            "max_dmg": 12,
-            "description": "ปีศาจเพศหญิงร่างเซ็กซี่แต่ตาแดงก่ำและมีเขา",
-            "nsfw_texts": {
-                "crit_hit": [
-                    "คุณแทงดาบทะลุอกซักคิวบัส แต่มันยังยิ้มเยาะขณะเลือดสีดำไหล",
-                    "คุณฟันคอซักคิวบัสขาด หลอดเลือดฉีดเลือดสีดำเป็นฝอยบนผนัง",
-                    "คุณตัดปีกซักคิวบัส มันร้องครวญครางแบบสุดเสียงที่ฟังแล้วเข่าอ่อน"
-                ],
-                "crit_fail": [
-                    "ซักคิวบัสจูบคุณจนขาดอากาศ รู้สึกเหมือนวิญญาณกำลังถูกดูด",
-                    "มันลูบไล้ระหว่างขาคุณจนคุณแข็งทื่อ ไม่สามารถขยับได้",
-                    "ซักคิวบัสใช้หางพันคอคุณและบีบจนลิ้นห้อย โลกมืดลงช้าๆ"
-                ],
-                "special": [
-                    "ซักคิวบัสถูอวัยวะคุณผ่านกางเกง 'น่าเอ็นดู...เล็กกว่าที่คิดนะ'",
-                    "มันเปิดเสื้อให้เห็นทรวงอก 'อยากมาเล่นด้วยไหม? แค่ยอมแพ้ก็ได้'",
-                    "ซักคิวบัสเลียปาก 'ฉันจะทำให้เธอเสียใจที่ยังมีชีวิตอยู่'"
-                ]
-            }
-        }
-    }
-    
-    items = {
-        "health potion": {
-            "name": "น้ำยาบำบัด",
-            "heal": 20,
-            "description": "ของเหลวสีแดงข้น กลิ่นโลหิตผสมสมุนไพร"
-        },
-        "rage potion": {
-            "name": "น้ำยาคลั่ง",
-            "damage_bonus": 5,
-            "duration": 3,
-            "description": "ของเหลวสีดำเดือดปุดๆ กลิ่นเลือดผสมเหล็กไหล"
-        },
-        "dagger": {
-            "name": "มีดสั้นเบ้อเริ่ม",
-            "damage": 4,
-            "description": "มีดสนิมติดเลือดเก่า ด้ามห่อด้วยหนังมนุษย์"
-        },
-        "vibrator": {
-            "name": "เครื่องสั่นประหลาด",
-            "special": "ทำให้ศัตรูสับสน",
-            "description": "อุปกรณ์ไฟฟ้าที่ยังทำงานได้ ปลายมีคราบสีขาว"
-        },
-        "orc's club": {  
-        "name": "Orc's club",
-        "damage": 3,
-        "description": "กระบองไม้ใหญ่ของออร์ค",
-        "special": "มีโอกาสทำให้ศัตรูสตั้น"
-        }
+    pack = load_pack()
+    return pack["monsters"], pack["items"]
+
+def get_monster_data(key):
+    """template ของมอนสเตอร์พร้อมชุดข้อความของมัน"""
+    data = _monster_data.get(key)
+    if data is None:
+        template = load_pack()["monsters"][key]
+        data = dict(template)
+        if "text_pool" in template:
+            data.update(load_text_pool(template["text_pool"]))
+        _monster_data[key] = data
+    return data
+
+def item_category(name):
+    """หมวดของไอเทม (potion/weapon/misc) ค้นได้ทั้งจากคีย์และชื่อที่แสดง"""
+    global _item_categories
+    if _item_categories is None:
+        _item_categories = {}
+        for key, item in load_pack()["items"].items():
+            if "heal" in item or "damage_bonus" in item:
+                category = "potion"
+            elif "damage" in item:
+                category = "weapon"
+            else:
+                category = "misc"
+            _item_categories[key] = _item_categories[item["name"]] = category
+    return _item_categories.get(name)
+
+def new_inventory(items=()):
+    return Inventory(items, item_category)
+
+def load_inventory(quantities):
+    return Inventory.from_quantities(quantities, item_category)
+
+def spawn_monster(template):
+    """สร้าง instance ของมอนสเตอร์สำหรับการต่อสู้หนึ่งครั้ง"""
+    return {
+        'name': template['name'],
+        'hp': template['hp'],
+        'min_dmg': template['min_dmg'],
+        'max_dmg': template['max_dmg'],
+        'description': template['description']
     }
-    
-    return monsters, items
+
+# เผ่า: (max_hp, base_damage, armor, ไอเทมเริ่มต้น)
+RACE_STATS = {
+    "human": (25, 6, 2, ()),
+    "elf": (20, 8, 1, ()),
+    "orc": (30, 10, 0, ("orc's club",)),
+    "vampire": (35, 9, 3, ("vampire bite",)),
+}
+# อาชีพ: (max_hp ที่เพิ่ม, base_damage ที่เพิ่ม, ไอเทมเริ่มต้น)
+CLASS_STATS = {
+    "warrior": (10, 4, ()),
+    "rogue": (5, 6, ("dagger",)),
+    "mage": (3, 8, ("fireball scroll",)),
+    "necromancer": (15, 7, ("dead scroll",)),
+}
 
 class Character:
+    __slots__ = (
+        "name", "race", "char_class", "max_hp", "hp", "base_damage", "armor",
+        "gold", "exp", "level", "inventory", "status_effects", "has_orc_club",
+    )
+
     def __init__(self, name, race, char_class):
+        max_hp, base_damage, armor, race_items = RACE_STATS.get(race, (0, 0, 0, ()))
+        bonus_hp, bonus_damage, class_items = CLASS_STATS.get(char_class, (0, 0, ()))
         self.name = name
         self.race = race
         self.char_class = char_class
-        self.max_hp = 0
-        self.hp = 0
-        self.base_damage = 0
-        self.armor = 0
-        self.gold = 0
+        self.max_hp = max_hp + bonus_hp
+        self.hp = self.max_hp
+        self.base_damage = base_damage + bonus_damage
+        self.armor = armor
         self.exp = 0
         self.level = 1
-        self.inventory = []
+        self.inventory = new_inventory(race_items + class_items)
         self.status_effects = []
-        
-        # stat ตามเผ่า
-        if race == "human":
-            self.max_hp = 25
-            self.base_damage = 6
-            self.armor = 2
-        elif race == "elf":
-            self.max_hp = 20
-            self.base_damage = 8
-            self.armor = 1
-        elif race == "orc":
-            self.max_hp = 30
-            self.base_damage = 10
-            self.armor = 0
-            self.has_orc_club = True
-            self.inventory.append("orc's club")
-        elif race == "vampire":
-            self.max_hp = 35
-            self.base_damage = 9
-            self.armor = 3
-            self.inventory.append("vampire bite")
-        
-        # ปรับตามอาชีพ
-        if char_class == "warrior":
-            self.max_hp += 10
-            self.base_damage += 4
-        elif char_class == "rogue":
-            self.max_hp += 5
-            self.base_damage += 6
-            self.inventory.append("dagger")
-        elif char_class == "mage":
-            self.max_hp += 3
-            self.base_damage += 8
-            self.inventory.append("fireball scroll")
-        elif char_class == "necromancer":
-            self.max_hp += 15
-            self.base_damage += 7
-            self.inventory.append("dead scroll")
-        
-        self.hp = self.max_hp
-        self.gold = random.randint(10, 100)
+        self.has_orc_club = race == "orc"
+        self.gold = get_rng().randint(10, 100)
+    
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "race": self.race,
+            "char_class": self.char_class,
+            "max_hp": self.max_hp,
+            "hp": self.hp,
+            "base_damage": self.base_damage,
+            "armor": self.armor,
+            "gold": self.gold,
+            "exp": self.exp,
+            "level": self.level,
+            "inventory": self.inventory.quantities(),
+            "status_effects": list(self.status_effects)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        # ไม่ผ่าน __init__: ไม่ต้องสุ่มทองเริ่มต้นที่จะถูกทับอยู่ดี (ไม่กิน RNG ของเซสชัน)
+        player = cls.__new__(cls)
+        player.name = data['name']
+        player.race = data['race']
+        player.char_class = data['char_class']
+        player.max_hp = data['max_hp']
+        player.hp = data['hp']
+        player.base_damage = data['base_damage']
+        player.armor = data['armor']
+        player.gold = data['gold']
+        player.exp = data['exp']
+        player.level = data['level']
+        player.inventory = load_inventory(data['inventory'])
+        player.status_effects = list(data['status_effects'])
+        player.has_orc_club = player.race == "orc"
+        return player
     
     def show_stats(self):
         """แสดงสถานะตัวละคร"""
         print_separator()
-        print(f"{Colors.BOLD}{self.name} - ระดับ {self.level}{Colors.END}")
-        print(f"เผ่า: {self.race} | อาชีพ: {self.char_class}")
-        print(f"HP: {Colors.RED}{self.hp}/{self.max_hp}{Colors.END}")
-        print(f"โจมตี: {self.base_damage}")
-        print(f"เกราะ: {self.armor}")
-        print(f"ทอง: {Colors.YELLOW}{self.gold}{Colors.END} | EXP: {self.exp}")
+        say(f"{Colors.BOLD}{self.name} - ระดับ {self.level}{Colors.END}")
+        say(f"เผ่า: {self.race} | อาชีพ: {self.char_class}")
+        say(f"HP: {Colors.RED}{self.hp}/{self.max_hp}{Colors.END}")
+        say(f"โจมตี: {self.base_damage}")
+        say(f"เกราะ: {self.armor}")
+        say(f"ทอง: {Colors.YELLOW}{self.gold}{Colors.END} | EXP: {self.exp}")
         
         if self.inventory:
-            print(f"\n{Colors.CYAN}สิ่งของ:{Colors.END}")
+            say(f"\n{Colors.CYAN}สิ่งของ:{Colors.END}")
             for item in self.inventory:
-                print(f"  - {item}")
+                say(f"  - {item}")
         
         if self.status_effects:
-            print(f"\n{Colors.PURPLE}สถานะผิดปกติ:{Colors.END}")
+            say(f"\n{Colors.PURPLE}สถานะผิดปกติ:{Colors.END}")
             for effect in self.status_effects:
-                print(f"  - {effect}")
+                say(f"  - {effect}")
     
     def take_damage(self, damage):
         """รับความเสียหาย"""
@@ -408,9 +449,9 @@ class Character:
                 f"{Colors.RED}นิ้วมือขาดสามนิ้ว!{Colors.END}",
                 f"{Colors.RED}กระเพาะอาหารทะลุ!{Colors.END}"
             ]
-            print(f"{random.choice(critical_wounds)}")
+            say(f"{get_rng().choice(critical_wounds)}")
         
-        print(f"ได้รับความเสียหาย {actual_damage} หน่วย ({random.choice(wounds)})")
+        say(f"ได้รับความเสียหาย {actual_damage} หน่วย ({get_rng().choice(wounds)})")
         return self.hp > 0
     
     def heal(self, amount):
@@ -426,17 +467,17 @@ class Character:
             f"ร่างกายรู้สึกสดชื่นราวกับตื่นจากฝัน"
         ]
         
-        print(f"รักษาได้ {heal_amount} HP ({random.choice(heals)})")
+        say(f"รักษาได้ {heal_amount} HP ({get_rng().choice(heals)})")
         return heal_amount
 
 def create_character():
     """สร้างตัวละครใหม่"""
     clear_screen()
-    print(f"{Colors.BOLD}=== สร้างตัวละคร ==={Colors.END}")
+    say(f"{Colors.BOLD}=== สร้างตัวละคร ==={Colors.END}")
     
-    name = input("ชื่อตัวละครของคุณ: ")
+    name = ask("ชื่อตัวละครของคุณ: ")
     
-    print(f"\n{Colors.CYAN}เลือกเผ่า:{Colors.END}")
+    say(f"\n{Colors.CYAN}เลือกเผ่า:{Colors.END}")
     races = [
         ("human", "มนุษย์ - สมดุลทุกด้าน"),
         ("elf", "เอลฟ์ - โจมตีแม่นยำ, HP น้อย"),
@@ -445,12 +486,12 @@ def create_character():
     ]
     
     for i, (race_id, desc) in enumerate(races, 1):
-        print(f"{i}. {race_id.title()} - {desc}")
+        say(f"{i}. {race_id.title()} - {desc}")
     
-    race_choice = int(input("เลือกเผ่า (1-4): ")) - 1
+    race_choice = int(ask("เลือกเผ่า (1-4): ")) - 1
     selected_race = races[race_choice][0]
     
-    print(f"\n{Colors.CYAN}เลือกอาชีพ:{Colors.END}")
+    say(f"\n{Colors.CYAN}เลือกอาชีพ:{Colors.END}")
     classes = [
         ("warrior", "นักรบ - HP สูง, โจมตีหนัก"),
         ("rogue", "โจร - โจมตีรวดเร็ว, มีดสั้นเริ่มต้น"),
@@ -459,18 +500,18 @@ def create_character():
     ]
     
     for i, (class_id, desc) in enumerate(classes, 1):
-        print(f"{i}. {class_id.title()} - {desc}")
+        say(f"{i}. {class_id.title()} - {desc}")
     
-    class_choice = int(input("เลือกอาชีพ (1-4): ")) - 1
+    class_choice = int(ask("เลือกอาชีพ (1-4): ")) - 1
     selected_class = classes[class_choice][0]
     
     character = Character(name, selected_race, selected_class)
     
     clear_screen()
-    print(f"{Colors.GREEN}สร้างตัวละครสำเร็จ!{Colors.END}")
+    say(f"{Colors.GREEN}สร้างตัวละครสำเร็จ!{Colors.END}")
     character.show_stats()
     
-    input(f"\n{Colors.YELLOW}กด Enter เพื่อเริ่มการผจญภัย...{Colors.END}")
+    ask(f"\n{Colors.YELLOW}กด Enter เพื่อเริ่มการผจญภัย...{Colors.END}")
     return character
 
 def critical_success_effect(attacker, defender, monster_data=None):
@@ -496,17 +537,17 @@ def critical_success_effect(attacker, defender, monster_data=None):
         }
     ]
     
-    effect = random.choice(effects)
+    effect = get_rng().choice(effects)
     
     # ถ้ามีข้อมูลมอนสเตอร์พิเศษ
     if monster_data and "gore_texts" in monster_data:
-        gore_text = random.choice(monster_data["gore_texts"]["crit_hit"])
-        print(f"{Colors.RED}{gore_text}{Colors.END}")
+        gore_text = get_rng().choice(monster_data["gore_texts"]["crit_hit"])
+        say(f"{Colors.RED}{gore_text}{Colors.END}")
     elif monster_data and "nsfw_texts" in monster_data:
-        nsfw_text = random.choice(monster_data["nsfw_texts"]["crit_hit"])
-        print(f"{Colors.PURPLE}{nsfw_text}{Colors.END}")
+        nsfw_text = get_rng().choice(monster_data["nsfw_texts"]["crit_hit"])
+        say(f"{Colors.PURPLE}{nsfw_text}{Colors.END}")
     else:
-        print(effect["text"])
+        say(effect["text"])
     
     return effect["damage_multiplier"]
 
@@ -535,17 +576,17 @@ def critical_fail_effect(attacker, defender, monster_data=None):
         }
     ]
     
-    fail = random.choice(fails)
+    fail = get_rng().choice(fails)
     
     # ถ้ามีข้อมูลมอนสเตอร์พิเศษ
     if monster_data and "gore_texts" in monster_data:
-        gore_text = random.choice(monster_data["gore_texts"]["crit_fail"])
-        print(f"{Colors.RED}{gore_text}{Colors.END}")
+        gore_text = get_rng().choice(monster_data["gore_texts"]["crit_fail"])
+        say(f"{Colors.RED}{gore_text}{Colors.END}")
     elif monster_data and "nsfw_texts" in monster_data:
-        nsfw_text = random.choice(monster_data["nsfw_texts"]["crit_fail"])
-        print(f"{Colors.PURPLE}{nsfw_text}{Colors.END}")
+        nsfw_text = get_rng().choice(monster_data["nsfw_texts"]["crit_fail"])
+        say(f"{Colors.PURPLE}{nsfw_text}{Colors.END}")
     else:
-        print(fail["text"])
+        say(fail["text"])
     
     # สร้างความเสียหายให้ตัวเอง
     if fail.get("damage_to_self", 0) > 0:
@@ -557,216 +598,322 @@ def critical_fail_effect(attacker, defender, monster_data=None):
     
     return fail.get("next_enemy_bonus", 1)
 
-def combat_turn(player, monster, monster_data):
-    """เทิร์นการต่อสู้"""
+# === การต่อสู้ (state machine) ===
+# การต่อสู้หนึ่งครั้งเป็น FightState ที่รอคำตอบของผู้เล่นอยู่ที่ prompt หนึ่ง
+# combat_step(state, action) เดินหนึ่งขั้นแล้วคืน (state, events) ไม่มีการรอ input ข้างใน
+# จึงพักการต่อสู้ไว้ระหว่างรอผู้เล่น (to_dict) แล้วเล่นต่อที่ worker อื่น (from_dict) ได้
+# events: ("hit", ดาเมจ) ("hurt", ดาเมจ) ("victory", key) ("defeat", key) ("fled", key)
+FIGHT_PROMPTS = {
+    "begin": f"\n{Colors.YELLOW}กด Enter เพื่อเริ่มการต่อสู้...{Colors.END}",
+    "action": "เลือกการกระทำ: ",
+    "item": "เลือกไอเทมที่จะใช้ (หรือกด 0 เพื่อยกเลิก): ",
+    "next": f"\n{Colors.YELLOW}กด Enter สำหรับเทิร์นต่อไป...{Colors.END}",
+}
+
+FIGHT_ACTIONS = [
+    ("1", "โจมตี"),
+    ("2", "ใช้สกิลพิเศษ"),
+    ("3", "ใช้ไอเทม"),
+    ("4", "ตั้งรับ"),
+    ("5", "วิ่งหนี"),
+]
+
+class FightState:
+    """การต่อสู้หนึ่งครั้งกับมอนสเตอร์ monster_key"""
+    __slots__ = ("player", "monster_key", "monster", "monster_data", "phase")
+
+    def __init__(self, player, monster_key):
+        self.player = player
+        self.monster_key = monster_key
+        self.monster_data = get_monster_data(monster_key)
+        self.monster = spawn_monster(self.monster_data)
+        self.phase = "begin"  # begin / action / item / next รอคำตอบ, won / lost / fled จบแล้ว
+
+    @property
+    def prompt(self):
+        return FIGHT_PROMPTS.get(self.phase)
+
+    @property
+    def finished(self):
+        return self.phase in ("won", "lost", "fled")
+
+    def to_dict(self):
+        return {
+            "player": self.player.to_dict(),
+            "monster": self.monster_key,
+            "monster_hp": self.monster['hp'],
+            "phase": self.phase
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(Character.from_dict(data['player']), data['monster'])
+        state.monster['hp'] = data['monster_hp']
+        state.phase = data['phase']
+        return state
+
+def show_turn(state):
+    """หัวเทิร์น: HP ทั้งสองฝ่ายและตัวเลือก"""
+    player, monster = state.player, state.monster
     print_separator()
-    print(f"{Colors.BOLD}HP คุณ: {player.hp}/{player.max_hp} | HP {monster['name']}: {monster['hp']}{Colors.END}")
-    
-    # ตัวเลือกการกระทำ
-    actions = [
-        ("1", "โจมตี", "attack"),
-        ("2", "ใช้สกิลพิเศษ", "skill"),
-        ("3", "ใช้ไอเทม", "item"),
-        ("4", "ตั้งรับ", "defend"),
-        ("5", "วิ่งหนี", "flee")
+    say(f"{Colors.BOLD}HP คุณ: {player.hp}/{player.max_hp} | HP {monster['name']}: {monster['hp']}{Colors.END}")
+    
+    say(f"\n{Colors.CYAN}เลือกการกระทำ:{Colors.END}")
+    for action_id, action_name in FIGHT_ACTIONS:
+        say(f"{action_id}. {action_name}")
+    state.phase = "action"
+
+def player_attack(player, monster, monster_data):
+    """โจมตีพื้นฐาน คืน (ดาเมจของผู้เล่น, โบนัสดาเมจของศัตรู)"""
+    say(f"\n{Colors.YELLOW}คุณทอยเต๋า d20 เพื่อโจมตี...{Colors.END}")
+    pause(1)
+    
+    attack_roll = roll_dice(20)
+    say(f"ทอยได้: {attack_roll}")
+    
+    if attack_roll == 20:  # Critical Success
+        say(f"{Colors.GREEN} CRITICAL SUCCESS! {Colors.END}")
+        multiplier = critical_success_effect(player, monster, monster_data)
+        damage = roll_dice(player.base_damage) * multiplier
+        return int(damage), 1
+        
+    if attack_roll == 1:  # Critical Fail
+        say(f"{Colors.RED} CRITICAL FAILURE! {Colors.END}")
+        return 0, critical_fail_effect(player, monster, monster_data)
+        
+    if attack_roll >= 10:  #โจมตีปกติ
+        damage = roll_dice(player.base_damage)
+        hits = [
+            f"คุณฟันบ่าศัตรูเลือดสาด",
+            f"คุณแทงท้องศัตรูทะลุหลังบางส่วน",
+            f"คุณทุบเข่าศัตรูเสียงดังกร๊อบ"
+        ]
+        say(f"{Colors.GREEN}โจมตีสำเร็จ! {get_rng().choice(hits)}{Colors.END}")
+        return damage, 1
+        
+    # โจมตีพลาด
+    misses = [
+        f"ศัตรูหลบได้อย่างฉิวเฉียด",
+        f"อาวุธของคุณสะท้อนกับเกราะ",
+        f"คุณพลาดเป้าหมายไปไกล"
     ]
+    say(f"{Colors.RED}โจมตีพลาด! {get_rng().choice(misses)}{Colors.END}")
+    return 0, 1
+
+def player_skill(player):
+    """สกิลพิเศษของอาชีพ คืนดาเมจของผู้เล่น"""
+    skills = {
+        "warrior": ("ฟันรุนแรง", "โจมตีแรงเป็นสองเท่า แต่เสี่ยงพลาดสูง", 2, 15),
+        "rogue": ("แทงข้างหลัง", "โจมตีเพิ่มความเสียหายหากศัตรูเผลอ", 1.5, 12),
+        "mage": ("ไฟร์บอล", "ลูกไฟทำความเสียหายเวท", 3, 10),
+        "necromancer": ("ดูดเลือด", "ดูด HP ศัตรูมาฟื้นฟูตัวเอง", 1, 8)
+    }
+    
+    skill_name, skill_desc, multiplier, required_roll = skills[player.char_class]
+    say(f"\n{Colors.PURPLE}ใช้สกิล: {skill_name}{Colors.END}")
+    say(f"{skill_desc}")
+    
+    skill_roll = roll_dice(20)
+    say(f"ทอยเต๋าสกิลได้: {skill_roll}")
     
-    print(f"\n{Colors.CYAN}เลือกการกระทำ:{Colors.END}")
-    for action_id, action_name, _ in actions:
-        print(f"{action_id}. {action_name}")
+    if skill_roll >= required_roll:
+        damage = roll_dice(player.base_damage) * multiplier
+        
+        skill_success = [
+            f"สกิลสำเร็จอย่างงดงาม!",
+            f"พลังอันตรายพุ่งเข้าหาศัตรู!",
+            f"ศัตรูไม่สามารถต้านทานได้!"
+        ]
+        say(f"{Colors.GREEN}{get_rng().choice(skill_success)}{Colors.END}")
+        return int(damage)
+    say(f"{Colors.RED}สกิลล้มเหลว!{Colors.END}")
+    return 0
+
+def use_fight_item(player, item_choice):
+    """ใช้ไอเทมลำดับที่เลือก คืนดาเมจของผู้เล่น (ยกเลิก/เลือกผิดก็เสียเทิร์น)"""
+    if not item_choice:
+        return 0
+    try:
+        idx = int(item_choice) - 1
+    except ValueError:
+        return 0
+    if not 0 <= idx < len(player.inventory):
+        return 0
+    used_item = player.inventory.pop(idx)
+    say(f"ใช้ {used_item}!")
     
-    choice = input("เลือกการกระทำ: ")
+    if "potion" in used_item:
+        heal_amount = get_rng().randint(15, 25)
+        player.heal(heal_amount)
+    elif "dagger" in used_item:
+        say(f"ใช้มีดสั้นโจมตีเพิ่ม!")
+        return roll_dice(6) + 2
+    return 0
+
+def enemy_attack(player, monster, enemy_damage_bonus):
+    """ศัตรูโจมตีกลับ คืนดาเมจที่ผู้เล่นได้รับ"""
+    say(f"\n{Colors.RED}>>> {monster['name']} โจมตีกลับ! <<<{Colors.END}")
+    pause(1)
     
-    player_damage = 0
-    enemy_damage_bonus = 1
+    attack_roll = roll_dice(20)
     
-    if choice == "1":  # โจมตีพื้นฐาน
-        print(f"\n{Colors.YELLOW}คุณทอยเต๋า d20 เพื่อโจมตี...{Colors.END}")
-        time.sleep(1)
+    if attack_roll == 20:  # ศัตรู Critical Success
+        say(f"{Colors.RED} ศัตรู CRITICAL SUCCESS! {Colors.END}")
         
-        attack_roll = roll_dice(20)
-        print(f"ทอยได้: {attack_roll}")
+        # คำอธิบาย Critical Success ของศัตรู
+        crits = [
+            f"{monster['name']} ฉีกแขนคุณจนเกือบขาด!",
+            f"{monster['name']} กัดคอคุณเลือดพ่น!",
+            f"{monster['name']} ทุบหน้าอกคุณจนกระดูกหัก!"
+        ]
+        say(get_rng().choice(crits))
         
-        if attack_roll == 20:  # Critical Success
-            print(f"{Colors.GREEN} CRITICAL SUCCESS! {Colors.END}")
-            multiplier = critical_success_effect(player, monster, monster_data)
-            damage = roll_dice(player.base_damage) * multiplier
-            player_damage = int(damage)
-            
-        elif attack_roll == 1:  # Critical Fail
-            print(f"{Colors.RED} CRITICAL FAILURE! {Colors.END}")
-            enemy_damage_bonus = critical_fail_effect(player, monster, monster_data)
-            player_damage = 0
-            
-        elif attack_roll >= 10:  #โจมตีปกติ
-            damage = roll_dice(player.base_damage)
-            hits = [
-                f"คุณฟันบ่าศัตรูเลือดสาด",
-                f"คุณแทงท้องศัตรูทะลุหลังบางส่วน",
-                f"คุณทุบเข่าศัตรูเสียงดังกร๊อบ"
-            ]
-            print(f"{Colors.GREEN}โจมตีสำเร็จ! {random.choice(hits)}{Colors.END}")
-            player_damage = damage
-            
-        else:  # โจมตีพลาด
-            misses = [
-                f"ศัตรูหลบได้อย่างฉิวเฉียด",
-                f"อาวุธของคุณสะท้อนกับเกราะ",
-                f"คุณพลาดเป้าหมายไปไกล"
-            ]
-            print(f"{Colors.RED}โจมตีพลาด! {random.choice(misses)}{Colors.END}")
-            player_damage = 0
-    
-    elif choice == "2":  # ใช้สกิลพิเศษ
-        skills = {
-            "warrior": ("ฟันรุนแรง", "โจมตีแรงเป็นสองเท่า แต่เสี่ยงพลาดสูง", 2, 15),
-            "rogue": ("แทงข้างหลัง", "โจมตีเพิ่มความเสียหายหากศัตรูเผลอ", 1.5, 12),
-            "mage": ("ไฟร์บอล", "ลูกไฟทำความเสียหายเวท", 3, 10),
-            "necromancer": ("ดูดเลือด", "ดูด HP ศัตรูมาฟื้นฟูตัวเอง", 1, 8)
-        }
+        enemy_damage = roll_dice(monster['max_dmg'], monster['min_dmg']) * 2
+        enemy_damage *= enemy_damage_bonus
         
-        skill_name, skill_desc, multiplier, required_roll = skills[player.char_class]
-        print(f"\n{Colors.PURPLE}ใช้สกิล: {skill_name}{Colors.END}")
-        print(f"{skill_desc}")
+    elif attack_roll == 1:  # ศัตรู Critical Fail
+        say(f"{Colors.GREEN} ศัตรู CRITICAL FAILURE! {Colors.END}")
         
-        skill_roll = roll_dice(20)
-        print(f"ทอยเต๋าสกิลได้: {skill_roll}")
+        fails = [
+            f"{monster['name']} ลื่นบนเลือดตัวเองล้ม!",
+            f"{monster['name']} โจมตีพลาดจนอาวุธหัก!",
+            f"{monster['name']} เตะโดนอะไรแข็งจนนิ้วเท้าหัก!"
+        ]
+        say(get_rng().choice(fails))
         
-        if skill_roll >= required_roll:
-            damage = roll_dice(player.base_damage) * multiplier
-            player_damage = int(damage)
-            
-            skill_success = [
-                f"สกิลสำเร็จอย่างงดงาม!",
-                f"พลังอันตรายพุ่งเข้าหาศัตรู!",
-                f"ศัตรูไม่สามารถต้านทานได้!"
-            ]
-            print(f"{Colors.GREEN}{random.choice(skill_success)}{Colors.END}")
-        else:
-            print(f"{Colors.RED}สกิลล้มเหลว!{Colors.END}")
-            player_damage = 0
-    
-    elif choice == "3":  # ใช้ไอเทม
-        if player.inventory:
-            print(f"\n{Colors.CYAN}ไอเทมในกระเป๋า:{Colors.END}")
-            for i, item in enumerate(player.inventory, 1):
-                print(f"{i}. {item}")
-            
-            item_choice = input("เลือกไอเทมที่จะใช้ (หรือกด 0 เพื่อยกเลิก): ")
-            if item_choice:
-                idx = int(item_choice) - 1
-                if 0 <= idx < len(player.inventory):
-                    used_item = player.inventory.pop(idx)
-                    print(f"ใช้ {used_item}!")
-                    
-                    if "potion" in used_item:
-                        heal_amount = random.randint(15, 25)
-                        player.heal(heal_amount)
-                    elif "dagger" in used_item:
-                        player_damage = roll_dice(6) + 2
-                        print(f"ใช้มีดสั้นโจมตีเพิ่ม!")
-        else:
-            print(f"{Colors.RED}ไม่มีไอเทม!{Colors.END}")
-    
-    elif choice == "4":  # ตั้งรับ
-        print(f"{Colors.BLUE}คุณตั้งท่าป้องกัน...{Colors.END}")
-        player.armor += 3
-        return 0, 1  # ไม่โจมตี, โบนัสศัตรูปกติ
-    
-    elif choice == "5":  # วิ่งหนี
-        flee_roll = roll_dice(20)
-        if flee_roll > 12:
-            print(f"{Colors.GREEN}คุณหนีรอดได้!{Colors.END}")
-            return "flee", 1
-        else:
-            print(f"{Colors.RED}คุณหนีไม่รอด!{Colors.END}")
-            # ศัตรูได้โบนัสเมื่อคุณพยายามหนี
-            return 0, 1.5
+        enemy_damage = 0
+        # ศัตรูทำร้ายตัวเอง
+        self_damage = roll_dice(3)
+        monster['hp'] -= self_damage
+        say(f"{monster['name']} ทำร้ายตัวเอง {self_damage} หน่วย!")
+        
+    elif attack_roll >= 8:  # ศัตรูโจมตีสำเร็จปกติ
+        enemy_damage = roll_dice(monster['max_dmg'] - monster['min_dmg'] + 1, monster['min_dmg'] - 1)
+        enemy_damage *= enemy_damage_bonus
+        
+        hits = [
+            f"{monster['name']} โจมตีโดนคุณ!",
+            f"{monster['name']} ข่วนคุณเลือดออก!",
+            f"{monster['name']} ต่อยคุณจนเลือดกำเดาไหล!"
+        ]
+        say(get_rng().choice(hits))
+        
+    else:  # ศัตรูโจมตีพลาด
+        say(f"{Colors.GREEN}{monster['name']} โจมตีพลาด!{Colors.END}")
+        enemy_damage = 0
     
-    # ศัตรูโจมตีกลับ (ถ้าผู้เล่นไม่ได้หนี)
-    if choice != "5" or (choice == "5" and player_damage == 0):
-        print(f"\n{Colors.RED}>>> {monster['name']} โจมตีกลับ! <<<{Colors.END}")
-        time.sleep(1)
+    # ศัตรูสร้างความเสียหาย
+    if enemy_damage > 0:
+        player.take_damage(int(enemy_damage))
+    return int(enemy_damage)
+
+def combat_step(state, action):
+    """ใส่คำตอบของผู้เล่นหนึ่งครั้ง แล้วเดินการต่อสู้ไปจนถึง prompt ถัดไป (หรือจบ)"""
+    player, monster, monster_data = state.player, state.monster, state.monster_data
+    events = []
+
+    if state.phase in ("begin", "next"):
+        show_turn(state)
+        return state, events
+
+    if state.phase == "action":
+        player_damage = 0
+        if action == "1":  # โจมตีพื้นฐาน
+            player_damage, enemy_damage_bonus = player_attack(player, monster, monster_data)
+        elif action == "2":  # ใช้สกิลพิเศษ
+            player_damage, enemy_damage_bonus = player_skill(player), 1
+        elif action == "3":  # ใช้ไอเทม
+            if player.inventory:
+                say(f"\n{Colors.CYAN}ไอเทมในกระเป๋า:{Colors.END}")
+                for i, item in enumerate(player.inventory, 1):
+                    say(f"{i}. {item}")
+                state.phase = "item"
+                return state, events
+            say(f"{Colors.RED}ไม่มีไอเทม!{Colors.END}")
+            enemy_damage_bonus = 1
+        elif action == "4":  # ตั้งรับ: ศัตรูไม่ได้โจมตีในเทิร์นนี้
+            say(f"{Colors.BLUE}คุณตั้งท่าป้องกัน...{Colors.END}")
+            player.armor += 3
+            enemy_damage_bonus = None
+        elif action == "5":  # วิ่งหนี
+            if roll_dice(20) > 12:
+                say(f"{Colors.GREEN}คุณหนีรอดได้!{Colors.END}")
+                state.phase = "fled"
+                events.append(("fled", state.monster_key))
+                return state, events
+            say(f"{Colors.RED}คุณหนีไม่รอด!{Colors.END}")
+            enemy_damage_bonus = None
+        else:
+            enemy_damage_bonus = 1
+    elif state.phase == "item":
+        player_damage = use_fight_item(player, action)
+        enemy_damage_bonus = 1
+    else:
+        raise ValueError(f"การต่อสู้จบไปแล้ว ({state.phase})")
+
+    # ศัตรูโจมตีกลับ
+    if enemy_damage_bonus is not None:
+        enemy_damage = enemy_attack(player, monster, enemy_damage_bonus)
+        if enemy_damage > 0:
+            events.append(("hurt", enemy_damage))
+
+    # ผู้เล่นสร้างความเสียหายให้มอนสเตอร์
+    if player_damage > 0:
+        monster['hp'] -= player_damage
+        say(f"{Colors.GREEN}สร้างความเสียหาย {player_damage} หน่วยให้ {monster['name']}!{Colors.END}")
+        events.append(("hit", player_damage))
+
+    # เช็คสถานะมอนสเตอร์
+    if monster['hp'] <= 0:
+        say(f"\n{Colors.GREEN}✨ คุณสังหาร {monster['name']} ได้! ✨{Colors.END}")
         
-        enemy_attack = roll_dice(20)
+        # รางวัล
+        exp_gain = monster['max_dmg'] * 5
+        gold_gain = get_rng().randint(10, 30)
         
-        if enemy_attack == 20:  # ศัตรู Critical Success
-            print(f"{Colors.RED} ศัตรู CRITICAL SUCCESS! {Colors.END}")
-            
-            # คำอธิบาย Critical Success ของศัตรู
-            crits = [
-                f"{monster['name']} ฉีกแขนคุณจนเกือบขาด!",
-                f"{monster['name']} กัดคอคุณเลือดพ่น!",
-                f"{monster['name']} ทุบหน้าอกคุณจนกระดูกหัก!"
-            ]
-            print(random.choice(crits))
-            
-            enemy_damage = roll_dice(monster['max_dmg'], monster['min_dmg']) * 2
-            enemy_damage *= enemy_damage_bonus
-            
-        elif enemy_attack == 1:  # ศัตรู Critical Fail
-            print(f"{Colors.GREEN} ศัตรู CRITICAL FAILURE! {Colors.END}")
-            
-            fails = [
-                f"{monster['name']} ลื่นบนเลือดตัวเองล้ม!",
-                f"{monster['name']} โจมตีพลาดจนอาวุธหัก!",
-                f"{monster['name']} เตะโดนอะไรแข็งจนนิ้วเท้าหัก!"
-            ]
-            print(random.choice(fails))
-            
-            enemy_damage = 0
-            # ศัตรูทำร้ายตัวเอง
-            self_damage = roll_dice(3)
-            monster['hp'] -= self_damage
-            print(f"{monster['name']} ทำร้ายตัวเอง {self_damage} หน่วย!")
-            
-        elif enemy_attack >= 8:  # ศัตรูโจมตีสำเร็จปกติ
-            enemy_damage = roll_dice(monster['max_dmg'] - monster['min_dmg'] + 1, monster['min_dmg'] - 1)
-            enemy_damage *= enemy_damage_bonus
-            
-            hits = [
-                f"{monster['name']} โจมตีโดนคุณ!",
-                f"{monster['name']} ข่วนคุณเลือดออก!",
-                f"{monster['name']} ต่อยคุณจนเลือดกำเดาไหล!"
-            ]
-            print(random.choice(hits))
-            
-        else:  # ศัตรูโจมตีพลาด
-            print(f"{Colors.GREEN}{monster['name']} โจมตีพลาด!{Colors.END}")
-            enemy_damage = 0
+        player.exp += exp_gain
+        player.gold += gold_gain
         
-        # ลดเกราะที่เพิ่มจากตั้งรับ
-        if choice == "4":
-            player.armor -= 3
+        say(f"ได้รับ {exp_gain} EXP และ {gold_gain} GP")
         
-        # ศัตรูสร้างความเสียหาย
-        if enemy_damage > 0:
-            player.take_damage(int(enemy_damage))
-    
-    return player_damage, enemy_damage_bonus
+        # เลเวลอัพ
+        if player.exp >= player.level * 100:
+            player.level += 1
+            player.max_hp += 10
+            player.hp = player.max_hp
+            player.base_damage += 2
+            say(f"{Colors.CYAN}✨ ระดับขึ้น! ตอนนี้ระดับ {player.level} ✨{Colors.END}")
+        
+        # โอกาสได้ไอเทม
+        if roll_dice(20) > 15:
+            loot_items = ["น้ำยาบำบัด", "มีดสั้น", "แหวนพิศวง"]
+            loot = get_rng().choice(loot_items)
+            player.inventory.append(loot)
+            say(f"พบไอเทม: {loot}")
+        state.phase = "won"
+        events.append(("victory", state.monster_key))
+    elif player.hp <= 0:
+        state.phase = "lost"
+        events.append(("defeat", state.monster_key))
+    else:
+        state.phase = "next"
+    return state, events
+
+def random_monster_key():
+    """สุ่มมอนสเตอร์ที่จะเจอ"""
+    monsters, _ = load_data()
+    return get_rng().choice(list(monsters))
 
 def random_encounter():
     """สุ่มการเผชิญหน้ากับมอนสเตอร์"""
-    monsters, _ = load_data()
-    monster_list = list(monsters.values())
-    monster = random.choice(monster_list)
-    
-    # สร้าง instance ของมอนสเตอร์
-    monster_instance = {
-        'name': monster['name'],
-        'hp': monster['hp'],
-        'min_dmg': monster['min_dmg'],
-        'max_dmg': monster['max_dmg'],
-        'description': monster['description']
-    }
-    
-    return monster_instance, monster
+    monster = get_monster_data(random_monster_key())
+    return spawn_monster(monster), monster
 
 def shop(player):
     """ร้านค้า"""
     clear_screen()
-    print(f"{Colors.YELLOW}=== ร้านค้าผิดกฎหมาย ==={Colors.END}")
-    print("เจ้าของร้านตาเดียวมองคุณด้วยความสงสัย...")
+    say(f"{Colors.YELLOW}=== ร้านค้าผิดกฎหมาย ==={Colors.END}")
+    say("เจ้าของร้านตาเดียวมองคุณด้วยความสงสัย...")
     
     items_for_sale = [
         ("น้ำยาบำบัดดำ", "ฟื้นฟู 25-40 HP (อาจมีผลข้างเคียง)", 30),
@@ -776,17 +923,17 @@ def shop(player):
         ("เครื่องสั่นประหลาด", "ทำให้ศัตรูสับสน 2 เทิร์น", 40)
     ]
     
-    print(f"\n{Colors.CYAN}ทองของคุณ: {player.gold} GP{Colors.END}")
+    say(f"\n{Colors.CYAN}ทองของคุณ: {player.gold} GP{Colors.END}")
     print_separator()
     
     for i, (name, desc, price) in enumerate(items_for_sale, 1):
-        print(f"{i}. {name} - {price} GP")
-        print(f"   {desc}")
+        say(f"{i}. {name} - {price} GP")
+        say(f"   {desc}")
     
-    print(f"\n{len(items_for_sale)+1}. ออกจากร้าน")
+    say(f"\n{len(items_for_sale)+1}. ออกจากร้าน")
     
     while True:
-        choice = input("\nเลือกสินค้า: ")
+        choice = ask("\nเลือกสินค้า: ")
         
         if choice == str(len(items_for_sale)+1):
             break
@@ -799,165 +946,144 @@ def shop(player):
                 if player.gold >= price:
                     player.gold -= price
                     player.inventory.append(item_name)
-                    print(f"{Colors.GREEN}ซื้อ {item_name} สำเร็จ!{Colors.END}")
+                    say(f"{Colors.GREEN}ซื้อ {item_name} สำเร็จ!{Colors.END}")
                 else:
-                    print(f"{Colors.RED}ทองไม่พอ!{Colors.END}")
+                    say(f"{Colors.RED}ทองไม่พอ!{Colors.END}")
         except:
-            print(f"{Colors.RED}ตัวเลือกไม่ถูกต้อง!{Colors.END}")
+            say(f"{Colors.RED}ตัวเลือกไม่ถูกต้อง!{Colors.END}")
         
-        print(f"ทองคงเหลือ: {player.gold} GP")
+        say(f"ทองคงเหลือ: {player.gold} GP")
 
-def main():
-    """ฟังก์ชันหลักของเกม"""
+class Adventure:
+    """สถานะของการผจญภัย (snapshot ใน journal)"""
+    def __init__(self, player=None):
+        self.player = player
+        self.enemies_defeated = 0
+
+    def to_dict(self):
+        return {"player": self.player.to_dict(), "enemies_defeated": self.enemies_defeated}
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(Character.from_dict(data['player']))
+        state.enemies_defeated = data['enemies_defeated']
+        return state
+
+def intro():
+    """ข้อตกลง + สร้างหรือโหลดตัวละคร คืน Character หรือ None ถ้าออกจากเกม"""
     clear_screen()
-    print(f"{Colors.BOLD}{Colors.PURPLE}=== CLI DUNGEONS - UNCUT EDITION ==={Colors.END}")
-    print("เกมนี้มีเนื้อหาทางเพศและความรุนแรง")
-    print("เล่นต่อหมายความว่ายอมรับเนื้อหาทั้งหมด")
+    say(f"{Colors.BOLD}{Colors.PURPLE}=== CLI DUNGEONS - UNCUT EDITION ==={Colors.END}")
+    say("เกมนี้มีเนื้อหาทางเพศและความรุนแรง")
+    say("เล่นต่อหมายความว่ายอมรับเนื้อหาทั้งหมด")
     print_separator()
     
-    consent = input("ยอมรับข้อตกลง? (Y/n): ").lower()
+    consent = ask("ยอมรับข้อตกลง? (Y/n): ").lower()
     if consent != 'y':
-        print("ออกจากเกม")
-        return
+        say("ออกจากเกม")
+        return None
     
     # สร้างหรือโหลดตัวละคร
-    print("\n1. สร้างตัวละครใหม่")
-    print("2. โหลดตัวละคร")
-    print("3. ออกจากเกม")
+    say("\n1. สร้างตัวละครใหม่")
+    say("2. โหลดตัวละคร")
+    say("3. ออกจากเกม")
     
-    start_choice = input("เลือก: ")
+    start_choice = ask("เลือก: ")
     
     if start_choice == "1":
         player = create_character()
-        enemies_defeated = 0 
     elif start_choice == "2":
-        player, enemies_defeated = load_game()
+        player, _ = load_game()  # ลูปหลักนับศัตรูที่กำจัดใหม่จาก 0 เสมอ
     if player is None:  # ถ้าโหลดไม่สำเร็จ
         player = create_character()
-        enemies_defeated = 0
     elif start_choice == "3":
-        return
+        return None
     else:
-        print("เริ่มเกมใหม่")
+        say("เริ่มเกมใหม่")
         player = create_character()
-        enemies_defeated = 0
 
-    # เริ่มเกมหลัก
-    game_active = True
-    enemies_defeated = 0
+    return player
+
+def adventure(state=None):
+    """ลูปหลักของเกม (เริ่มจาก intro() ถ้ายังไม่มีตัวละคร) คืน Adventure สุดท้าย"""
+    if state is None:
+        state = Adventure()
+    if state.player is None:
+        state.player = intro()
+        if state.player is None:
+            return state
+    player = state.player
     
-    while game_active and player.hp > 0:
+    while player.hp > 0:
+        checkpoint(state)
         clear_screen()
-        print(f"{Colors.BOLD}=== การผจญภัย ==={Colors.END}")
-        print(f"ศัตรูที่กำจัดแล้ว: {enemies_defeated}")
+        say(f"{Colors.BOLD}=== การผจญภัย ==={Colors.END}")
+        say(f"ศัตรูที่กำจัดแล้ว: {state.enemies_defeated}")
         player.show_stats()
         
         print_separator()
-        print("เลือกการกระทำ:")
-        print("1. สำรวจดันเจี้ยน")
-        print("2. หาร้านค้า")
-        print("3. พักผ่อน (ฟื้นฟู HP)")
-        print("4. บันทึกเกม")
-        print("5. ออกจากเกม")
+        say("เลือกการกระทำ:")
+        say("1. สำรวจดันเจี้ยน")
+        say("2. หาร้านค้า")
+        say("3. พักผ่อน (ฟื้นฟู HP)")
+        say("4. บันทึกเกม")
+        say("5. ออกจากเกม")
         
-        choice = input("เลือก: ")
+        choice = ask("เลือก: ")
         
         if choice == "1":  # สำรวจดันเจี้ยน
             clear_screen()
-            print(f"{Colors.YELLOW}คุณเดินลึกลงไปในดันเจี้ยน...{Colors.END}")
-            time.sleep(1)
+            say(f"{Colors.YELLOW}คุณเดินลึกลงไปในดันเจี้ยน...{Colors.END}")
+            pause(1)
             
             encounter_roll = roll_dice(20)
             
             if encounter_roll <= 15:  # เผชิญหน้ามอนสเตอร์
-                monster_instance, monster_data = random_encounter()
-                print(f"\n{Colors.RED}  เผชิญหน้ากับ {monster_instance['name']}! {Colors.END}")
-                print(f"{monster_instance['description']}")
+                fight = FightState(player, random_monster_key())
+                monster_instance, monster_data = fight.monster, fight.monster_data
+                say(f"\n{Colors.RED}  เผชิญหน้ากับ {monster_instance['name']}! {Colors.END}")
+                say(f"{monster_instance['description']}")
                 
                 # แสดงข้อความพิเศษของมอนสเตอร์บางชนิด
                 if monster_instance['name'] == "ซักคิวบัส" and "nsfw_texts" in monster_data:
-                    special_text = random.choice(monster_data["nsfw_texts"]["special"])
-                    print(f"\n{Colors.PURPLE}{special_text}{Colors.END}")
-                
-                input(f"\n{Colors.YELLOW}กด Enter เพื่อเริ่มการต่อสู้...{Colors.END}")
+                    special_text = get_rng().choice(monster_data["nsfw_texts"]["special"])
+                    say(f"\n{Colors.PURPLE}{special_text}{Colors.END}")
                 
                 # การต่อสู้
-                while monster_instance['hp'] > 0 and player.hp > 0:
-                    player_damage, _ = combat_turn(player, monster_instance, monster_data)
-                    
-                    if player_damage == "flee":
-                        break
-                    
-                    # ผู้เล่นสร้างความเสียหายให้มอนสเตอร์
-                    if player_damage > 0:
-                        monster_instance['hp'] -= player_damage
-                        print(f"{Colors.GREEN}สร้างความเสียหาย {player_damage} หน่วยให้ {monster_instance['name']}!{Colors.END}")
-                    
-                    # เช็คสถานะมอนสเตอร์
-                    if monster_instance['hp'] <= 0:
-                        print(f"\n{Colors.GREEN}✨ คุณสังหาร {monster_instance['name']} ได้! ✨{Colors.END}")
-                        
-                        # รางวัล
-                        exp_gain = monster_instance['max_dmg'] * 5
-                        gold_gain = random.randint(10, 30)
-                        
-                        player.exp += exp_gain
-                        player.gold += gold_gain
-                        enemies_defeated += 1
-                        
-                        print(f"ได้รับ {exp_gain} EXP และ {gold_gain} GP")
-                        
-                        # เลเวลอัพ
-                        if player.exp >= player.level * 100:
-                            player.level += 1
-                            player.max_hp += 10
-                            player.hp = player.max_hp
-                            player.base_damage += 2
-                            print(f"{Colors.CYAN}✨ ระดับขึ้น! ตอนนี้ระดับ {player.level} ✨{Colors.END}")
-                        
-                        # โอกาสได้ไอเทม
-                        if roll_dice(20) > 15:
-                            loot_items = ["น้ำยาบำบัด", "มีดสั้น", "แหวนพิศวง"]
-                            loot = random.choice(loot_items)
-                            player.inventory.append(loot)
-                            print(f"พบไอเทม: {loot}")
-                        
-                        input(f"\n{Colors.YELLOW}กด Enter เพื่อดำเนินการต่อ...{Colors.END}")
-                        break
-                    
-                    if player.hp <= 0:
-                        break
-                    
-                    input(f"\n{Colors.YELLOW}กด Enter สำหรับเทิร์นต่อไป...{Colors.END}")
+                while not fight.finished:
+                    combat_step(fight, ask(fight.prompt))
+                
+                if fight.phase == "won":
+                    state.enemies_defeated += 1
+                    ask(f"\n{Colors.YELLOW}กด Enter เพื่อดำเนินการต่อ...{Colors.END}")
             
             elif encounter_roll <= 18:  # พบสมบัติ
-                print(f"\n{Colors.YELLOW}💰 คุณพบหีบสมบัติ! 💰{Colors.END}")
+                say(f"\n{Colors.YELLOW}💰 คุณพบหีบสมบัติ! 💰{Colors.END}")
                 
-                treasure_type = random.choice(["gold", "item", "both"])
+                treasure_type = get_rng().choice(["gold", "item", "both"])
                 
                 if treasure_type in ["gold", "both"]:
-                    gold_found = random.randint(20, 60)
+                    gold_found = get_rng().randint(20, 60)
                     player.gold += gold_found
-                    print(f"พบทอง {gold_found} GP!")
+                    say(f"พบทอง {gold_found} GP!")
                 
                 if treasure_type in ["item", "both"]:
                     treasures = ["น้ำยาลึกลับ", "กุญแจพิศวง", "แผนที่สมบัติ", "กระดูกศักดิ์สิทธิ์"]
-                    treasure = random.choice(treasures)
+                    treasure = get_rng().choice(treasures)
                     player.inventory.append(treasure)
-                    print(f"พบไอเทม: {treasure}")
+                    say(f"พบไอเทม: {treasure}")
                 
-                input(f"\n{Colors.YELLOW}กด Enter เพื่อดำเนินการต่อ...{Colors.END}")
+                ask(f"\n{Colors.YELLOW}กด Enter เพื่อดำเนินการต่อ...{Colors.END}")
             
             else:  # ไม่พบอะไร
-                print(f"\n{Colors.WHITE}คุณเดินทางมาทั้งวันแต่ไม่พบอะไรน่าสนใจ...{Colors.END}")
-                input(f"\n{Colors.YELLOW}กด Enter เพื่อดำเนินการต่อ...{Colors.END}")
+                say(f"\n{Colors.WHITE}คุณเดินทางมาทั้งวันแต่ไม่พบอะไรน่าสนใจ...{Colors.END}")
+                ask(f"\n{Colors.YELLOW}กด Enter เพื่อดำเนินการต่อ...{Colors.END}")
         
         elif choice == "2":  # ร้านค้า
             shop(player)
         
         elif choice == "3":  # พักผ่อน
             clear_screen()
-            print(f"{Colors.BLUE}คุณพักผ่อนในที่ปลอดภัย...{Colors.END}")
+            say(f"{Colors.BLUE}คุณพักผ่อนในที่ปลอดภัย...{Colors.END}")
             
             heal_amount = min(15, player.max_hp - player.hp)
             if heal_amount > 0:
@@ -965,26 +1091,26 @@ def main():
                 
                 # โอกาสถูกโจมตีขณะพักผ่อน
                 if roll_dice(20) == 1:
-                    print(f"\n{Colors.RED}⚠️  คุณถูกโจมตีขณะนอนหลับ! {Colors.END}")
+                    say(f"\n{Colors.RED}⚠️  คุณถูกโจมตีขณะนอนหลับ! {Colors.END}")
                     surprise_damage = roll_dice(6)
                     player.take_damage(surprise_damage)
             else:
-                print("คุณรู้สึกสดชื่นอยู่แล้ว")
+                say("คุณรู้สึกสดชื่นอยู่แล้ว")
             
-            input(f"\n{Colors.YELLOW}กด Enter เพื่อดำเนินการต่อ...{Colors.END}")
+            ask(f"\n{Colors.YELLOW}กด Enter เพื่อดำเนินการต่อ...{Colors.END}")
         
         elif choice == "5":  # ออกเกม
-            print(f"\n{Colors.CYAN}ขอบคุณที่เล่นเกม!{Colors.END}")
-            print(f"คุณกำจัดศัตรูได้ {enemies_defeated} ตัว")
-            print(f"ระดับสุดท้าย: {player.level}")
-            game_active = False
+            say(f"\n{Colors.CYAN}ขอบคุณที่เล่นเกม!{Colors.END}")
+            say(f"คุณกำจัดศัตรูได้ {state.enemies_defeated} ตัว")
+            say(f"ระดับสุดท้าย: {player.level}")
+            break
     
     # Game Over
     if player.hp <= 0:
         clear_screen()
-        print(f"{Colors.RED}{'='*50}{Colors.END}")
-        print(f"{Colors.RED}{Colors.BOLD} GAME OVER {Colors.END}")
-        print(f"{Colors.RED}{'='*50}{Colors.END}")
+        say(f"{Colors.RED}{'='*50}{Colors.END}")
+        say(f"{Colors.RED}{Colors.BOLD} GAME OVER {Colors.END}")
+        say(f"{Colors.RED}{'='*50}{Colors.END}")
         
         death_scenes = [
             "ร่างกายคุณเริ่มเย็นลง... โลกมืดค่อย ๆ มืด... เสียงสุดท้ายที่ได้ยินคือเสียงหัวใจตัวเอง",
@@ -993,11 +1119,42 @@ def main():
             "คุณสำลักเลือดตัวเอง... หายใจไม่ออก..."
         ]
         
-        print(f"\n{random.choice(death_scenes)}")
-        print(f"\n{Colors.YELLOW}สถิติสุดท้าย:{Colors.END}")
-        print(f"ระดับ: {player.level}")
-        print(f"ศัตรูที่กำจัด: {enemies_defeated}")
-        print(f"ทองที่เก็บได้: {player.gold} GP")
+        say(f"\n{get_rng().choice(death_scenes)}")
+        say(f"\n{Colors.YELLOW}สถิติสุดท้าย:{Colors.END}")
+        say(f"ระดับ: {player.level}")
+        say(f"ศัตรูที่กำจัด: {state.enemies_defeated}")
+        say(f"ทองที่เก็บได้: {player.gold} GP")
+    return state
+
+def main(seed=None, journal_path=JOURNAL_FILE):
+    """ฟังก์ชันหลักของเกม: RNG ของเซสชันเอง และบันทึก journal ของทุกคำตอบ"""
+    rng = use_rng(SessionRNG(seed))
+    journal = use_journal(Journal(rng.seed, journal_path))
+    use_driver(RecordingDriver(get_driver(), journal))
+    try:
+        return adventure()
+    finally:
+        journal.close()
+
+def resume_play(journal):
+    """เล่นต่อจาก journal ที่พักไว้ (เซสชันที่ server.py พักลงดิสก์) ด้วยไดรเวอร์ปัจจุบัน"""
+    try:
+        return resume(journal, adventure, Adventure.from_dict, Adventure, get_driver())
+    finally:
+        journal.close()
+
+def replay_journal(journal):
+    """สร้าง Adventure ขึ้นใหม่จาก journal โดยเล่นซ้ำแบบ headless"""
+    return replay(journal, adventure, Adventure.from_dict, Adventure)
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="CLI Dungeons")
+    parser.add_argument("--seed", type=int, default=None, help="seed ของ RNG ประจำเซสชัน")
+    parser.add_argument("--replay", metavar="JOURNAL", help="เล่น journal ซ้ำแล้วแสดงสถานะสุดท้าย")
+    args = parser.parse_args()
+    if args.replay:
+        state = replay_journal(Journal.load(args.replay))
+        say(json.dumps(state.to_dict() if state.player else {}, ensure_ascii=False, indent=4))
+    else:
+        main(args.seed)
@@ -0,0 +1,153 @@
+# inventory.py - กระเป๋าไอเทมที่เก็บจำนวนต่อชื่อไอเทม + ดัชนีตามหมวด
+#
+# ใช้แทน list เดิมได้ (append/remove/count/pop/in/for/len) แต่ count/remove/in เป็น O(1)
+# และ items_in(หมวด) คืนเฉพาะไอเทมในหมวดนั้นโดยไม่ต้องไล่ทั้งกระเป๋า
+# เซฟเป็น {ชื่อ: จำนวน} ด้วย quantities() แล้วโหลดกลับด้วย Inventory.from_quantities()
+# (เซฟเก่าที่เป็น list ก็โหลดด้วย Inventory(list) ได้)
+# ดัชนีตามหมวดสร้างตอน items_in() ครั้งแรก กระเป๋าใหม่และกระเป๋าที่โหลดจากเซฟ (journal snapshot) จึงไม่ต้องจัดหมวด
+import sys
+from collections import Counter
+
+DEFAULT_CATEGORY = "misc"
+
+class Inventory:
+    """จำนวนของแต่ละไอเทม (dict แบบ Counter) และชื่อไอเทมที่มีอยู่ในแต่ละหมวด"""
+    __slots__ = ("_counts", "_by_category", "_categorize")
+
+    def __init__(self, items=(), categorize=None):
+        # dict ธรรมดาแทน Counter: สร้างและเพิ่ม key ใหม่เร็วกว่ามาก (Counter ทำใน Python)
+        self._counts = counts = {}
+        self._by_category = None
+        self._categorize = categorize
+        intern = sys.intern
+        for item in items:
+            item = intern(item)
+            counts[item] = counts.get(item, 0) + 1
+
+    @classmethod
+    def from_quantities(cls, quantities, categorize=None):
+        inventory = cls.__new__(cls)
+        intern = sys.intern
+        inventory._counts = {intern(item): qty for item, qty in quantities.items() if qty > 0}
+        inventory._by_category = None
+        inventory._categorize = categorize
+        return inventory
+
+    def copy(self):
+        inventory = Inventory.__new__(Inventory)
+        inventory._counts = self._counts.copy()
+        if self._by_category is None:
+            inventory._by_category = None
+        else:
+            inventory._by_category = {category: items.copy() for category, items in self._by_category.items()}
+        inventory._categorize = self._categorize
+        return inventory
+
+    def _index(self):
+        # {หมวด: {ชื่อ: None}} เรียงตามลำดับที่ได้มา (สร้างจาก _counts ครั้งแรกที่ต้องใช้)
+        by_category = self._by_category
+        if by_category is None:
+            by_category = self._by_category = {}
+            for item in self._counts:
+                by_category.setdefault(self.category_of(item), {})[item] = None
+        return by_category
+
+    def category_of(self, item):
+        if self._categorize is None:
+            return DEFAULT_CATEGORY
+        return self._categorize(item) or DEFAULT_CATEGORY
+
+    # --- เพิ่ม/ลด ---
+    def add(self, item, qty=1):
+        if qty <= 0:
+            return
+        counts = self._counts
+        have = counts.get(item)
+        if have is None:
+            # intern ชื่อไอเทม: ตัวละครหลายพันตัว (และเซฟที่โหลดมา) ใช้ string เดียวกัน
+            item = sys.intern(item)
+            if self._by_category is not None:
+                self._by_category.setdefault(self.category_of(item), {})[item] = None
+            counts[item] = qty
+        else:
+            counts[item] = have + qty
+
+    def take(self, item, qty=1):
+        """เอาไอเทมออก qty ชิ้น คืน False (และไม่แตะกระเป๋า) ถ้ามีไม่พอ"""
+        have = self._counts.get(item, 0)
+        if have < qty:
+            return False
+        if have == qty:
+            del self._counts[item]
+            if self._by_category is not None:
+                del self._by_category[self.category_of(item)][item]
+        else:
+            self._counts[item] = have - qty
+        return True
+
+    def has(self, item, qty=1):
+        return self._counts.get(item, 0) >= qty
+
+    def quantities(self):
+        """{ชื่อไอเทม: จำนวน} (สำเนา)"""
+        return dict(self._counts)
+
+    def items_in(self, category):
+        """ชื่อไอเทมที่มีอยู่ในหมวดนี้ เรียงตามลำดับที่ได้มา"""
+        return list(self._index().get(category, ()))
+
+    # --- ใช้แทน list ได้ ---
+    def append(self, item):
+        self.add(item)
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def remove(self, item):
+        if not self.take(item):
+            raise ValueError(f"{item!r} ไม่อยู่ในกระเป๋า")
+
+    def count(self, item):
+        return self._counts.get(item, 0)
+
+    def pop(self, index=-1):
+        """เอาไอเทมตำแหน่ง index (ตามลำดับเดียวกับตอนวนลูป) ออก"""
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("pop index out of range")
+        for item, qty in self._counts.items():
+            if index < qty:
+                self.take(item)
+                return item
+            index -= qty
+
+    def clear(self):
+        self._counts.clear()
+        self._by_category = None
+
+    def __contains__(self, item):
+        return item in self._counts
+
+    def __iter__(self):
+        for item, qty in list(self._counts.items()):
+            for _ in range(qty):
+                yield item
+
+    def __len__(self):
+        return sum(self._counts.values())
+
+    def __bool__(self):
+        return bool(self._counts)
+
+    def __eq__(self, other):
+        if isinstance(other, Inventory):
+            return self._counts == other._counts
+        if isinstance(other, (list, tuple)):
+            return self._counts == Counter(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,92 @@
+# iodriver.py - ไดรเวอร์ I/O ของเกม: prompt, output และจังหวะเวลา
+#
+# เกมเรียก ask()/say()/pause()/clear_screen() แทน input()/print()/time.sleep()
+# ไดรเวอร์ที่ใช้งานอยู่เก็บใน ContextVar แยกตาม thread / asyncio task
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+
+class ConsoleDriver:
+    """เล่นผ่านเทอร์มินัลตามปกติ"""
+    def ask(self, prompt=""):
+        return input(prompt)
+
+    def say(self, *args, sep=" ", end="\n"):
+        print(*args, sep=sep, end=end)
+
+    def pause(self, seconds):
+        time.sleep(seconds)
+
+    def clear(self):
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+class ScriptedDriver(ConsoleDriver):
+    """อ่านคำตอบจากสคริปต์ แต่แสดงผลและหน่วงเวลาเหมือนเล่นจริง"""
+    def __init__(self, inputs):
+        self.inputs = deque(inputs)
+
+    def ask(self, prompt=""):
+        if not self.inputs:
+            raise EOFError("script exhausted")
+        answer = self.inputs.popleft()
+        print(f"{prompt}{answer}")
+        return answer
+
+class HeadlessDriver:
+    """ไม่มีหน้าจอและไม่หน่วงเวลา คำตอบมาจากคิว
+
+    capture=True จะเก็บ output ทั้งหมดไว้ใน self.output
+    """
+    def __init__(self, inputs=(), capture=False):
+        self.inputs = deque(inputs)
+        self.output = [] if capture else None
+
+    def feed(self, *answers):
+        self.inputs.extend(answers)
+
+    def ask(self, prompt=""):
+        if self.output is not None:
+            self.output.append(prompt)
+        if not self.inputs:
+            raise EOFError("input queue exhausted")
+        return self.inputs.popleft()
+
+    def say(self, *args, sep=" ", end="\n"):
+        if self.output is not None:
+            self.output.append(sep.join(map(str, args)) + end)
+
+    def pause(self, seconds):
+        pass
+
+    def clear(self):
+        pass
+
+    def text(self):
+        return "".join(self.output or ())
+
+_current = ContextVar("io_driver", default=None)
+
+def get_driver():
+    """ไดรเวอร์ของเซสชันปัจจุบัน (context ที่ยังไม่ได้ตั้งได้ ConsoleDriver ของตัวเอง)"""
+    driver = _current.get()
+    if driver is None:
+        driver = use_driver(ConsoleDriver())
+    return driver
+
+def use_driver(driver):
+    """ตั้งไดรเวอร์ของเซสชันปัจจุบัน"""
+    _current.set(driver)
+    return driver
+
+def ask(prompt=""):
+    return get_driver().ask(prompt)
+
+def say(*args, sep=" ", end="\n"):
+    get_driver().say(*args, sep=sep, end=end)
+
+def pause(seconds):
+    get_driver().pause(seconds)
+
+def clear_screen():
+    get_driver().clear()
@@ -0,0 +1,194 @@
+# journal.py - บันทึก seed + คำตอบของผู้เล่น แล้วเล่นซ้ำแบบ headless เพื่อสร้างสถานะเดิม
+#
+# ไฟล์ journal เป็น JSON lines แบบ append-only:
+#   {"seed": ...}                          บรรทัดแรก
+#   "1"                                    คำตอบหนึ่งครั้งต่อบรรทัด
+#   {"at": n, "rng": {...}, "state": {...}} snapshot เป็นระยะ
+# ทุกครั้งที่เก็บ snapshot ไฟล์ถูกเขียนใหม่เหลือ seed + snapshot (at = 0) แล้วต่อท้ายคำตอบหลังจากนั้น
+# ไฟล์จึงไม่โตตามความยาวเซสชัน journal ของการเปิดเกมครั้งก่อน (เช่นเซสชันที่ล่ม) ถูกย้ายไปเป็น <path>.1
+#
+# resume() ใช้ journal เดียวกันปลุกเซสชันที่ถูกพักลงดิสก์ (server.py): เล่นซ้ำเงียบๆ จนหมดคำตอบที่บันทึกไว้
+# แล้วรับคำตอบจากไดรเวอร์จริงต่อ ณ prompt เดิม
+import contextvars
+import json
+import os
+from collections import deque
+from contextvars import ContextVar
+
+from iodriver import HeadlessDriver, use_driver
+from rng import SessionRNG, get_rng, use_rng
+from savefile import atomic_write_bytes
+
+SNAPSHOT_EVERY = 50
+
+class Journal:
+    """seed ของ RNG, คำตอบทั้งหมดของผู้เล่น และ snapshot ล่าสุด"""
+    def __init__(self, seed, path=None, snapshot_every=SNAPSHOT_EVERY):
+        self.seed = seed
+        self.inputs = []
+        self.snapshot = None
+        self.snapshot_every = snapshot_every
+        self.path = path
+        self._file = None
+        if path:
+            if os.path.exists(path):
+                os.replace(path, path + ".1")  # เก็บ journal ของครั้งก่อนไว้หนึ่งรุ่น
+            self._file = open(path, "w", encoding="utf-8")
+            self._write({"seed": seed})
+
+    def _write(self, entry):
+        if self._file:
+            self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._file.flush()
+
+    def record(self, answer):
+        self.inputs.append(answer)
+        self._write(answer)
+
+    def snapshot_due(self):
+        if self.snapshot is None:
+            return True
+        return len(self.inputs) - self.snapshot["at"] >= self.snapshot_every
+
+    def take_snapshot(self, state, rng_state):
+        # คำตอบก่อน snapshot ไม่ต้องใช้เล่นซ้ำอีก: ทิ้งทั้งในหน่วยความจำและในไฟล์
+        self.snapshot = {"at": 0, "rng": rng_state, "state": state}
+        self.inputs = []
+        if self._file:
+            self._file.close()
+            self.save(self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def save(self, path):
+        """เขียน journal ลงไฟล์ใหม่ทั้งไฟล์ ตัดคำตอบก่อน snapshot ล่าสุดทิ้ง (โหลดกลับด้วย load)"""
+        entries = [{"seed": self.seed}]
+        inputs = self.inputs
+        if self.snapshot:
+            entries.append(dict(self.snapshot, at=0))
+            inputs = inputs[self.snapshot["at"]:]
+        entries += inputs
+        text = "".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in entries)
+        atomic_write_bytes(path, text.encode("utf-8"), fsync=False)  # ไฟล์พักชั่วคราว ไม่ต้องรอดเครื่องดับ
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            journal = cls(json.loads(f.readline())["seed"])
+            for line in f:
+                entry = json.loads(line)
+                if isinstance(entry, dict):
+                    journal.snapshot = entry
+                else:
+                    journal.inputs.append(entry)
+        return journal
+
+class RecordingDriver:
+    """ห่อไดรเวอร์เดิม แล้วบันทึกทุกคำตอบลง journal"""
+    def __init__(self, inner, journal):
+        self.inner = inner
+        self.journal = journal
+
+    def ask(self, prompt=""):
+        answer = self.inner.ask(prompt)
+        self.journal.record(answer)
+        return answer
+
+    def say(self, *args, sep=" ", end="\n"):
+        self.inner.say(*args, sep=sep, end=end)
+
+    def pause(self, seconds):
+        self.inner.pause(seconds)
+
+    def clear(self):
+        self.inner.clear()
+
+class ResumeDriver:
+    """ป้อนคำตอบที่บันทึกไว้แบบเงียบ (ไม่มี output) พอหมดแล้วสลับเป็นไดรเวอร์จริงที่บันทึกลง journal ต่อ"""
+    def __init__(self, inputs, live, journal):
+        self.inputs = deque(inputs)
+        self.live = live
+        self.journal = journal
+
+    def ask(self, prompt=""):
+        if self.inputs:
+            return self.inputs.popleft()
+        # ถึง prompt ที่ผู้เล่นค้างอยู่ตอนพักเซสชัน (เห็นข้อความไปแล้ว จึงไม่ส่งซ้ำ)
+        _replaying.set(False)
+        use_journal(self.journal)
+        driver = use_driver(RecordingDriver(self.live, self.journal))
+        return driver.ask("")
+
+    def say(self, *args, sep=" ", end="\n"):
+        pass
+
+    def pause(self, seconds):
+        pass
+
+    def clear(self):
+        pass
+
+_current = ContextVar("journal", default=None)
+_replaying = ContextVar("replaying", default=False)
+
+def get_journal():
+    return _current.get()
+
+def use_journal(journal):
+    _current.set(journal)
+    return journal
+
+def replaying():
+    """True ระหว่างเล่น journal ซ้ำ (เกมไม่ควรเขียนเซฟหรือ autosave ตอนนี้)"""
+    return _replaying.get()
+
+def checkpoint(state):
+    """เก็บ snapshot ของ state (ที่มี to_dict) ถ้าถึงรอบ"""
+    journal = _current.get()
+    if journal is not None and journal.snapshot_due():
+        journal.take_snapshot(state.to_dict(), get_rng().to_dict())
+
+def _start(journal):
+    # state, RNG และคำตอบที่เหลือ นับจาก snapshot ล่าสุด (หรือจากต้นถ้าไม่มี)
+    snap = journal.snapshot
+    if snap:
+        return snap["state"], SessionRNG.from_dict(snap["rng"]), journal.inputs[snap["at"]:]
+    return None, SessionRNG(journal.seed), journal.inputs
+
+def replay(journal, run, restore, fresh):
+    """เล่น journal ซ้ำแบบ headless คืน state สุดท้าย
+
+    เริ่มจาก snapshot ล่าสุด (ผ่าน restore) หรือ fresh() แล้วป้อนคำตอบที่เหลือให้ run(state)
+    """
+    data, rng, inputs = _start(journal)
+    state = fresh() if data is None else restore(data)
+
+    def _run():
+        use_rng(rng)
+        use_driver(HeadlessDriver(inputs))
+        use_journal(None)
+        _replaying.set(True)
+        try:
+            run(state)
+        except (EOFError, SystemExit):
+            pass
+
+    contextvars.copy_context().run(_run)
+    return state
+
+def resume(journal, run, restore, fresh, live):
+    """เล่นต่อจาก journal ในเซสชันปัจจุบัน: เล่นซ้ำเงียบๆ แล้วรับคำตอบถัดไปจากไดรเวอร์ live
+
+    คืนค่าของ run(state) เหมือนเล่นต่อโดยไม่เคยหยุด
+    """
+    data, rng, inputs = _start(journal)
+    state = fresh() if data is None else restore(data)
+    use_rng(rng)
+    use_journal(None)  # snapshot ระหว่างเล่นซ้ำจะนับตำแหน่งผิด: เปิดอีกครั้งตอนถึงคำตอบใหม่
+    _replaying.set(True)
+    use_driver(ResumeDriver(inputs, live, journal))
+    return run(state)
@@ -0,0 +1,143 @@
+# rng.py - ตัวสุ่มประจำเซสชัน (seed ได้, บันทึกลงไฟล์เซฟได้) พร้อมบัฟเฟอร์สุ่มล่วงหน้า
+#
+# ทุกการสุ่มดึงจากสตรีมเลข 32 บิตของ random.Random(seed) ตัวเดียว
+# จึงเก็บสถานะได้ด้วย {"seed", "draws"} แล้วเล่นต่อจากจุดเดิมได้ทุกครั้ง
+import os
+import random
+import sys
+from array import array
+from contextvars import ContextVar
+
+BLOCK_SIZE = 4096
+
+class SessionRNG:
+    """ตัวสุ่มของเซสชันเดียว สุ่มเลข 32 บิตล่วงหน้าทีละบล็อก"""
+    def __init__(self, seed=None, block_size=BLOCK_SIZE):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "big")
+        self.seed = seed
+        self.block_size = block_size
+        self._source = random.Random(seed)
+        self._buffer = array("I")
+        self._pos = 0
+        self._drawn = 0  # จำนวนเลขที่สุ่มจาก source แล้ว (รวมที่ยังค้างในบัฟเฟอร์)
+
+    @property
+    def draws(self):
+        """จำนวนเลข 32 บิตที่ถูกใช้ไปแล้ว"""
+        return self._drawn - (len(self._buffer) - self._pos)
+
+    def _refill(self, count):
+        raw = self._source.getrandbits(32 * count).to_bytes(4 * count, "little")
+        buf = array("I", raw)
+        if sys.byteorder == "big":
+            buf.byteswap()
+        self._buffer = buf
+        self._pos = 0
+        self._drawn += count
+
+    def take(self, count):
+        """ดึงเลข 32 บิตดิบ count ตัวจากบัฟเฟอร์"""
+        end = self._pos + count
+        if end > len(self._buffer):
+            rest = self._buffer[self._pos:]
+            self._refill(max(self.block_size, count - len(rest)))
+            self._buffer = rest + self._buffer
+            end = count
+        words = self._buffer[self._pos:end]
+        self._pos = end
+        return words
+
+    def _word(self):
+        if self._pos >= len(self._buffer):
+            self._refill(self.block_size)
+        w = self._buffer[self._pos]
+        self._pos += 1
+        return w
+
+    def roll(self, sides, modifier=0):
+        """ทอยลูกเต๋า sides หน้า"""
+        if self._pos >= len(self._buffer):
+            self._refill(self.block_size)
+        w = self._buffer[self._pos]
+        self._pos += 1
+        return (w * sides >> 32) + 1 + modifier
+
+    def rolls(self, sides, count, modifier=0):
+        """ทอยลูกเต๋าทีละหลายลูกในครั้งเดียว"""
+        bias = 1 + modifier
+        return [(w * sides >> 32) + bias for w in self.take(count)]
+
+    def randint(self, a, b):
+        return a + (self._word() * (b - a + 1) >> 32)
+
+    def choice(self, seq):
+        return seq[self._word() * len(seq) >> 32]
+
+    def random(self):
+        return self._word() / 4294967296.0
+
+    def to_dict(self):
+        return {"seed": self.seed, "draws": self.draws}
+
+    @classmethod
+    def from_dict(cls, data):
+        rng = cls(data["seed"])
+        draws = data.get("draws", 0)
+        if draws:
+            # สตรีมคำ 32 บิตของ getrandbits ต่อเนื่องกันไม่ว่าจะแบ่งบล็อกอย่างไร
+            rng._source.getrandbits(32 * draws)
+            rng._drawn = draws
+        return rng
+
+class AliasTable:
+    """สุ่มแบบถ่วงน้ำหนักด้วย alias method: สร้าง O(n) ครั้งเดียว สุ่มครั้งละ O(1)"""
+    __slots__ = ("keys", "total", "_threshold", "_alias")
+
+    def __init__(self, weights):
+        keys = [key for key, weight in weights.items() if weight > 0]
+        if not keys:
+            raise ValueError("AliasTable ต้องมีน้ำหนักมากกว่า 0 อย่างน้อยหนึ่งตัว")
+        n = len(keys)
+        total = sum(weights[key] for key in keys)
+        scaled = [weights[key] * n / total for key in keys]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # ช่องที่เหลือใน small/large มีค่าใกล้ 1 (เศษจากทศนิยม) จึงคง prob = 1
+        self.keys = keys
+        self.total = total
+        self._threshold = [int(p * 4294967296.0) for p in prob]
+        self._alias = alias
+
+    def sample(self, rng=None):
+        """สุ่ม key หนึ่งตัวด้วยเลข 32 บิตตัวเดียว (ส่วนบนเลือกช่อง ส่วนล่างเลือก alias)"""
+        if rng is None:
+            rng = get_rng()
+        x = rng._word() * len(self.keys)
+        i = x >> 32
+        if (x & 0xFFFFFFFF) < self._threshold[i]:
+            return self.keys[i]
+        return self.keys[self._alias[i]]
+
+# ไม่มีค่าเริ่มต้นร่วม: context ที่ไม่เคยเรียก use_rng (thread เบื้องหลัง, โปรเซสลูก) ได้สตรีมใหม่ของตัวเอง
+_current = ContextVar("session_rng", default=None)
+
+def get_rng():
+    """RNG ของเซสชันปัจจุบัน (แยกตาม thread / asyncio task)"""
+    rng = _current.get()
+    if rng is None:
+        rng = use_rng(SessionRNG())
+    return rng
+
+def use_rng(rng):
+    """ตั้ง RNG ของเซสชันปัจจุบัน"""
+    _current.set(rng)
+    return rng
@@ -0,0 +1,286 @@
+# savefile.py - เขียนไฟล์เซฟแบบ atomic และบันทึกเฉพาะส่วนที่เปลี่ยน (delta) ระหว่าง checkpoint
+#
+# ไฟล์เซฟหลักเป็น state เต็มพร้อม "save_seq" (ไบนารีหรือ JSON ดู saveformat.py) เขียนผ่านไฟล์ชั่วคราว + os.replace
+# จึงไม่มีวันเหลือไฟล์ที่เขียนไปครึ่งเดียว การเซฟระหว่าง checkpoint ต่อท้าย <ไฟล์>.log ทีละบรรทัด:
+#   {"seq": n, "base": save_seq ของ checkpoint ที่ใช้คิด delta, "set": [[path, value], ...], "del": [path, ...]}
+# ตอนโหลดเอา state หลักมาแล้วใส่ delta ของ checkpoint นั้นที่ seq มากกว่า save_seq ตามลำดับ
+# (บรรทัดท้ายที่เขียนไม่จบจะถูกข้าม) ตัวอ่านไม่ต้องล็อก: อ่าน checkpoint เก่าแล้วเจอ delta ของ checkpoint ใหม่
+# ก็แค่ได้ state ที่เก่ากว่า ไม่ได้ state ผสม
+#
+# หลายโปรเซสเขียนเซฟไฟล์เดียวกันได้ (เช่นเปิด witcher.py สองหน้าต่าง): การบันทึกแต่ละครั้งล็อก <ไฟล์>.lock
+# และถ้าไฟล์ถูกโปรเซสอื่นเขียนหลังการบันทึกครั้งล่าสุดของเรา จะอ่าน state ล่าสุดจากดิสก์ก่อนคิด delta
+# ผลจึงเป็นแบบเดิม: ใครบันทึกทีหลังคนนั้นชนะ ไม่มีการผสม state สองชุด
+import json
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+from saveformat import decode, encode
+
+CHECKPOINT_EVERY = 20  # จำนวน delta ก่อนเขียน state เต็มใหม่
+SEQ_KEY = "save_seq"
+SAVE_FORMAT = os.environ.get("RPG_SAVE_FORMAT", "binary")  # รูปแบบ checkpoint: "binary" หรือ "json"
+
+# นโยบาย fsync: "always" ทุกครั้งที่เขียน, "checkpoint" เฉพาะ state เต็ม, "never" ปล่อยให้ OS จัดการ
+FSYNC_POLICIES = ("always", "checkpoint", "never")
+_fsync_policy = os.environ.get("RPG_FSYNC", "checkpoint")
+
+def set_fsync_policy(policy):
+    global _fsync_policy
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f"นโยบาย fsync ไม่รู้จัก: {policy!r} (ใช้ได้: {', '.join(FSYNC_POLICIES)})")
+    _fsync_policy = policy
+
+def get_fsync_policy():
+    return _fsync_policy if _fsync_policy in FSYNC_POLICIES else "checkpoint"
+
+def _fsync_dir(folder):
+    # ให้การ rename ลงดิสก์ด้วย (Windows เปิดโฟลเดอร์แบบนี้ไม่ได้ ข้ามไป)
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write_bytes(path, data, fsync=None):
+    """เขียนไฟล์ใหม่ทั้งไฟล์แบบ atomic: ไฟล์ชั่วคราวในโฟลเดอร์เดียวกัน แล้ว os.replace"""
+    if fsync is None:
+        fsync = get_fsync_policy() != "never"
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        _fsync_dir(folder)
+
+def atomic_write_json(path, obj, fsync=None, **dump_kwargs):
+    dump_kwargs.setdefault("ensure_ascii", False)
+    atomic_write_bytes(path, json.dumps(obj, **dump_kwargs).encode("utf-8"), fsync)
+
+class FileLock:
+    """ล็อกข้ามโปรเซสด้วยไฟล์ (fcntl / msvcrt ระบบที่ไม่มีทั้งสองจะไม่ล็อก)"""
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK ลองซ้ำเองแค่ 10 วินาที
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is None and msvcrt is not None:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()  # ปิดไฟล์ = ปลด flock
+            self._file = None
+
+# === Delta ===
+def diff_state(old, new, path=()):
+    """ความต่างของ dict สองชุด: (set, delete) เป็นรายการ path ของ key; ค่าที่ไม่ใช่ dict แทนที่ทั้งก้อน"""
+    sets, deletes = [], []
+    for key, value in new.items():
+        if key not in old:
+            sets.append([list(path) + [key], value])
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            sub_sets, sub_deletes = diff_state(old[key], value, path + (key,))
+            sets += sub_sets
+            deletes += sub_deletes
+        elif old[key] != value:
+            sets.append([list(path) + [key], value])
+    for key in old:
+        if key not in new:
+            deletes.append(list(path) + [key])
+    return sets, deletes
+
+def apply_delta(state, delta):
+    for keys, value in delta.get("set", ()):
+        target = state
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = value
+    for keys in delta.get("del", ()):
+        target = state
+        for key in keys[:-1]:
+            target = target.get(key, {})
+        target.pop(keys[-1], None)
+    return state
+
+def _read_log(log_path, after_seq):
+    deltas = []
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    delta = json.loads(line)
+                except ValueError:
+                    break  # บรรทัดท้ายที่เขียนไม่จบตอนเครื่องดับ
+                if delta.get("seq", 0) > after_seq and delta.get("base", after_seq) == after_seq:
+                    deltas.append(delta)
+    except FileNotFoundError:
+        pass
+    return deltas
+
+def _load(path):
+    # (state, save_seq ของ checkpoint, seq ล่าสุด, จำนวน delta)
+    with open(path, "rb") as f:
+        state = decode(f.read())
+    base = seq = state.pop(SEQ_KEY, 0)
+    deltas = _read_log(path + ".log", base)
+    for delta in deltas:
+        apply_delta(state, delta)
+        seq = delta["seq"]
+    return state, base, seq, len(deltas)
+
+def load_save(path):
+    """โหลด state ล่าสุด (ไฟล์หลัก + delta ใน log) คืน (state, seq, จำนวน delta)"""
+    state, _, seq, count = _load(path)
+    return state, seq, count
+
+def read_save(path):
+    """state ล่าสุดของไฟล์เซฟ (แบบเดียวกับ json.load ของไฟล์เซฟเดิม)"""
+    return load_save(path)[0]
+
+class SaveLog:
+    """ไฟล์เซฟหนึ่งไฟล์: checkpoint เต็มเป็นระยะ ระหว่างนั้นต่อท้าย delta เล็กๆ ลง log"""
+    def __init__(self, path, checkpoint_every=CHECKPOINT_EVERY, binary=None):
+        self.path = path
+        self.binary = SAVE_FORMAT == "binary" if binary is None else binary
+        self.log_path = path + ".log"
+        self.checkpoint_every = checkpoint_every
+        self.state = None
+        self.seq = 0
+        self.base = 0     # save_seq ของ checkpoint ล่าสุด
+        self.pending = 0  # delta ตั้งแต่ checkpoint ล่าสุด
+        self.lock = threading.Lock()  # เซฟจากเมนูและ autosave เบื้องหลังอาจมาพร้อมกัน
+        self.file_lock = FileLock(path + ".lock")  # โปรเซสอื่นที่เขียนเซฟไฟล์เดียวกัน
+        self._written = None  # _file_stamp() หลังการเขียนครั้งล่าสุดของเรา
+
+    def _file_stamp(self):
+        # ไฟล์หลักถูกแทนที่ (inode/mtime) หรือ log ยาวขึ้น = มีคนอื่นเขียน
+        stamp = []
+        for path in (self.path, self.log_path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                stamp.append(None)
+            else:
+                stamp.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
+    def _sync(self):
+        # อ่าน seq ล่าสุดจากดิสก์ เพื่อให้ checkpoint ใหม่มี seq มากกว่า delta เก่าทั้งหมด
+        try:
+            self.state, self.base, self.seq, self.pending = _load(self.path)
+        except (OSError, ValueError):
+            self.state, self.base, self.seq, self.pending = None, 0, 0, 0
+
+    def save(self, state, indent=None):
+        """บันทึก state (dict ที่ json ได้) คืนจำนวนไบต์ที่เขียน"""
+        state = json.loads(json.dumps(state))  # สำเนาลึก + ตรวจว่า json ได้ก่อนแตะไฟล์
+        with self.lock, self.file_lock:
+            if self.state is not None and self._file_stamp() != self._written:
+                self._sync()  # โปรเซสอื่นบันทึกไปแล้ว: คิด delta จาก state บนดิสก์
+            try:
+                return self._save(state, indent)
+            finally:
+                self._written = self._file_stamp()
+
+    def _save(self, state, indent):
+        if self.state is None:
+            # ครั้งแรกของโปรเซสเขียน checkpoint เสมอ: log เดิมอาจมีบรรทัดท้ายที่เขียนไม่จบค้างอยู่
+            self._sync()
+            return self.checkpoint(state, indent)
+        if self.pending >= self.checkpoint_every or not os.path.exists(self.path):
+            return self.checkpoint(state, indent)
+        sets, deletes = diff_state(self.state, state)
+        if not sets and not deletes:
+            return 0
+        delta = {"seq": self.seq + 1, "base": self.base, "set": sets}
+        if deletes:
+            delta["del"] = deletes
+        line = (json.dumps(delta, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with open(self.log_path, "ab", buffering=0) as f:  # ไม่มีบัฟเฟอร์: ตอนปิดไฟล์จะไม่มีเศษค้างเขียนซ้ำ
+            size = f.tell()
+            try:
+                view = memoryview(line)
+                while view:
+                    view = view[f.write(view):]
+                if get_fsync_policy() == "always":
+                    os.fsync(f.fileno())
+            except BaseException:
+                # เขียนไม่จบ (เช่นดิสก์เต็ม): ตัดส่วนที่เขียนไปแล้วทิ้ง ไม่ให้ delta ถัดไปต่อท้ายบรรทัดขาด
+                # ถ้าตัดไม่ได้ การบันทึกครั้งหน้าจะเขียน checkpoint เต็มแทน
+                self.state = None
+                try:
+                    f.truncate(size)
+                except OSError:
+                    pass
+                raise
+        self.state = state
+        self.seq += 1
+        self.pending += 1
+        return len(line)
+
+    def checkpoint(self, state=None, indent=None):
+        """เขียน state เต็มแบบ atomic แล้วล้าง log"""
+        if state is None:
+            state = self.state
+        seq = self.seq + 1
+        data = dict(state)
+        data[SEQ_KEY] = seq
+        blob = encode(data, self.binary, indent)
+        atomic_write_bytes(self.path, blob)
+        self.seq = self.base = seq
+        # ถ้าเครื่องดับก่อนล้าง log ได้ delta เก่าจะมี seq <= save_seq และถูกข้ามตอนโหลด
+        with open(self.log_path, "wb"):
+            pass
+        self.state = state
+        self.pending = 0
+        return len(blob)
+
+_logs = {}
+
+def save_log(path):
+    """SaveLog ของไฟล์นี้ (หนึ่งตัวต่อ path จริงในโปรเซส)"""
+    key = os.path.abspath(path)
+    log = _logs.get(key)
+    if log is None:
+        log = _logs[key] = SaveLog(key)
+    return log
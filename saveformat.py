@@ -0,0 +1,61 @@
+# saveformat.py - เวอร์ชันของ schema ไฟล์เซฟ, ทะเบียน migration และการเข้ารหัสแบบไบนารี
+#
+# state ทุกชนิดมี "schema": n ถ้าไม่มีถือเป็นเวอร์ชัน 1 (เซฟก่อนมีระบบนี้)
+# แต่ละเกมลงทะเบียน migration ของตัวเองด้วย @migration(kind, from_version) ข้างโค้ดที่เป็นเจ้าของข้อมูล
+# ไฟล์ไบนารี = BINARY_MAGIC + zlib(JSON แบบไม่มีช่องว่าง) ตัวอ่านแยกจาก JSON เดิมด้วย magic
+import json
+import zlib
+
+SCHEMA_KEY = "schema"
+BINARY_MAGIC = b"RPGS\x01"
+COMPRESS_LEVEL = 6
+
+_versions = {}    # kind -> เวอร์ชันปัจจุบัน
+_migrations = {}  # (kind, from_version) -> ฟังก์ชันแปลง state เป็นเวอร์ชันถัดไป
+
+def migration(kind, from_version):
+    """ลงทะเบียนฟังก์ชันแปลง state ชนิด kind จาก from_version เป็น from_version + 1"""
+    def register(upgrade):
+        _migrations[(kind, from_version)] = upgrade
+        _versions[kind] = max(_versions.get(kind, 1), from_version + 1)
+        return upgrade
+    return register
+
+def current_version(kind):
+    return _versions.get(kind, 1)
+
+def stamp(kind, data):
+    """ใส่เวอร์ชัน schema ปัจจุบันลงใน state ก่อนบันทึก"""
+    data[SCHEMA_KEY] = current_version(kind)
+    return data
+
+def migrate(kind, data):
+    """แปลง state เก่าให้เป็นเวอร์ชันปัจจุบันทีละขั้น"""
+    version = data.get(SCHEMA_KEY, 1)
+    target = current_version(kind)
+    if version > target:
+        raise ValueError(f"ไฟล์เซฟ {kind} เป็น schema {version} ใหม่กว่าที่เกมนี้รองรับ ({target})")
+    while version < target:
+        data = _migrations[(kind, version)](data)
+        version += 1
+        data[SCHEMA_KEY] = version
+    return data
+
+def upgraded(kind, data):
+    """state เวอร์ชันปัจจุบัน: คืน data เดิมถ้าไม่ต้องแปลง ไม่งั้นแปลงบนสำเนา (ไม่แตะ dict ของผู้เรียก)"""
+    if data.get(SCHEMA_KEY, 1) == current_version(kind):
+        return data
+    return migrate(kind, dict(data))
+
+def encode(data, binary=True, indent=None):
+    """state -> bytes (ไบนารีบีบอัด หรือ JSON แบบเดิม)"""
+    if binary:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        return BINARY_MAGIC + zlib.compress(text.encode("utf-8"), COMPRESS_LEVEL)
+    return json.dumps(data, ensure_ascii=False, indent=indent).encode("utf-8")
+
+def decode(blob):
+    """bytes -> state อ่านได้ทั้งไบนารีและ JSON"""
+    if blob[:len(BINARY_MAGIC)] == BINARY_MAGIC:
+        blob = zlib.decompress(blob[len(BINARY_MAGIC):])
+    return json.loads(blob)
@@ -0,0 +1,138 @@
+# savestore.py - ที่เก็บเซฟบน SQLite (WAL) แยกตาม profile และสล็อต สำหรับรันผู้เล่นหลายคน
+#
+# เปิดใช้ด้วย RPG_SAVE_BACKEND=sqlite (ค่าเริ่มต้น "file" = ไฟล์เซฟแบบเดิม) และ RPG_SAVE_DB=<path>
+# หนึ่งแถวต่อ (game, profile, slot): state เข้ารหัสแบบไบนารีของ saveformat.py + คอลัมน์ข้อมูลย่อที่มี index
+# ให้ค้นตาม level / school / เวลาได้โดยไม่ต้องถอดรหัสเซฟ หลายโปรเซสอ่านเขียนพร้อมกันได้ผ่าน WAL
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+
+from saveformat import decode, encode
+from savefile import get_fsync_policy
+
+SAVE_BACKEND = os.environ.get("RPG_SAVE_BACKEND", "file")
+DEFAULT_DB = os.environ.get(
+    "RPG_SAVE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves.db")
+)
+BUSY_TIMEOUT = 30.0
+DEFAULT_PROFILE = os.environ.get("RPG_PROFILE", "default")
+
+# synchronous ของ SQLite ตามนโยบาย fsync ใน savefile.py
+SYNCHRONOUS = {"always": "FULL", "checkpoint": "NORMAL", "never": "OFF"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    game     TEXT    NOT NULL,
+    profile  TEXT    NOT NULL,
+    slot     INTEGER NOT NULL,
+    name     TEXT,
+    level    INTEGER,
+    school   TEXT,
+    saved_at REAL    NOT NULL,
+    data     BLOB    NOT NULL,
+    PRIMARY KEY (game, profile, slot)
+);
+CREATE INDEX IF NOT EXISTS saves_by_level  ON saves (game, level);
+CREATE INDEX IF NOT EXISTS saves_by_school ON saves (game, school);
+CREATE INDEX IF NOT EXISTS saves_by_time   ON saves (game, saved_at);
+"""
+
+META_COLUMNS = "game, profile, slot, name, level, school, saved_at"
+
+class SaveStore:
+    """การเชื่อมต่อ SQLite หนึ่งตัว (ใช้ภายใน thread เดียว ดู get_store)"""
+    def __init__(self, path=DEFAULT_DB, timeout=BUSY_TIMEOUT):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={SYNCHRONOUS[get_fsync_policy()]}")
+        self.conn.executescript(SCHEMA)
+
+    def put(self, game, profile, slot, state, name=None, level=None, school=None, saved_at=None):
+        """บันทึก (หรือเขียนทับ) เซฟหนึ่งสล็อตในคำสั่งเดียว"""
+        if saved_at is None:
+            saved_at = time.time()
+        self.conn.execute(
+            "INSERT INTO saves (game, profile, slot, name, level, school, saved_at, data)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (game, profile, slot) DO UPDATE SET"
+            " name = excluded.name, level = excluded.level, school = excluded.school,"
+            " saved_at = excluded.saved_at, data = excluded.data",
+            (game, profile, slot, name, level, school, saved_at, encode(state)),
+        )
+
+    def get(self, game, profile, slot):
+        """state ของสล็อตนี้ หรือ None ถ้าไม่มี"""
+        row = self.conn.execute(
+            "SELECT data FROM saves WHERE game = ? AND profile = ? AND slot = ?",
+            (game, profile, slot),
+        ).fetchone()
+        return None if row is None else decode(row["data"])
+
+    def delete(self, game, profile, slot):
+        self.conn.execute(
+            "DELETE FROM saves WHERE game = ? AND profile = ? AND slot = ?", (game, profile, slot)
+        )
+
+    def slots(self, game, profile):
+        """ข้อมูลย่อของทุกสล็อตใน profile (ไม่อ่าน blob ของเซฟ)"""
+        return self.conn.execute(
+            f"SELECT {META_COLUMNS} FROM saves WHERE game = ? AND profile = ? ORDER BY slot",
+            (game, profile),
+        ).fetchall()
+
+    def query(self, game, min_level=None, max_level=None, school=None, since=None, limit=100):
+        """ค้นข้อมูลย่อของเซฟทุก profile ตาม level / school / เวลาที่บันทึก (ใหม่สุดก่อน)"""
+        where, params = ["game = ?"], [game]
+        if min_level is not None:
+            where.append("level >= ?")
+            params.append(min_level)
+        if max_level is not None:
+            where.append("level <= ?")
+            params.append(max_level)
+        if school is not None:
+            where.append("school = ?")
+            params.append(school)
+        if since is not None:
+            where.append("saved_at >= ?")
+            params.append(since)
+        params.append(limit)
+        return self.conn.execute(
+            f"SELECT {META_COLUMNS} FROM saves WHERE {' AND '.join(where)}"
+            " ORDER BY saved_at DESC LIMIT ?",
+            params,
+        ).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+# connection ของ sqlite3 ใช้ข้าม thread หรือข้าม fork ไม่ได้ จึงเก็บแยกต่อ thread และตรวจ pid
+_local = threading.local()
+
+def get_store(path=None):
+    """SaveStore ของ thread นี้"""
+    path = path or DEFAULT_DB
+    stores = getattr(_local, "stores", None)
+    if stores is None or _local.pid != os.getpid():
+        stores = _local.stores = {}
+        _local.pid = os.getpid()
+    store = stores.get(path)
+    if store is None:
+        store = stores[path] = SaveStore(path)
+    return store
+
+def use_sqlite():
+    return SAVE_BACKEND == "sqlite"
+
+_profile = ContextVar("save_profile", default=DEFAULT_PROFILE)
+
+def get_profile():
+    """profile ของเซสชันปัจจุบัน (ผู้เล่นแต่ละคนในเซิร์ฟเวอร์ตั้งของตัวเอง)"""
+    return _profile.get()
+
+def use_profile(profile):
+    _profile.set(profile)
+    return profile
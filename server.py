@@ -0,0 +1,664 @@
+# server.py - เซิร์ฟเวอร์ TCP (asyncio) ให้ผู้เล่นหลายคนเล่น witcher.py / game.py พร้อมกันผ่าน telnet หรือ netcat
+# Run: python server.py --port 4000   แล้ว   nc localhost 4000
+#
+# event loop เดียวดูแลทุกการเชื่อมต่อ: อ่านบรรทัดจาก client แบบ await แล้วส่งต่อให้เซสชัน
+# เมนูแรก (lobby) ถามบน event loop เลยด้วย await: การเชื่อมต่อที่ยังไม่เลือกเกมไม่มี thread
+# โค้ดเกมยังเรียก ask()/say() แบบ synchronous จึงรันเกมที่กำลังเล่นใน thread ของตัวเอง (stack เล็ก)
+# เซสชันที่นั่งรอ prompt นานเกิน --park-after วินาทีจะปล่อย thread คืน (จอด, park): ask() ที่รออยู่ได้ Park
+# แล้วเก็บ journal (snapshot ล่าสุดจาก World.to_dict / Adventure.to_dict + คำตอบหลังจากนั้น) ไว้ในหน่วยความจำ
+# เซสชันที่จอดอยู่จึงเหลือแค่อ็อบเจกต์ Journal ไม่มี thread คำตอบถัดไปของผู้เล่นจะปลุกเซสชันใน thread ใหม่:
+# เล่น journal ซ้ำเงียบๆ (journal.resume) แล้วรับคำตอบนั้นต่อ ณ prompt เดิม
+# output ของเซสชันถูกเก็บรวมแล้วส่งครั้งเดียวตอนถึง prompt ถัดไป (ไม่ปลุก event loop ทุก say())
+# แต่ละเซสชันมี RNG / ไดรเวอร์ / profile / autosave ของตัวเองผ่าน ContextVar
+#
+# --workers N (prefork, เฉพาะระบบที่มี fork): โปรเซสแม่ import เกมและสร้างตารางข้อมูลทั้งหมด (warm_up)
+# เปิด socket แล้ว fork worker N ตัวที่รับการเชื่อมต่อจาก socket เดียวกัน worker ใช้หน้าหน่วยความจำ
+# ของข้อมูลเกมร่วมกับแม่แบบ copy-on-write เซสชันใหม่จึงไม่ต้อง import / parse / สร้างตารางซ้ำ
+# แม่คอยเฝ้า worker: ตัวไหนตายจะ fork ตัวใหม่แทน, SIGTERM / Ctrl-C ปิดทุกตัว
+#
+# การพักเซสชันลงดิสก์ (hibernate): เซสชันที่ไม่มีคำตอบนานเกิน --hibernate-after วินาที หรือเมื่อเซสชันในหน่วยความจำ
+# เกิน --max-resident (พักตัวที่ตอบล่าสุดนานที่สุดก่อน, LRU) จะถูกจอดก่อน แล้วเขียน journal ลง HIBERNATE_DIR
+# ปลุกแบบเดียวกับเซสชันที่จอดในหน่วยความจำ แค่อ่าน journal จากไฟล์
+#
+# ผู้ชม (spectator): เลือก "ดูผู้เล่นคนอื่น" ในเมนูแรกแล้วเลือกเซสชันที่กำลังเล่น จะเห็นหน้าจอเดียวกับผู้เล่นแบบอ่านอย่างเดียว
+# output แต่ละก้อน (frame: ทุกอย่างจนถึง prompt) ถูกเข้ารหัสครั้งเดียวใน thread ของเกม แล้ว bytes ก้อนเดียวกัน
+# ถูกส่งให้ผู้เล่นและผู้ชมทุกคน (Broadcast) ผู้ชมที่อ่านไม่ทัน (ค้างส่งเกิน SPECTATOR_BUFFER_LIMIT) จะถูกข้ามเฟรม
+# ไม่ทำให้ผู้เล่นหรือผู้ชมคนอื่นช้าตาม
+import argparse
+import asyncio
+import contextvars
+import gc
+import itertools
+import os
+import queue
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+
+import game
+import savestore
+import witcher
+from autosave import EXIT_FLUSH_TIMEOUT, get_service
+from iodriver import say, use_driver
+from journal import Journal, get_journal
+from savestore import use_profile
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 4000
+MAX_SESSIONS = 5000
+SESSION_STACK_SIZE = 512 * 1024  # stack ของ thread เซสชันที่กำลังเล่น (ค่าเริ่มต้นของ OS มัก 8 MB)
+LISTEN_BACKLOG = 1024
+RESPAWN_DELAY = 1.0  # worker ที่ตายเร็วติดๆ กันจะไม่ถูก fork ใหม่ถี่เกินไป
+PARK_AFTER = 1.0         # วินาทีที่รอ prompt ก่อนปล่อย thread คืนแล้วจอด journal ไว้ในหน่วยความจำ (0 = ไม่จอด)
+HIBERNATE_AFTER = 300.0  # วินาทีที่ไม่มีคำตอบก่อนพักเซสชันลงดิสก์ (0 = ไม่พักตามเวลา)
+MAX_RESIDENT = 10000     # เซสชันในหน่วยความจำ (เล่นอยู่ + จอดอยู่) สูงสุดต่อโปรเซส (0 = ไม่จำกัด)
+EVICT_INTERVAL = 1.0
+HIBERNATE_DIR = os.environ.get(
+    "RPG_HIBERNATE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "hibernate")
+)
+SPECTATOR_BUFFER_LIMIT = 64 * 1024  # ไบต์ที่ค้างส่งให้ผู้ชมคนหนึ่งได้ เกินแล้วข้ามเฟรม
+RECENT_FRAMES = 32  # เฟรมตั้งแต่ล้างหน้าจอครั้งล่าสุด ส่งให้ผู้ชมที่เพิ่งเข้ามาเห็นหน้าจอปัจจุบัน
+WATCH_LIST = 20     # จำนวนเซสชันที่แสดงให้ผู้ชมเลือก (ที่ตอบล่าสุดก่อน)
+CLEAR_SCREEN = "\033[2J\033[H"
+CLEAR_BYTES = CLEAR_SCREEN.encode("utf-8")
+
+class Park(BaseException):
+    """ask() ถูกสั่งให้จอดเซสชัน (BaseException: except Exception ในโค้ดเกมจะไม่กลืนไป)"""
+
+PARK = object()  # ของในคิวคำตอบที่สั่งให้จอด
+
+class NetworkDriver:
+    """ไดรเวอร์ของเซสชันบนเครือข่าย: ask() รอคำตอบที่ event loop ส่งมา, say() เก็บ output ไว้ส่งรวมกัน"""
+    def __init__(self, loop, send):
+        self.loop = loop
+        self.send = send  # เรียกใน thread ของ event loop เท่านั้น
+        self.inputs = queue.SimpleQueue()
+        self.buffer = []
+        self.waiting = False  # เกมหยุดรอคำตอบอยู่ที่ ask()
+
+    # --- ฝั่ง event loop ---
+    def feed(self, line):
+        self.inputs.put(line)
+
+    def hang_up(self):
+        self.inputs.put(None)
+
+    def park(self):
+        self.inputs.put(PARK)
+
+    # --- ฝั่งเกม ---
+    def flush(self):
+        if not self.buffer:
+            return
+        text = "".join(self.buffer)
+        self.buffer.clear()
+        try:
+            self.loop.call_soon_threadsafe(self.send, text.replace("\n", "\r\n").encode("utf-8"))
+        except RuntimeError:
+            pass  # event loop ปิดไปแล้ว
+
+    def ask(self, prompt=""):
+        self.buffer.append(prompt)
+        self.flush()
+        self.waiting = True
+        answer = self.inputs.get()
+        self.waiting = False
+        if answer is None:
+            raise EOFError("client disconnected")
+        if answer is PARK:
+            raise Park()
+        return answer
+
+    def say(self, *args, sep=" ", end="\n"):
+        self.buffer.append(sep.join(map(str, args)) + end)
+
+    def pause(self, seconds):
+        pass  # output ถูกส่งรวมตอนถึง prompt อยู่แล้ว หน่วงไปก็แค่กัน thread ไว้เปล่าๆ
+
+    def clear(self):
+        self.buffer.append(CLEAR_SCREEN)
+
+class Broadcast:
+    """ส่ง output ของเซสชันหนึ่งให้ผู้เล่นและผู้ชม (เรียกใน thread ของ event loop เท่านั้น)
+
+    ทุกคนได้ bytes object เดียวกัน ไม่มีการเข้ารหัสหรือคัดลอกซ้ำต่อผู้ชม
+    """
+    def __init__(self, writer):
+        self.writer = writer  # ผู้เล่น: ไม่ข้ามเฟรม (handle หยุดรับคำสั่งจนกว่าจะอ่านทัน)
+        self.viewers = {}  # writer ของผู้ชม -> จำนวนเฟรมที่ข้ามไปตั้งแต่ส่งได้ครั้งล่าสุด
+        self.recent = deque(maxlen=RECENT_FRAMES)
+        self.dropped = 0
+
+    def send(self, frame):
+        if not self.writer.is_closing():
+            self.writer.write(frame)
+        if CLEAR_BYTES in frame:
+            self.recent.clear()  # เฟรมก่อนหน้าถูกล้างจากจอไปแล้ว
+        self.recent.append(frame)
+        for viewer in list(self.viewers):
+            self._offer(viewer, frame)
+
+    def _offer(self, viewer, frame):
+        if viewer.is_closing():
+            del self.viewers[viewer]
+            return
+        if viewer.transport.get_write_buffer_size() > SPECTATOR_BUFFER_LIMIT:
+            self.viewers[viewer] += 1
+            self.dropped += 1
+            return
+        skipped = self.viewers[viewer]
+        if skipped:
+            self.viewers[viewer] = 0
+            viewer.write(f"\r\n[ข้ามไป {skipped} เฟรม]\r\n".encode("utf-8"))
+        viewer.write(frame)
+
+    def attach(self, viewer):
+        self.viewers[viewer] = 0
+        for frame in self.recent:
+            viewer.write(frame)
+
+    def detach(self, viewer):
+        self.viewers.pop(viewer, None)
+
+    def close(self, message):
+        for viewer in self.viewers:
+            viewer.write(message.encode("utf-8"))
+            viewer.close()
+        self.viewers.clear()
+
+# === เกมที่เลือกเล่นได้ ===
+def run_witcher():
+    witcher.play(journal_path=None)  # journal เก็บในหน่วยความจำ ไม่ทับ save.journal ของคนอื่น
+
+def run_game():
+    game.main(journal_path=None)
+
+# ปุ่ม -> (ชื่อเกม, เริ่มเกม, เล่นต่อจาก journal หรือ None ถ้าพักเซสชันไม่ได้)
+GAMES = {
+    "1": ("The Witcher: Path of Destiny", run_witcher, witcher.resume_play),
+    "2": ("CLI Dungeons", run_game, game.resume_play),
+}
+
+async def lobby(guest_name, ask, say, watchable=None):
+    """ถามเกมและ profile บน event loop คืน ("play", (รายการใน GAMES, profile)), ("watch", ชื่อเซสชัน) หรือ None ถ้าเลือกออก
+
+    await ask(prompt) คืนคำตอบถัดไปของผู้เล่น watchable() คืน [(ชื่อเซสชัน, คำอธิบาย)] ที่ดูได้ (None = ไม่มีเมนูผู้ชม)
+    """
+    watch_key = str(len(GAMES) + 1) if watchable else None
+    while True:
+        say("=== RPG CLI SERVER ===")
+        for key, (title, _, _) in GAMES.items():
+            say(f"{key}. {title}")
+        if watch_key:
+            say(f"{watch_key}. ดูผู้เล่นคนอื่น (อ่านอย่างเดียว)")
+        say(f"{len(GAMES) + (2 if watch_key else 1)}. ออก")
+        choice = (await ask("เลือกเกม: ")).strip()
+        if choice == watch_key:
+            name = await choose_session(watchable(), ask, say)
+            if name is None:
+                continue
+            return "watch", name
+        entry = GAMES.get(choice)
+        if entry is None:
+            return None
+        profile = (await ask(f"ชื่อโปรไฟล์ (Enter = {guest_name}): ")).strip()
+        return "play", (entry, profile or guest_name)
+
+async def choose_session(sessions, ask, say):
+    """ให้ผู้ชมเลือกจาก [(ชื่อเซสชัน, คำอธิบาย)] คืนชื่อ หรือ None ถ้าไม่เลือก"""
+    if not sessions:
+        say("ยังไม่มีใครกำลังเล่นอยู่")
+        return None
+    for i, (_, label) in enumerate(sessions, 1):
+        say(f"{i}. {label}")
+    choice = (await ask("ดูเซสชันไหน (Enter = กลับ): ")).strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(sessions):
+        return sessions[int(choice) - 1][0]
+    return None
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # มีโปรเซสนี้อยู่ แต่เป็นของผู้ใช้อื่น
+    return True
+
+def clear_hibernated(folder=HIBERNATE_DIR):
+    """ลบไฟล์พักเซสชันที่ค้างจากเซิร์ฟเวอร์รอบก่อน (การเชื่อมต่อของมันหายไปแล้ว)
+
+    ชื่อไฟล์ขึ้นต้นด้วย pid ของโปรเซสที่พัก: ไฟล์ของเซิร์ฟเวอร์ (หรือ worker) อื่นที่ยังรันอยู่
+    ในโฟลเดอร์เดียวกันต้องไม่ถูกลบ
+    """
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return
+    for name in names:
+        pid, sep, _ = name.partition("-")
+        if not name.endswith(".journal") or not sep or not pid.isdigit():
+            continue
+        if not process_alive(int(pid)):
+            try:
+                os.remove(os.path.join(folder, name))
+            except FileNotFoundError:
+                pass  # เซิร์ฟเวอร์อื่นที่เริ่มพร้อมกันลบไปก่อนแล้ว
+
+class Session:
+    """การเชื่อมต่อหนึ่งตัว: เกมรันอยู่ใน thread หรือจอดเป็น journal ในหน่วยความจำ / บนดิสก์
+
+    state: lobby (ยังไม่เลือกเกม ไม่มี thread) / running / parking (สั่งจอดแล้ว รอ thread จบ)
+    / parked (journal ในหน่วยความจำ) / hibernated (journal บนดิสก์) / watching (ผู้ชม) / closed
+    เมธอดที่ไม่ได้ขึ้นต้นด้วย _ เรียกจาก thread ของ event loop เท่านั้น
+    """
+    def __init__(self, driver, broadcast, name, server):
+        self.driver = driver
+        self.broadcast = broadcast
+        self.writer = broadcast.writer
+        self.name = name
+        self.server = server
+        self.path = os.path.join(server.hibernate_dir, f"{os.getpid()}-{name}.journal")
+        self.profile = None
+        self.title = None   # ชื่อเกมที่กำลังเล่น
+        self.resume = None  # ฟังก์ชันเล่นต่อจาก journal ของเกมที่กำลังเล่น
+        self.watching = None  # เซสชันที่ผู้ชมคนนี้ดูอยู่
+        self.journal = None   # journal ของเซสชันที่จอดอยู่ในหน่วยความจำ
+        self.state = "lobby"
+        self.last_input = time.monotonic()
+
+    @property
+    def resident(self):
+        return self.state in ("running", "parking", "parked")
+
+    @property
+    def can_park(self):
+        return self.state == "running" and self.resume is not None and self.driver.waiting
+
+    async def ask(self, reader, prompt=""):
+        """prompt ของ lobby: รอคำตอบบน event loop (ยังไม่มี thread ของเซสชัน)"""
+        self.driver.buffer.append(prompt)
+        self.driver.flush()
+        line = await reader.readline()
+        if not line:
+            raise EOFError("client disconnected")
+        self.last_input = time.monotonic()
+        self.server.sessions.move_to_end(self.name)
+        return line.decode("utf-8", "replace").rstrip("\r\n")
+
+    def play(self, entry, profile):
+        self.title, start, self.resume = entry
+        self.profile = profile
+        self.state = "running"
+        self.start(lambda: self._play(start))
+
+    def start(self, target):
+        # context ใหม่: ไดรเวอร์ / RNG / profile / autosave ของเซสชันนี้ไม่ปนกับเซสชันอื่น
+        thread = threading.Thread(
+            target=contextvars.Context().run, args=(self._run, target), name="session", daemon=True
+        )
+        thread.start()
+
+    @property
+    def label(self):
+        hibernated = " (พักอยู่)" if self.state == "hibernated" else ""
+        return f"{self.profile} - {self.title}{hibernated}"
+
+    def feed(self, line):
+        self.last_input = time.monotonic()
+        if self.state == "watching":
+            if line.strip().lower() == "q":
+                self.writer.close()
+            return  # ผู้ชมพิมพ์อย่างอื่นไม่มีผลกับเกม
+        self.driver.feed(line)
+        if self.state in ("parked", "hibernated"):
+            self.wake()
+
+    def park(self):
+        self.state = "parking"
+        self.driver.park()
+
+    def hibernate(self):
+        """เขียน journal ของเซสชันที่จอดอยู่ลงดิสก์ (ไฟล์เล็กและไม่ fsync จึงเขียนบน event loop ได้)"""
+        try:
+            self.journal.save(self.path)
+        except OSError as e:
+            print(f"session {self.name}: hibernate failed: {e}", file=sys.stderr)
+            return False  # จอดอยู่ในหน่วยความจำต่อไป
+        self.journal = None
+        self.state = "hibernated"
+        return True
+
+    def wake(self):
+        self.state = "running"
+        self.start(self._resume)
+
+    def close(self):
+        state, self.state = self.state, "closed"
+        self.driver.hang_up()  # ask() ที่รออยู่จะได้ EOFError แล้วเกม (และ autosave) ปิดตามปกติ
+        self.journal = None
+        if state == "hibernated":
+            self._remove_file()
+        if self.watching is not None:
+            self.watching.broadcast.detach(self.writer)
+        self.broadcast.close("\r\n[ผู้เล่นออกจากเกมแล้ว]\r\n")
+
+    # --- ใน thread ของเซสชัน ---
+    def _play(self, start):
+        use_profile(self.profile)
+        start()
+
+    def _resume(self):
+        use_profile(self.profile)
+        journal, self.journal = self.journal, None
+        if journal is None:
+            journal = Journal.load(self.path)
+            self._remove_file()
+        self.resume(journal)
+
+    def _run(self, target):
+        use_driver(self.driver)
+        done = self._ended
+        try:
+            target()
+        except Park:
+            self.journal = get_journal()
+            done = self._parked
+        except (EOFError, SystemExit):
+            pass
+        except Exception:
+            # บั๊กในเกมต้องไม่ทำให้ thread ตายเงียบ: บันทึกพร้อมชื่อเซสชัน แล้วบอกผู้เล่นก่อนตัดการเชื่อมต่อ
+            print(f"session {self.name} ({self.profile}) crashed:\n{traceback.format_exc()}", end="", file=sys.stderr)
+            say("\nเกิดข้อผิดพลาดในเกม เซสชันนี้ต้องปิดลง ขออภัย")
+        finally:
+            self.driver.flush()
+            try:
+                self.driver.loop.call_soon_threadsafe(done)
+            except RuntimeError:
+                pass
+
+    def _remove_file(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    # --- callback ใน event loop เมื่อ thread จบ ---
+    def _parked(self):
+        if self.state == "closed":
+            self.journal = None
+            return
+        self.state = "parked"
+        if not self.driver.inputs.empty():
+            self.wake()  # คำตอบมาถึงระหว่างกำลังจอด
+
+    def _ended(self):
+        self.writer.close()
+
+    def watch(self, name):
+        target = self.server.sessions.get(name)
+        if self.state == "closed" or target is None or target.state == "closed":
+            self.writer.write("เซสชันนั้นจบไปแล้ว\r\n".encode("utf-8"))
+            self.writer.close()
+            return
+        self.state = "watching"
+        self.watching = target
+        self.writer.write(f"กำลังดู {target.label} (พิมพ์ q เพื่อออก)\r\n".encode("utf-8"))
+        target.broadcast.attach(self.writer)
+
+class GameServer:
+    """รับการเชื่อมต่อ TCP แล้วเปิดเซสชันเกมให้แต่ละ client"""
+    def __init__(self, max_sessions=MAX_SESSIONS, park_after=PARK_AFTER, hibernate_after=HIBERNATE_AFTER,
+                 max_resident=MAX_RESIDENT, hibernate_dir=HIBERNATE_DIR):
+        self.max_sessions = max_sessions
+        self.park_after = park_after
+        self.hibernate_after = hibernate_after
+        self.max_resident = max_resident
+        self.hibernate_dir = hibernate_dir
+        os.makedirs(hibernate_dir, exist_ok=True)
+        self.sessions = OrderedDict()  # name -> Session เรียงจากคำตอบล่าสุดเก่าสุดไปใหม่สุด (LRU)
+        self._ids = itertools.count(1)
+
+    async def handle(self, reader, writer):
+        if len(self.sessions) >= self.max_sessions:
+            writer.write("เซิร์ฟเวอร์เต็ม ลองใหม่ภายหลัง\r\n".encode("utf-8"))
+            writer.close()
+            return
+        broadcast = Broadcast(writer)
+        driver = NetworkDriver(asyncio.get_running_loop(), broadcast.send)
+        session = Session(driver, broadcast, f"guest{next(self._ids)}", self)
+        self.sessions[session.name] = session
+        try:
+            choice = await lobby(
+                session.name, lambda prompt: session.ask(reader, prompt), driver.say, self.watchable
+            )
+            if choice is None:
+                return
+            kind, value = choice
+            if kind == "watch":
+                session.watch(value)
+            else:
+                session.play(*value)
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                session.feed(line.decode("utf-8", "replace").rstrip("\r\n"))
+                self.sessions.move_to_end(session.name)
+                await writer.drain()  # client ที่ไม่อ่าน output จะถูกหยุดรับคำสั่งไว้ก่อน
+        except (EOFError, ConnectionError, ValueError):
+            pass  # หลุดกลางคัน หรือบรรทัดยาวเกิน limit ของ StreamReader
+        finally:
+            session.close()
+            writer.close()
+            del self.sessions[session.name]
+
+    def watchable(self):
+        """[(ชื่อเซสชัน, คำอธิบาย)] ของเซสชันที่กำลังเล่นเกม ที่ตอบล่าสุดก่อน (เรียกจาก thread ของเซสชันได้)"""
+        found = []
+        for session in reversed(list(self.sessions.values())):
+            if session.title is not None and session.state != "closed":
+                found.append((session.name, session.label))
+                if len(found) >= WATCH_LIST:
+                    break
+        return found
+
+    def evict(self):
+        """จอดเซสชันที่รอ prompt นานเกิน park_after แล้วพักลงดิสก์ตัวที่ไม่มีคำตอบนานเกิน hibernate_after
+        หรือที่เกินจำนวน max_resident (เก่าสุดก่อน) เซสชันที่ยังเล่นอยู่ต้องจอดก่อน รอบถัดไปจึงเขียนลงดิสก์
+        """
+        now = time.monotonic()
+        excess = 0
+        if self.max_resident:
+            excess = sum(1 for session in self.sessions.values() if session.resident) - self.max_resident
+        for session in list(self.sessions.values()):
+            idle = now - session.last_input
+            to_disk = excess > 0 or (self.hibernate_after and idle >= self.hibernate_after)
+            if not to_disk and not (self.park_after and idle >= self.park_after):
+                break  # ที่เหลือตอบล่าสุดหลังจากนี้ทั้งหมด
+            if session.can_park:
+                session.park()
+                if to_disk:
+                    excess -= 1
+            elif to_disk and session.state == "parked" and session.hibernate():
+                excess -= 1
+
+    async def evict_idle(self):
+        while True:
+            await asyncio.sleep(EVICT_INTERVAL)
+            self.evict()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, sock=None, stop=None):
+        """รับการเชื่อมต่อไปเรื่อยๆ หรือจนกว่า stop (asyncio.Event) จะถูกตั้ง แล้วปิดทุกเซสชัน"""
+        if sock is not None:
+            server = await asyncio.start_server(self.handle, sock=sock)  # socket จากโปรเซสแม่
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            addresses = ", ".join(str(s.getsockname()) for s in server.sockets)
+            print(f"RPG server listening on {addresses}")
+        evictor = asyncio.create_task(self.evict_idle())
+        try:
+            async with server:
+                if stop is None:
+                    await server.serve_forever()
+                else:
+                    await stop.wait()
+        finally:
+            evictor.cancel()
+        await self.close_sessions()
+
+    async def close_sessions(self):
+        """ตัดทุกการเชื่อมต่อ แล้วรอให้ handler ปิดเซสชันของตัวเอง"""
+        for session in list(self.sessions.values()):
+            session.writer.close()
+        while self.sessions:
+            await asyncio.sleep(0.05)
+
+# === Prefork ===
+def warm_up():
+    """โหลด pack และสร้างตารางมอนสเตอร์ / ไอเทม / สูตรยาของทั้งสองเกมไว้ล่วงหน้า (ก่อน fork)"""
+    for conjunction in (False, True):
+        witcher.get_monsters(conjunction)
+        for region in witcher.load_pack()["regions"]:
+            witcher.encounter_table(region, conjunction)
+    witcher.get_recipes()
+    witcher.item_categories()
+    witcher.recipes_by_ingredient()
+    for school in witcher.SCHOOL_STATS:
+        witcher.starting_inventory(school)
+    for key in game.load_pack()["monsters"]:
+        game.get_monster_data(key)  # รวมชุดข้อความ (text pool) ของมอนสเตอร์
+    game.item_category("")
+
+async def serve_worker(sock, options):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):  # Ctrl-C ถึงทุกโปรเซสในกลุ่ม: ปิดแบบเดียวกัน
+        loop.add_signal_handler(signum, stop.set)
+    await GameServer(**options).serve(sock=sock, stop=stop)
+
+def run_worker(sock, options):
+    """ตัวโปรแกรมของ worker หนึ่งตัว (ในโปรเซสลูก) ไม่ return: จบด้วย os._exit"""
+    code = 0
+    try:
+        asyncio.run(serve_worker(sock, options))
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            # เซสชันที่ถูกตัดได้ EOFError แล้ว รอให้ปิดตัวและส่ง autosave สุดท้ายก่อน
+            deadline = time.monotonic() + EXIT_FLUSH_TIMEOUT
+            for thread in threading.enumerate():
+                if thread.name == "session":
+                    thread.join(max(0.0, deadline - time.monotonic()))
+            get_service().flush(timeout=EXIT_FLUSH_TIMEOUT)  # os._exit ไม่เรียก atexit
+        finally:
+            os._exit(code)
+
+class Prefork:
+    """โปรเซสแม่: เปิด socket, warm up ข้อมูลเกม แล้ว fork และเฝ้า worker
+
+    options ส่งต่อให้ GameServer ของทุก worker
+    """
+    def __init__(self, workers, host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+        self.workers = workers
+        self.options = options
+        self.sock = socket.create_server((host, port), backlog=LISTEN_BACKLOG)
+        self.sock.setblocking(False)
+        self.children = {}  # pid -> เวลาที่ fork
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.sock, self.options)
+        self.children[pid] = time.monotonic()
+        return pid
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        warm_up()
+        gc.freeze()  # ของที่สร้างแล้วไม่ถูก GC ของ worker ไล่แตะ หน้าหน่วยความจำจึงยังใช้ร่วมกันได้
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"RPG server listening on {self.sock.getsockname()} ({self.workers} workers)")
+        signal.signal(signal.SIGTERM, self.stop)
+        try:
+            self.watch()
+        except KeyboardInterrupt:
+            self.stop()
+            self.watch()
+        self.sock.close()
+
+    def watch(self):
+        while self.children:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            if time.monotonic() - started < RESPAWN_DELAY:
+                time.sleep(RESPAWN_DELAY)
+            self.spawn()
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-session RPG server over TCP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS, help="ต่อ worker")
+    parser.add_argument("--workers", type=int, default=0, help="จำนวน worker แบบ prefork (0 = โปรเซสเดียว)")
+    parser.add_argument(
+        "--park-after", type=float, default=PARK_AFTER, metavar="SECONDS",
+        help="ปล่อย thread ของเซสชันที่รอ prompt นานเท่านี้ แล้วจอดไว้ในหน่วยความจำ (0 = ไม่จอด)",
+    )
+    parser.add_argument(
+        "--hibernate-after", type=float, default=HIBERNATE_AFTER, metavar="SECONDS",
+        help="พักเซสชันที่ไม่มีคำตอบนานเท่านี้ลงดิสก์ (0 = ไม่พักตามเวลา)",
+    )
+    parser.add_argument(
+        "--max-resident", type=int, default=MAX_RESIDENT,
+        help="เซสชันในหน่วยความจำสูงสุดต่อ worker เกินแล้วพักตัวที่ว่างนานสุดก่อน (0 = ไม่จำกัด)",
+    )
+    parser.add_argument(
+        "--backend", choices=("sqlite", "file"), default="sqlite",
+        help="ที่เก็บเซฟ (file = ไฟล์เซฟเดียวใช้ร่วมกันทุกคน ใช้กับ --workers ไม่ได้)",
+    )
+    args = parser.parse_args()
+    if args.workers and not hasattr(os, "fork"):
+        parser.error("--workers ต้องใช้ os.fork (ไม่มีบน Windows)")
+    if args.workers and args.backend == "file":
+        # worker ทุกตัวจะเขียนไฟล์เซฟเดียวกันพร้อมกัน ทับเซฟของกันและกัน
+        parser.error("--workers ใช้กับ --backend file ไม่ได้ (ไฟล์เซฟเดียวใช้ร่วมกันทุก worker) ใช้ --backend sqlite")
+    savestore.SAVE_BACKEND = args.backend  # sqlite แยกเซฟตาม profile ของแต่ละผู้เล่น
+    threading.stack_size(SESSION_STACK_SIZE)
+    clear_hibernated()
+    options = dict(
+        max_sessions=args.max_sessions,
+        park_after=args.park_after,
+        hibernate_after=args.hibernate_after,
+        max_resident=args.max_resident,
+    )
+    if args.workers:
+        Prefork(args.workers, args.host, args.port, **options).run()
+        return
+    try:
+        asyncio.run(GameServer(**options).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
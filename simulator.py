@@ -0,0 +1,132 @@
+# simulator.py - Monte Carlo combat simulator สำหรับ witcher.py (headless)
+# Run: python simulator.py --fights 100000 --policy smart --workers 4
+import argparse
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import witcher
+from iodriver import HeadlessDriver, use_driver
+from rng import SessionRNG, use_rng
+
+SCHOOLS = ["Wolf", "Griffin", "Bear", "Cat", "Viper", "Lynx"]
+MAX_TURNS = 500
+CHUNK_SIZE = 2000
+
+# === Action Policies ===
+# policy(player, monster, enemy_hp) -> (choice, arg) ตามเมนูใน combat()
+def fast_policy(player, monster, enemy_hp):
+    return "1", None
+
+def strong_policy(player, monster, enemy_hp):
+    return "2", None
+
+def igni_policy(player, monster, enemy_hp):
+    return "3", "1"
+
+def smart_policy(player, monster, enemy_hp):
+    if player.hp <= player.max_hp * 0.3 and "Swallow" in player.inventory:
+        return "4", "Swallow"
+    if monster['weakness'] == "Igni":
+        return "3", "1"
+    return "1", None
+
+POLICIES = {
+    "fast": fast_policy,
+    "strong": strong_policy,
+    "igni": igni_policy,
+    "smart": smart_policy,
+}
+
+class StalledFight(Exception):
+    pass
+
+class TurnCounter:
+    """นับเทิร์นที่ policy ถูกเรียก และตัดการต่อสู้ที่ไม่มีวันจบ"""
+    def __init__(self, policy):
+        self.policy = policy
+        self.turns = 0
+
+    def __call__(self, player, monster, enemy_hp):
+        self.turns += 1
+        if self.turns > MAX_TURNS:
+            raise StalledFight()
+        return self.policy(player, monster, enemy_hp)
+
+# === Workers ===
+def run_batch(task):
+    """รันการต่อสู้ n ครั้งของคู่ (school, monster, conjunction) เดียว"""
+    school, monster_key, conjunction, policy_name, n, seed = task
+    use_rng(SessionRNG(seed))
+    use_driver(HeadlessDriver())
+    policy = POLICIES[policy_name]
+    wins = turns_total = hp_total = 0
+    for _ in range(n):
+        player = witcher.Witcher("Sim", school)
+        counter = TurnCounter(policy)
+        try:
+            won = witcher.combat(player, monster_key, conjunction, policy=counter)
+        except StalledFight:
+            won = False
+        if won:
+            wins += 1
+            turns_total += counter.turns
+            hp_total += player.hp
+    return (school, monster_key, conjunction), (n, wins, turns_total, hp_total)
+
+def make_tasks(fights, policy_name, seed):
+    rng = random.Random(seed)
+    tasks = []
+    for conjunction in (False, True):
+        for monster_key in witcher.get_monsters(conjunction):
+            for school in SCHOOLS:
+                left = fights
+                while left > 0:
+                    n = min(CHUNK_SIZE, left)
+                    tasks.append((school, monster_key, conjunction, policy_name, n, rng.getrandbits(64)))
+                    left -= n
+    return tasks
+
+def simulate(fights, policy_name="smart", workers=None, seed=None):
+    """รันทุกคู่ school × monster × conjunction บน process pool แล้วรวมผล"""
+    tasks = make_tasks(fights, policy_name, seed)
+    results = {}
+    with Pool(workers or os.cpu_count()) as pool:
+        for key, (n, wins, turns, hp) in pool.imap_unordered(run_batch, tasks):
+            total = results.setdefault(key, [0, 0, 0, 0])
+            total[0] += n
+            total[1] += wins
+            total[2] += turns
+            total[3] += hp
+    return results
+
+def print_table(results):
+    witcher.print_separator()
+    print(f"{'School':<8} {'Monster':<8} {'Conj':<5} {'Win %':>7} {'Turns':>7} {'HP left':>8}")
+    witcher.print_separator()
+    for school, monster_key, conjunction in sorted(results, key=lambda k: (k[2], k[1], SCHOOLS.index(k[0]))):
+        n, wins, turns, hp = results[(school, monster_key, conjunction)]
+        win_rate = 100.0 * wins / n
+        avg_turns = turns / wins if wins else 0.0
+        avg_hp = hp / wins if wins else 0.0
+        conj = "yes" if conjunction else "no"
+        print(f"{school:<8} {monster_key:<8} {conj:<5} {win_rate:>6.1f}% {avg_turns:>7.1f} {avg_hp:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Monte Carlo combat simulator")
+    parser.add_argument("--fights", type=int, default=10000, help="จำนวนการต่อสู้ต่อคู่")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="smart")
+    parser.add_argument("--workers", type=int, default=None, help="จำนวน process (ค่าเริ่มต้น: ทุกคอร์)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = simulate(args.fights, args.policy, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+    print_table(results)
+    total = sum(r[0] for r in results.values())
+    print(f"{total} fights in {elapsed:.1f}s ({total / elapsed:.0f} fights/s)")
+
+if __name__ == "__main__":
+    main()
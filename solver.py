@@ -0,0 +1,126 @@
+# solver.py - คำนวณโอกาสชนะแบบแม่นยำของ combat() ใน witcher.py ด้วย dynamic programming
+# Run: python solver.py --policy smart
+#
+# การต่อสู้เป็น Markov chain บน (HP ผู้เล่น, HP ศัตรู): ทุกเทิร์น HP ไม่เพิ่มขึ้น
+# สถานะ stun/shield ถูกใช้หมดภายในเทิร์นเดียวกัน ส่วน temp_buff คงที่ตลอดการต่อสู้
+# วนลูปได้แค่กรณีเทิร์นที่ไม่มีใครเสีย HP (เช่น Quen, Axii) ซึ่งแก้ด้วยสูตร 1/(1-q)
+import argparse
+from functools import lru_cache
+from types import SimpleNamespace
+
+import witcher
+from simulator import POLICIES, SCHOOLS
+
+SIGNS = {"1": "Igni", "2": "Aard", "3": "Quen", "4": "Yrden", "5": "Axii"}
+
+def action_outcomes(stats, monster, choice, arg):
+    """การกระจายผลของการกระทำหนึ่งครั้ง: [(dmg, prob, enemy_stunned, shield)]"""
+    max_hp, base_dmg, sign_power, crit_chance, temp_buff = stats
+    if choice == "1":
+        p_crit = min(max(crit_chance, 0), 100) / 100
+        outcomes = [(base_dmg * 2 + temp_buff, p_crit, False, False)]
+        outcomes += [(base_dmg + r + temp_buff, (1 - p_crit) / 3, False, False) for r in (1, 2, 3)]
+        return outcomes
+    if choice == "2":
+        outcomes = [(0, 0.4, False, False)]
+        outcomes += [(base_dmg + r + 2 + temp_buff, 0.6 / 8, False, False) for r in range(1, 9)]
+        return outcomes
+    if choice == "3":
+        sign = SIGNS.get(arg)
+        dmg, stunned, shield = 0, False, False
+        if sign == "Igni":
+            dmg = 10 + sign_power * 6
+            if monster['weakness'] == "Igni":
+                dmg *= 1.5
+        elif sign == "Aard":
+            dmg = 4 + sign_power * 2
+            stunned = True
+        elif sign == "Quen":
+            shield = True
+        elif sign == "Axii":
+            stunned = True
+        if monster['weakness'] == "Axii" and arg == "5":
+            stunned = True
+        return [(int(dmg), 1.0, stunned, shield)]
+    raise ValueError(f"solver ไม่รองรับการกระทำ {choice!r} (ใช้ไอเทมไม่ได้)")
+
+@lru_cache(maxsize=256)
+def _solve_tables(stats, monster_items, policy):
+    """ตาราง win[p][e] และ turns[p][e] สำหรับทุก HP ผู้เล่น <= max_hp และ HP ศัตรู <= hp เริ่มต้น"""
+    monster = dict(monster_items)
+    max_hp = stats[0]
+    enemy_max = monster['hp']
+    lo, hi = monster['min_dmg'], monster['max_dmg']
+    hit_p = 1.0 / hi
+    enemy_dmgs = range(lo + 1, lo + hi + 1)
+    view = SimpleNamespace(
+        max_hp=max_hp, base_dmg=stats[1], sign_power=stats[2],
+        crit_chance=stats[3], temp_buff=stats[4], inventory=(), hp=0
+    )
+    outcome_cache = {}
+
+    win = [[0.0] * (enemy_max + 1) for _ in range(max_hp + 1)]
+    turns = [[0.0] * (enemy_max + 1) for _ in range(max_hp + 1)]
+    for p in range(1, max_hp + 1):
+        view.hp = p
+        win_p, turns_p = win[p], turns[p]
+        for e in range(1, enemy_max + 1):
+            action = policy(view, monster, e)
+            outcomes = outcome_cache.get(action)
+            if outcomes is None:
+                outcomes = outcome_cache[action] = action_outcomes(stats, monster, *action)
+            w = t = stay = 0.0
+            for dmg, prob, stunned, shield in outcomes:
+                e2 = e - dmg
+                if e2 <= 0:
+                    w += prob
+                elif stunned or shield:
+                    if e2 == e:
+                        stay += prob
+                    else:
+                        w += prob * win_p[e2]
+                        t += prob * turns_p[e2]
+                else:
+                    for x in enemy_dmgs:
+                        p2 = p - x
+                        if p2 <= 0:
+                            break
+                        w += prob * hit_p * win[p2][e2]
+                        t += prob * hit_p * turns[p2][e2]
+            if stay >= 1.0:
+                win_p[e] = 0.0
+                turns_p[e] = float("inf")
+            else:
+                win_p[e] = w / (1.0 - stay)
+                turns_p[e] = (1.0 + t) / (1.0 - stay)
+    return win, turns
+
+def solve(player, monster_key, conjunction=False, policy=POLICIES["smart"]):
+    """โอกาสชนะและจำนวนเทิร์นที่คาดหวังของ player (HP ปัจจุบัน) กับมอนสเตอร์หนึ่งตัว"""
+    monster = witcher.get_monsters(conjunction)[monster_key]
+    stats = (player.max_hp, player.base_dmg, player.sign_power, player.crit_chance, player.temp_buff)
+    monster_items = tuple(sorted(monster.items()))
+    win, turns = _solve_tables(stats, monster_items, policy)
+    hp = min(player.hp, player.max_hp)
+    if hp <= 0:
+        return 0.0, 0.0
+    return win[hp][monster['hp']], turns[hp][monster['hp']]
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact win probabilities for witcher.py combat")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="smart")
+    args = parser.parse_args()
+    policy = POLICIES[args.policy]
+
+    witcher.print_separator()
+    print(f"{'School':<8} {'Monster':<8} {'Conj':<5} {'Win %':>8} {'E[turns]':>9}")
+    witcher.print_separator()
+    for conjunction in (False, True):
+        for monster_key in witcher.get_monsters(conjunction):
+            for school in SCHOOLS:
+                win, turns = solve(witcher.Witcher("Sim", school), monster_key, conjunction, policy)
+                conj = "yes" if conjunction else "no"
+                print(f"{school:<8} {monster_key:<8} {conj:<5} {100 * win:>7.2f}% {turns:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# test_autosave.py - autosave เบื้องหลัง: รวมคำขอที่มาติดกัน, เขียนตามลำดับ และไม่ทับเซฟที่บันทึกเองทีหลัง
+# Run: python -m pytest -q
+import contextvars
+import threading
+import time
+
+import pytest
+
+import witcher
+from autosave import AutosaveService, Autosaver, use_autosaver
+from iodriver import HeadlessDriver, use_driver
+
+DELAY = 0.05
+
+@pytest.fixture
+def service():
+    return AutosaveService(delay=DELAY)
+
+def test_requests_inside_the_delay_coalesce(service):
+    written = []
+    saver = Autosaver(written.append, service)
+    for n in range(10):
+        saver.save(n)
+    saver.flush(timeout=5)
+    assert written == [9]
+    assert service.requests == 10 and service.writes == 1
+
+def test_each_key_keeps_its_own_latest_snapshot(service):
+    written = []
+    a = Autosaver(lambda s: written.append(("a", s)), service)
+    b = Autosaver(lambda s: written.append(("b", s)), service)
+    a.save(1)
+    b.save(1)
+    a.save(2)
+    time.sleep(DELAY * 4)
+    service.flush(timeout=5)
+    assert sorted(written) == [("a", 2), ("b", 1)]
+    assert written[0] == ("a", 2)  # คำขอแรกถึงกำหนดก่อน
+
+def test_write_runs_in_the_submitting_context(service):
+    seen = []
+    marker = contextvars.ContextVar("marker", default=None)
+
+    def session():
+        marker.set("session-1")
+        Autosaver(lambda s: seen.append(marker.get()), service).save(0)
+
+    contextvars.Context().run(session)
+    service.flush(timeout=5)
+    assert seen == ["session-1"]
+
+def test_failed_write_is_recorded_not_raised(service):
+    def broken(snapshot):
+        raise OSError("disk full")
+
+    saver = Autosaver(broken, service)
+    saver.save(1)
+    saver.flush(timeout=5)
+    assert isinstance(service.last_error, OSError)
+
+def test_failed_write_is_reported_to_stderr_and_the_session(service, capsys):
+    def broken(snapshot):
+        raise OSError("disk full")
+
+    def session():
+        driver = use_driver(HeadlessDriver(capture=True))
+        saver = Autosaver(broken, service)
+        saver.save(1)
+        saver.flush(timeout=5)
+        saver.save(2)  # เขียนไม่สำเร็จซ้ำ แต่แจ้งแค่ครั้งเดียวต่อความล้มเหลวหนึ่งครั้ง
+        service.discard(saver)
+        return driver.text()
+
+    text = contextvars.Context().run(session)
+    assert text.count("disk full") == 1
+    assert "disk full" in capsys.readouterr().err
+
+def test_discard_drops_pending_and_waits_for_inflight_write(service):
+    written = []
+    started = threading.Event()
+
+    def slow(snapshot):
+        started.set()
+        time.sleep(DELAY * 2)
+        written.append(snapshot)
+
+    saver = Autosaver(slow, service)
+    saver.save("old")
+    assert started.wait(5)
+    saver.save("older-than-manual")  # ค้างอยู่ระหว่างที่ "old" กำลังเขียน
+    saver.discard()
+    assert written == ["old"]  # รอการเขียนที่กำลังทำอยู่จนเสร็จ
+    written.append("manual")
+    time.sleep(DELAY * 4)
+    assert written == ["old", "manual"]
+
+def test_manual_save_is_not_overwritten_by_pending_autosave(tmp_path, monkeypatch, service):
+    monkeypatch.setattr(witcher, "SAVE_FILE", str(tmp_path / "save.sav"))
+    monkeypatch.setattr(witcher, "LEGACY_SAVE_FILE", str(tmp_path / "save.json"))
+
+    def session():
+        use_driver(HeadlessDriver())
+        use_autosaver(Autosaver(witcher.write_save, service))
+        player = witcher.Witcher("Test", "Wolf")
+        player.gold = 100
+        witcher.autosave(player)
+        player.gold = 999
+        player.active_quests.append("drowner")
+        witcher.roll_dice(20)
+        witcher.save_game(player)
+        manual = witcher.save_state(player)
+        time.sleep(DELAY * 4)
+        service.flush(timeout=5)
+        return manual
+
+    manual = contextvars.Context().run(session)
+    saved = witcher.read_saved_state()
+    assert saved["gold"] == 999
+    assert saved["active_quests"] == ["drowner"]
+    assert saved["rng"] == manual["rng"]
@@ -0,0 +1,87 @@
+# test_combat.py - การต่อสู้แบบ state machine ของ witcher.py / game.py: บันทึกกลางการต่อสู้แล้วเล่นต่อได้ผลเหมือนเล่นรวดเดียว
+# Run: python -m pytest -q
+import contextvars
+import random
+
+import pytest
+
+import game
+import witcher
+from iodriver import HeadlessDriver, use_driver
+from rng import SessionRNG, get_rng, use_rng
+
+# คำตอบที่เป็นไปได้ในแต่ละ phase (รวมคำตอบผิด)
+WITCHER_ANSWERS = {
+    "action": ["1", "1", "2", "3", "4", "x"],
+    "sign": ["1", "2", "3", "4", "5", "9"],
+    "item": ["Swallow", "Bread", "", "nothing"],
+}
+GAME_ANSWERS = {
+    "begin": [""],
+    "next": [""],
+    "action": ["1", "1", "2", "3", "4", "5", "9"],
+    "item": ["1", "2", "0", "x"],
+}
+
+def witcher_fight(seed):
+    player = witcher.Witcher("Ger", random.Random(seed).choice(["Wolf", "Griffin", "Bear", "Cat"]))
+    player.inventory.add("Swallow", 2)
+    player.temp_buff = seed % 3 * 2  # บัฟจากยาก่อนสู้ต้องติดไปกับ snapshot
+    state, _ = witcher.start_combat(player, random.Random(seed).choice(["bear", "bruxa", "bandit"]), seed % 2 == 0)
+    return state
+
+def game_fight(seed):
+    player = game.Character("A", "human", "warrior")
+    player.inventory.extend(["น้ำยาบำบัด", "มีดสั้น"])
+    return game.FightState(player, random.Random(seed).choice(["goblin", "orc", "necrophile", "succubus"]))
+
+def play(state, step, answers, seed):
+    """เล่นจนจบ คืน [(คำตอบ, events, output, snapshot ก่อนตอบ)] ทีละเทิร์น"""
+    choose = random.Random(seed)
+    driver = use_driver(HeadlessDriver(capture=True))
+    turns = []
+    while not state.finished:
+        snapshot = state.to_dict(), get_rng().to_dict()
+        answer = choose.choice(answers[state.phase])
+        del driver.output[:]
+        _, events = step(state, answer)
+        turns.append((answer, events, "".join(driver.output), snapshot))
+    return turns, state.to_dict()
+
+def resume(cls, step, snapshot, answers):
+    """สร้างการต่อสู้ใหม่จาก snapshot แล้วตอบตามชุดเดิม คืน ([(events, output)], สถานะสุดท้าย)"""
+    data, rng_data = snapshot
+    use_rng(SessionRNG.from_dict(rng_data))
+    state = cls.from_dict(data)
+    driver = use_driver(HeadlessDriver(capture=True))
+    turns = []
+    for answer in answers:
+        del driver.output[:]
+        _, events = step(state, answer)
+        turns.append((events, "".join(driver.output)))
+    assert state.finished
+    return turns, state.to_dict()
+
+GAMES = [
+    (witcher_fight, witcher.CombatState, witcher.combat_step, WITCHER_ANSWERS),
+    (game_fight, game.FightState, game.combat_step, GAME_ANSWERS),
+]
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("start, cls, step, answers", GAMES, ids=["witcher", "game"])
+def test_resumed_fight_matches_straight_play(start, cls, step, answers, seed):
+    def straight():
+        use_rng(SessionRNG(seed))
+        use_driver(HeadlessDriver())
+        return play(start(seed), step, answers, seed)
+
+    turns, final = contextvars.Context().run(straight)
+    assert len(turns) > 1
+    # บันทึกก่อนทุกคำตอบ (ทุก phase) แล้วเล่นต่อใน context ใหม่
+    for i, (_, _, _, snapshot) in enumerate(turns):
+        rest = turns[i:]
+        resumed, resumed_final = contextvars.Context().run(
+            resume, cls, step, snapshot, [answer for answer, _, _, _ in rest]
+        )
+        assert resumed == [(events, output) for _, events, output, _ in rest]
+        assert resumed_final == final
@@ -0,0 +1,90 @@
+# test_inventory.py - กระเป๋าแบบนับจำนวน: ใช้แทน list เดิมได้ และดัชนีตามหมวดตรงกับของในกระเป๋าเสมอ
+# Run: python -m pytest -q
+import pytest
+
+import witcher
+from inventory import Inventory
+
+CATEGORIES = {"Swallow": "potion", "Drowner Brain": "ingredient", "Ghoul Blood": "ingredient"}
+
+def bag(items=()):
+    return Inventory(items, CATEGORIES.get)
+
+def test_counts_match_list_semantics():
+    items = ["Bread", "Drowner Brain", "Bread", "Swallow", "Drowner Brain", "Bread"]
+    inventory = bag(items)
+    assert len(inventory) == len(items)
+    for item in set(items):
+        assert inventory.count(item) == items.count(item)
+        assert item in inventory
+    assert "Ghoul Blood" not in inventory
+    assert inventory == items
+    inventory.remove("Bread")
+    items.remove("Bread")
+    assert inventory == items
+    with pytest.raises(ValueError):
+        inventory.remove("Ghoul Blood")
+
+def test_iteration_and_pop_follow_acquisition_order():
+    inventory = bag(["Bread", "Swallow", "Bread", "Drowner Brain"])
+    assert list(inventory) == ["Bread", "Bread", "Swallow", "Drowner Brain"]
+    assert inventory.pop(1) == "Bread"
+    assert inventory.pop() == "Drowner Brain"
+    assert list(inventory) == ["Bread", "Swallow"]
+    with pytest.raises(IndexError):
+        inventory.pop(5)
+
+def test_take_is_all_or_nothing():
+    inventory = bag(["Swallow"] * 2)
+    assert not inventory.take("Swallow", 3)
+    assert inventory.count("Swallow") == 2
+    assert inventory.take("Swallow", 2)
+    assert "Swallow" not in inventory
+    assert inventory.items_in("potion") == []
+
+def test_items_in_keeps_order_across_removal_and_readd():
+    inventory = bag(["Ghoul Blood", "Bread", "Drowner Brain"])
+    assert inventory.items_in("ingredient") == ["Ghoul Blood", "Drowner Brain"]
+    assert inventory.items_in("misc") == ["Bread"]
+    inventory.take("Ghoul Blood")
+    inventory.add("Ghoul Blood", 2)
+    assert inventory.items_in("ingredient") == ["Drowner Brain", "Ghoul Blood"]
+    assert inventory.items_in("armor") == []
+
+@pytest.mark.parametrize("touch_index_first", [False, True])
+def test_loaded_inventory_indexes_like_a_built_one(touch_index_first):
+    built = bag(["Swallow", "Ghoul Blood", "Bread", "Ghoul Blood"])
+    loaded = Inventory.from_quantities({**built.quantities(), "Empty": 0}, CATEGORIES.get)
+    assert loaded.quantities() == built.quantities()
+    if touch_index_first:
+        loaded.items_in("potion")
+    loaded.add("Drowner Brain")
+    built.add("Drowner Brain")
+    loaded.take("Swallow")
+    built.take("Swallow")
+    for category in ("potion", "ingredient", "misc"):
+        assert loaded.items_in(category) == built.items_in(category)
+
+def test_copy_is_independent():
+    original = bag(["Swallow", "Bread"])
+    original.items_in("potion")
+    clone = original.copy()
+    clone.take("Swallow")
+    clone.add("Ghoul Blood")
+    assert original.quantities() == {"Swallow": 1, "Bread": 1}
+    assert original.items_in("potion") == ["Swallow"]
+    assert original.items_in("ingredient") == []
+
+def test_witcher_round_trip_copies_inventory_and_quests():
+    player = witcher.Witcher("Test", "Viper")
+    player.inventory.extend(["Drowner Brain", "Ghoul Blood"] * 3)
+    player.active_quests.append("drowner")
+    data = player.to_dict()
+    restored = witcher.Witcher.from_dict(data)
+    assert restored.to_dict() == data
+    assert restored.desc == player.desc
+    assert restored.inventory.items_in("ingredient") == player.inventory.items_in("ingredient")
+    restored.inventory.add("Bread")
+    restored.active_quests.append("bear")
+    assert player.inventory.count("Bread") == 1
+    assert player.active_quests == ["drowner"]
@@ -0,0 +1,84 @@
+# test_journal.py - journal ของ witcher.py / game.py: เล่นซ้ำจาก snapshot ได้สถานะเดียวกับเล่นซ้ำจาก seed และกับเกมจริง
+# Run: python -m pytest -q
+import contextvars
+import random
+
+import pytest
+
+import game
+import journal
+import witcher
+from iodriver import HeadlessDriver, use_driver
+from journal import Journal, get_journal
+
+def witcher_inputs(seed, n=400):
+    r = random.Random(seed)
+    return ["1", "Ger", str(r.randint(1, 6))] + [
+        r.choice(["1", "1", "3", "3", "2", "5", "", "y", "Swallow", "Thunderbolt", "2"]) for _ in range(n)
+    ]
+
+def game_inputs(seed, n=300):
+    r = random.Random(seed)
+    # เลือก "1" แล้ว intro() สร้างตัวละครสองรอบ (พฤติกรรมเดิมของ game.py)
+    return ["y", "1", "A", "1", "1", "", "A", str(r.randint(1, 4)), str(r.randint(1, 4)), ""] + [r.choice(["1", "1", "", "3", "1", "2", "3", "4", "1", "0"]) for _ in range(n)]
+
+def record(start, inputs):
+    """เล่นจริงด้วยคำตอบชุดนี้ คืน (state สุดท้ายหรือ None ถ้าคำตอบหมดก่อน, journal, journal จาก seed ล้วน)"""
+    def run():
+        driver = use_driver(HeadlessDriver(inputs))
+        try:
+            state = start()
+        except (EOFError, SystemExit):
+            state = None
+        log = get_journal()
+        full = Journal(log.seed)  # คำตอบทุกข้อที่เกมใช้ไป (journal จริงตัดส่วนก่อน snapshot ทิ้งแล้ว)
+        full.inputs = inputs[:len(inputs) - len(driver.inputs)]
+        return state, log, full
+    return contextvars.Context().run(run)
+
+@pytest.fixture(autouse=True)
+def no_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # เซฟของ game.py อยู่ในโฟลเดอร์ปัจจุบัน
+    monkeypatch.setattr(witcher, "SAVE_FILE", str(tmp_path / "save.sav"))
+    monkeypatch.setattr(journal, "SNAPSHOT_EVERY", 7)
+
+@pytest.mark.parametrize("seed", range(8))
+def test_witcher_replay_matches_play(seed):
+    state, log, full = record(lambda: witcher.play(seed, journal_path=None, autosave=False), witcher_inputs(seed))
+    assert log.snapshot is not None
+    assert len(log.inputs) < len(full.inputs)
+    from_snapshot = witcher.replay_journal(log).to_dict()
+    assert witcher.replay_journal(full).to_dict() == from_snapshot
+    if state is not None:
+        assert state.to_dict() == from_snapshot
+
+@pytest.mark.parametrize("seed", range(8))
+def test_game_replay_matches_play(seed):
+    state, log, full = record(lambda: game.main(seed, journal_path=None), game_inputs(seed))
+    assert log.snapshot is not None
+    from_snapshot = game.replay_journal(log).to_dict()
+    assert game.replay_journal(full).to_dict() == from_snapshot
+    if state is not None:
+        assert state.to_dict() == from_snapshot
+
+def test_journal_file_round_trip(tmp_path):
+    path = tmp_path / "game.journal"
+    _, log, _ = record(lambda: game.main(3, journal_path=str(path)), game_inputs(3))
+    loaded = Journal.load(path)
+    assert loaded.seed == log.seed
+    assert loaded.inputs == log.inputs
+    assert loaded.snapshot == log.snapshot
+    # ไฟล์ถูกย่อทุก snapshot: seed + snapshot + คำตอบหลัง snapshot เท่านั้น
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2 + len(log.inputs)
+    compact = tmp_path / "compact.journal"
+    log.save(compact)
+    assert game.replay_journal(Journal.load(compact)).to_dict() == game.replay_journal(log).to_dict()
+
+def test_new_session_keeps_previous_journal(tmp_path):
+    path = tmp_path / "game.journal"
+    _, crashed, _ = record(lambda: game.main(3, journal_path=str(path)), game_inputs(3))
+    record(lambda: game.main(4, journal_path=str(path)), game_inputs(4, n=5))
+    previous = Journal.load(str(path) + ".1")
+    assert previous.seed == crashed.seed
+    assert game.replay_journal(previous).to_dict() == game.replay_journal(crashed).to_dict()
+    assert Journal.load(path).seed == 4
@@ -0,0 +1,105 @@
+# test_rng.py - ตัวสุ่มประจำเซสชัน: สตรีมต่อเนื่องหลังบันทึก/โหลด แยกกันตาม context และการแจกแจงของ AliasTable
+# Run: python -m pytest -q
+import contextvars
+import math
+import threading
+from collections import Counter
+
+import pytest
+
+from rng import AliasTable, SessionRNG, get_rng, use_rng
+
+def draw_mix(rng, n=50):
+    # ผสมทุกแบบที่เกมใช้ รวม take() ที่ข้ามขอบบล็อก
+    out = []
+    for i in range(n):
+        out.append(rng.roll(20))
+        out.append(rng.randint(1, 6))
+        out.append(rng.choice("abcdef"))
+        out.extend(rng.rolls(6, i % 7))
+    return out
+
+def test_restored_stream_continues_where_it_stopped():
+    rng = SessionRNG(1234, block_size=16)
+    draw_mix(rng, 30)
+    saved = rng.to_dict()
+    expected = draw_mix(rng)
+    restored = SessionRNG.from_dict(saved)
+    assert restored.draws == saved["draws"]
+    assert draw_mix(restored) == expected
+
+def test_block_size_does_not_change_the_stream():
+    assert draw_mix(SessionRNG(7, block_size=3)) == draw_mix(SessionRNG(7, block_size=4096))
+
+def test_from_dict_accepts_saves_without_draws():
+    assert draw_mix(SessionRNG.from_dict({"seed": 99})) == draw_mix(SessionRNG(99))
+
+def test_contexts_without_use_rng_get_their_own_stream():
+    found = []
+
+    def grab():
+        found.append(get_rng())
+
+    threads = [threading.Thread(target=grab) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    contextvars.Context().run(grab)
+    assert len({id(rng) for rng in found}) == 3
+    # context เดิมยังได้ตัวเดิมทุกครั้ง
+    context = contextvars.Context()
+    assert context.run(get_rng) is context.run(get_rng)
+
+def test_use_rng_is_per_context():
+    mine = SessionRNG(1)
+
+    def run():
+        use_rng(mine)
+        return get_rng()
+
+    assert contextvars.Context().run(run) is mine
+    assert contextvars.Context().run(get_rng) is not mine
+
+WEIGHTS = [
+    {"a": 1},
+    {"a": 1, "b": 1, "c": 1, "d": 1},
+    {"wolf": 10, "drowner": 6, "ghoul": 3, "griffin": 0.5, "leshen": 0.25, "none": 0},
+    {str(i): (i * 7919) % 97 + 1 for i in range(40)},
+]
+
+def implied(table):
+    """ความน่าจะเป็นของแต่ละ key ที่ตารางให้จริง (รวมส่วนของช่องตัวเองกับส่วนที่ถูก alias มา)"""
+    n = len(table.keys)
+    share = dict.fromkeys(table.keys, 0.0)
+    for i, key in enumerate(table.keys):
+        keep = table._threshold[i] / 4294967296.0
+        share[key] += keep / n
+        share[table.keys[table._alias[i]]] += (1.0 - keep) / n
+    return share
+
+@pytest.mark.parametrize("weights", WEIGHTS)
+def test_alias_table_matches_weights(weights):
+    table = AliasTable(weights)
+    total = sum(weights.values())
+    assert table.total == total
+    assert set(table.keys) == {key for key, weight in weights.items() if weight > 0}
+    for key, p in implied(table).items():
+        assert p == pytest.approx(weights[key] / total, abs=1e-9)
+
+@pytest.mark.parametrize("weights", WEIGHTS[1:])
+def test_alias_samples_follow_weights(weights):
+    table = AliasTable(weights)
+    rng = SessionRNG(2024)
+    n = 200_000
+    counts = Counter(table.sample(rng) for _ in range(n))
+    total = sum(weights.values())
+    assert set(counts) <= set(table.keys)
+    for key in table.keys:
+        p = weights[key] / total
+        # ไม่เกิน 5 เท่าของส่วนเบี่ยงเบนมาตรฐานของทวินาม (seed ตายตัว ผลจึงไม่แกว่ง)
+        assert abs(counts[key] - n * p) <= 5 * math.sqrt(n * p * (1 - p))
+
+def test_alias_table_needs_a_positive_weight():
+    with pytest.raises(ValueError):
+        AliasTable({"a": 0, "b": 0})
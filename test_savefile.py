@@ -0,0 +1,122 @@
+# test_savefile.py - ไฟล์เซฟแบบ checkpoint + delta log: โหลดได้ state ล่าสุดเสมอ แม้ log ขาดกลางบรรทัด
+# Run: python -m pytest -q
+import errno
+import json
+import os
+
+import pytest
+
+import savefile
+from savefile import SaveLog, load_save, read_save
+
+def state(gold, **extra):
+    return {"name": "Geralt", "gold": gold, "bag": {"Swallow": 1}, **extra}
+
+@pytest.fixture(params=[True, False], ids=["binary", "json"])
+def log(tmp_path, request):
+    return SaveLog(str(tmp_path / "save.sav"), checkpoint_every=3, binary=request.param)
+
+def log_lines(log):
+    with open(log.log_path, "rb") as f:
+        return f.read().splitlines()
+
+def test_first_save_is_a_checkpoint_then_deltas(log):
+    log.save(state(1))
+    assert log_lines(log) == []
+    log.save(state(2, quest="drowner"))
+    log.save(state(3))  # quest ถูกลบ
+    assert len(log_lines(log)) == 2
+    assert read_save(log.path) == state(3)
+    assert log.save(state(3)) == 0  # ไม่มีอะไรเปลี่ยน ไม่เขียน
+
+def test_checkpoint_every_folds_the_log(log):
+    for gold in range(1, 6):
+        log.save(state(gold))
+    # checkpoint, delta x3, checkpoint
+    assert log_lines(log) == []
+    loaded, seq, replayed = load_save(log.path)
+    assert loaded == state(5) and replayed == 0 and seq == log.seq
+
+def test_torn_tail_is_ignored(log):
+    log.save(state(1))
+    log.save(state(2))
+    with open(log.log_path, "ab") as f:
+        f.write(b'{"seq":99,"set":[[["gold"],')  # เครื่องดับกลางบรรทัด
+    assert read_save(log.path) == state(2)
+    # โปรเซสใหม่ (SaveLog ใหม่) เขียน checkpoint ทับ log ที่ขาด แล้ว delta ต่อจากนั้นโหลดได้ครบ
+    fresh = SaveLog(log.path, checkpoint_every=3, binary=log.binary)
+    fresh.save(state(3))
+    fresh.save(state(4))
+    assert read_save(log.path) == state(4)
+
+def test_stale_deltas_after_checkpoint_are_skipped(log):
+    log.save(state(1))
+    log.save(state(2))
+    stale = log_lines(log)
+    log.checkpoint(state(3))
+    with open(log.log_path, "ab") as f:  # เหมือนเครื่องดับก่อนล้าง log
+        f.write(b"\n".join(stale) + b"\n")
+    assert read_save(log.path) == state(3)
+
+class FullDisk:
+    """ไฟล์ที่เขียนได้ n ไบต์แล้วดิสก์เต็ม"""
+    def __init__(self, f, room):
+        self._f = f
+        self.room = room
+
+    def write(self, data):
+        if self.room <= 0:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        n = self._f.write(bytes(data[:self.room]))
+        self.room -= n
+        return n
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+def test_failed_append_leaves_no_torn_line(log, monkeypatch):
+    log.save(state(1))
+    log.save(state(2))
+    before = os.path.getsize(log.log_path)
+    monkeypatch.setattr(savefile, "open", lambda *a, **k: FullDisk(open(*a, **k), 5), raising=False)
+    with pytest.raises(OSError):
+        log.save(state(3))
+    monkeypatch.undo()
+    assert os.path.getsize(log.log_path) == before
+    log.save(state(4))  # เล่นต่อหลังดิสก์ว่าง: ไม่หาย
+    log.save(state(5))
+    assert read_save(log.path) == state(5)
+    for line in log_lines(log):
+        json.loads(line)
+
+def test_reader_of_an_old_checkpoint_ignores_newer_deltas(log):
+    # ตัวอ่านไม่ล็อก: อ่านไฟล์หลักก่อน checkpoint ใหม่ แต่อ่าน log หลังจากนั้น
+    log.save(state(1, quest="a"))
+    with open(log.path, "rb") as f:
+        old_checkpoint = f.read()
+    for gold in range(2, 7):
+        log.save(state(gold, quest="b"))
+    assert log_lines(log)  # มี delta ของ checkpoint ใหม่
+    with open(log.path, "wb") as f:
+        f.write(old_checkpoint)
+    assert read_save(log.path) == state(1, quest="a")
+
+def test_two_writers_on_one_file_last_save_wins(tmp_path):
+    # สองโปรเซส (SaveLog แยกกัน) บันทึกเซฟไฟล์เดียวกันสลับกัน
+    path = str(tmp_path / "save.sav")
+    a = SaveLog(path, checkpoint_every=4, binary=True)
+    b = SaveLog(path, checkpoint_every=4, binary=True)
+    a.save(state(1, a_only=1))
+    b.save(state(2, b_only=2))
+    assert read_save(path) == state(2, b_only=2)
+    for gold in range(3, 20):
+        writer = a if gold % 3 else b
+        expected = state(gold, by="a" if writer is a else "b")
+        writer.save(expected)
+        assert read_save(path) == expected
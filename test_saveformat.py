@@ -0,0 +1,92 @@
+# test_saveformat.py - schema ของไฟล์เซฟ: เซฟเก่า (v1) โหลดได้หลังแปลง และไฟล์ไบนารี/JSON อ่านกลับได้เหมือนเดิม
+# Run: python -m pytest -q
+import json
+
+import pytest
+
+import game
+import witcher
+from saveformat import (
+    BINARY_MAGIC, SCHEMA_KEY, current_version, decode, encode, migrate, migration, stamp, upgraded,
+)
+
+WITCHER_V1 = {
+    "name": "Geralt", "school": "Wolf", "level": 3, "exp": 40, "gold": 250,
+    "inventory": ["Bread", "Swallow", "Bread", "Drowner Brain"],
+    "max_hp": 120, "base_dmg": 14, "sign_power": 2, "crit_chance": 10,
+}
+
+GAME_V1 = {
+    "player": {
+        "name": "A", "race": "human", "char_class": "warrior", "max_hp": 120, "hp": 90,
+        "base_damage": 10, "armor": 2, "gold": 55, "exp": 10, "level": 2,
+        "inventory": ["น้ำยาบำบัด", "ดาบยาว", "น้ำยาบำบัด"],
+    },
+    "game_stats": {"enemies_defeated": 4, "save_timestamp": 0},
+}
+
+def test_witcher_v1_save_loads_as_v2():
+    player = witcher.Witcher.from_dict(WITCHER_V1)
+    assert player.inventory.count("Bread") == 2
+    assert player.active_quests == []
+    data = player.to_dict()
+    assert data[SCHEMA_KEY] == current_version("witcher") == 2
+    assert data["inventory"] == {"Bread": 2, "Swallow": 1, "Drowner Brain": 1}
+    assert "active_quests" not in WITCHER_V1 and isinstance(WITCHER_V1["inventory"], list)  # ไม่แตะ dict ต้นฉบับ
+
+def test_game_v1_save_migrates_player():
+    data = migrate("game", json.loads(json.dumps(GAME_V1)))
+    assert data[SCHEMA_KEY] == current_version("game") == 2
+    assert data["player"]["inventory"] == {"น้ำยาบำบัด": 2, "ดาบยาว": 1}
+    assert data["player"]["status_effects"] == []
+    player = game.Character.from_dict(data["player"])
+    assert player.inventory.count("น้ำยาบำบัด") == 2 and player.hp == 90
+
+def test_v1_saves_that_already_store_counts_keep_them():
+    # เซฟจากช่วงที่มี Inventory แล้วแต่ยังไม่มี schema: กระเป๋าเป็น {ชื่อ: จำนวน} อยู่แล้ว
+    counts = {"Bread": 2, "Swallow": 1}
+    player = witcher.Witcher.from_dict(dict(WITCHER_V1, inventory=counts))
+    assert player.inventory.quantities() == counts
+    data = json.loads(json.dumps(GAME_V1))
+    data["player"]["inventory"] = {"น้ำยาบำบัด": 3}
+    assert migrate("game", data)["player"]["inventory"] == {"น้ำยาบำบัด": 3}
+
+def test_newer_schema_is_rejected():
+    with pytest.raises(ValueError):
+        migrate("witcher", {SCHEMA_KEY: current_version("witcher") + 1})
+
+def test_upgraded_returns_current_state_untouched():
+    current = stamp("witcher", dict(WITCHER_V1, inventory={}, active_quests=[]))
+    assert upgraded("witcher", current) is current
+    old = dict(WITCHER_V1)
+    new = upgraded("witcher", old)
+    assert new is not old and old == WITCHER_V1
+
+def test_migrations_run_in_order():
+    steps = []
+
+    @migration("test-kind", 1)
+    def _one(data):
+        steps.append(1)
+        data["b"] = data.pop("a")
+        return data
+
+    @migration("test-kind", 2)
+    def _two(data):
+        steps.append(2)
+        data["c"] = data["b"] * 2
+        return data
+
+    assert migrate("test-kind", {"a": 3}) == {"b": 3, "c": 6, SCHEMA_KEY: 3}
+    assert steps == [1, 2]
+    assert migrate("test-kind", {"b": 1, "c": 1, SCHEMA_KEY: 3}) == {"b": 1, "c": 1, SCHEMA_KEY: 3}
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_encode_decode_round_trip(binary):
+    data = stamp("witcher", {"name": "เกรัลท์", "inventory": {"Swallow": 2}, "quests": ["a", "b"]})
+    blob = encode(data, binary)
+    assert blob.startswith(BINARY_MAGIC) == binary
+    assert decode(blob) == data
+
+def test_decode_reads_plain_json_saves():
+    assert decode(json.dumps(WITCHER_V1, indent=4).encode("utf-8")) == WITCHER_V1
@@ -0,0 +1,142 @@
+# test_server.py - เซิร์ฟเวอร์ TCP: เล่นผ่าน socket จริงบน event loop ในเทสต์
+# Run: python -m pytest -q
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import game
+import server
+from savestore import get_profile
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 30))
+
+async def start(tmp_path, **options):
+    gs = server.GameServer(hibernate_dir=str(tmp_path / "hibernate"), **options)
+    srv = await asyncio.start_server(gs.handle, "127.0.0.1", 0)
+    return gs, srv, srv.sockets[0].getsockname()[1]
+
+async def converse(port, lines, gap=0.01, quiet=0.5):
+    """ส่งคำตอบทีละบรรทัด แล้วอ่าน output จนเซิร์ฟเวอร์ปิดการเชื่อมต่อหรือเงียบไป quiet วินาที"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for line in lines:
+        await asyncio.sleep(gap)
+        try:
+            writer.write((line + "\n").encode("utf-8"))
+            await writer.drain()
+        except ConnectionError:
+            break
+    chunks = []
+    try:
+        while chunk := await asyncio.wait_for(reader.read(65536), quiet):
+            chunks.append(chunk)
+    except asyncio.TimeoutError:
+        pass  # เกมรอคำตอบถัดไปอยู่
+    writer.close()
+    return b"".join(chunks).decode("utf-8", "replace")
+
+@pytest.fixture(autouse=True)
+def isolated_saves(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(server.savestore, "SAVE_BACKEND", "sqlite")
+    monkeypatch.setattr(server.savestore, "DEFAULT_DB", str(tmp_path / "saves.db"))
+    monkeypatch.setenv("RPG_AUTOSAVE", "0")
+
+def test_game_crash_is_reported_to_the_player(tmp_path, capsys):
+    async def main():
+        gs, srv, port = await start(tmp_path)
+        # game.py: เผ่าต้องเป็นตัวเลข int() ใน create_character จะ ValueError
+        output = await converse(port, ["2", "p1", "y", "1", "A", "not-a-number"])
+        await asyncio.sleep(0.1)
+        srv.close()
+        return gs, output
+
+    gs, output = run(main())
+    assert "เกิดข้อผิดพลาดในเกม" in output
+    assert not gs.sessions
+    err = capsys.readouterr().err
+    assert "guest1 (p1) crashed" in err and "ValueError" in err
+
+def test_startup_cleanup_keeps_journals_of_live_servers(tmp_path):
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    live = tmp_path / f"{os.getpid()}-guest1.journal"
+    stale = tmp_path / f"{proc.pid}-guest1.journal"
+    for path in (live, stale):
+        path.write_text("{}")
+    server.clear_hibernated(str(tmp_path))
+    assert live.exists()  # เซิร์ฟเวอร์อีกตัวที่ใช้โฟลเดอร์เดียวกันยังรันอยู่
+    assert not stale.exists()
+
+def test_workers_refuse_the_shared_save_file(monkeypatch, capsys):
+    monkeypatch.setattr("sys.argv", ["server.py", "--workers", "2", "--backend", "file"])
+    with pytest.raises(SystemExit) as exc:
+        server.main()
+    assert exc.value.code == 2
+    assert "--backend file" in capsys.readouterr().err
+
+def game_script(seed, n=40):
+    r = random.Random(seed)
+    # เลือก "1" แล้ว intro() สร้างตัวละครสองรอบ (พฤติกรรมเดิมของ game.py)
+    return ["y", "1", "A", "1", "1", "", "A", str(r.randint(1, 4)), str(r.randint(1, 4)), ""] + [
+        r.choice(["1", "1", "", "3", "1", "2", "3", "4", "1", "0"]) for _ in range(n)
+    ]
+
+def test_hibernated_game_sessions_play_the_same(tmp_path, monkeypatch):
+    # seed ของแต่ละเซสชันมาจาก profile (p1, p2, ...) สองรอบจึงได้เกมเดียวกัน
+    title, _, resume_play = server.GAMES["2"]
+    seeded = lambda: game.main(int(get_profile()[1:]), journal_path=None)
+    monkeypatch.setitem(server.GAMES, "2", (title, seeded, resume_play))
+    monkeypatch.setattr(server, "EVICT_INTERVAL", 0.01)
+    wakes = []
+    wake = server.Session.wake
+    monkeypatch.setattr(server.Session, "wake", lambda self: wakes.append(self.name) or wake(self))
+
+    async def play(park_after, hibernate_after, gap):
+        gs, srv, port = await start(tmp_path, park_after=park_after, hibernate_after=hibernate_after, max_resident=0)
+        evictor = asyncio.create_task(gs.evict_idle())
+        outputs = await asyncio.gather(*[
+            converse(port, ["2", f"p{i}"] + game_script(i), gap) for i in range(1, 4)
+        ])
+        evictor.cancel()
+        srv.close()
+        return outputs
+
+    straight = run(play(0, 0, 0.01))
+    assert not wakes
+    parked = run(play(0.02, 0, 0.05))
+    assert wakes  # ต้องมีเซสชันถูกจอดแล้วปลุกจริง
+    assert parked == straight
+    wakes.clear()
+    hibernated = run(play(0, 0.02, 0.05))
+    assert wakes
+    assert hibernated == straight
+    assert not list((tmp_path / "hibernate").glob("*.journal"))
+
+def test_idle_sessions_hold_no_thread(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "EVICT_INTERVAL", 0.01)
+
+    async def main():
+        gs, srv, port = await start(tmp_path, park_after=0.05)
+        evictor = asyncio.create_task(gs.evict_idle())
+        connections = [await asyncio.open_connection("127.0.0.1", port) for _ in range(20)]
+        for i, (_, writer) in enumerate(connections[:10]):
+            writer.write(f"2\np{i}\n".encode("utf-8"))  # ครึ่งหนึ่งเข้าเกม อีกครึ่งค้างที่ lobby
+        await asyncio.sleep(0.5)
+        states = sorted(session.state for session in gs.sessions.values())
+        threads = [t for t in threading.enumerate() if t.name == "session"]
+        for _, writer in connections:
+            writer.close()
+        evictor.cancel()
+        srv.close()
+        await gs.close_sessions()
+        return states, threads
+
+    states, threads = run(main())
+    assert states == ["lobby"] * 10 + ["parked"] * 10
+    assert not threads
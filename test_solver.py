@@ -0,0 +1,36 @@
+# test_solver.py - solver.py (DP แบบแม่นยำ) ต้องตรงกับการต่อสู้จริงที่ simulator.py สุ่มเล่น
+# Run: python -m pytest -q
+import contextvars
+import math
+
+import pytest
+
+import solver
+import witcher
+from simulator import POLICIES, SCHOOLS, run_batch
+
+FIGHTS = 1000
+
+# คู่ที่โอกาสชนะไม่ใช่ 0 หรือ 1 ทั้งหมด (ทุก school) จึงเทียบกันได้จริง
+CASES = [
+    ("fast", "bear", False),
+    ("fast", "bruxa", False),
+    ("strong", "bandit", False),
+    ("strong", "bruxa", False),
+    ("igni", "fiend", False),
+    ("strong", "bear", True),
+]
+
+@pytest.mark.parametrize("policy_name, monster_key, conjunction", CASES)
+def test_solver_agrees_with_simulated_fights(policy_name, monster_key, conjunction):
+    for seed, school in enumerate(SCHOOLS):
+        win, _ = solver.solve(witcher.Witcher("Sim", school), monster_key, conjunction, POLICIES[policy_name])
+        task = (school, monster_key, conjunction, policy_name, FIGHTS, seed)
+        _, (n, wins, _, _) = contextvars.Context().run(run_batch, task)
+        # ไม่เกิน 5 เท่าของส่วนเบี่ยงเบนมาตรฐานของทวินาม (+1 กันกรณี win เป็น 0 หรือ 1 พอดี)
+        spread = math.sqrt(max(n * win * (1 - win), 0.0))
+        assert abs(wins - n * win) <= 5 * spread + 1, school
+
+def test_solver_rejects_items():
+    with pytest.raises(ValueError):
+        solver.action_outcomes((100, 10, 1, 5, 0), witcher.get_monsters()["bear"], "4", "Swallow")
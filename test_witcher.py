@@ -0,0 +1,24 @@
+# test_witcher.py - ตารางข้อมูลของ witcher.py ที่ใช้ร่วมกันทั้งโปรเซสต้องแก้ไม่ได้
+# Run: python -m pytest -q
+import pytest
+
+import witcher
+
+def test_recipes_are_read_only():
+    recipes = witcher.get_recipes()
+    assert recipes is witcher.get_recipes()
+    with pytest.raises(TypeError):
+        recipes["Swallow"] = {}
+    with pytest.raises(TypeError):
+        recipes["Swallow"]["desc"] = "x"
+    with pytest.raises(TypeError):
+        recipes["Swallow"]["ingredients"]["Drowner Brain"] = 0
+    assert dict(recipes["Swallow"]["ingredients"]) == witcher.load_pack()["recipes"]["Swallow"]["ingredients"]
+
+def test_brewing_leaves_recipes_unchanged():
+    before = {name: dict(recipe["ingredients"]) for name, recipe in witcher.get_recipes().items()}
+    player = witcher.Witcher("Ger", "Wolf")
+    player.inventory.extend(["Drowner Brain", "Dwarven Spirit"] * 3)
+    player.brew_max("Swallow")
+    assert player.inventory.count("Swallow") == 3
+    assert {name: dict(recipe["ingredients"]) for name, recipe in witcher.get_recipes().items()} == before
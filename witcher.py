@@ -1,9 +1,19 @@
-import random
-import time
 import json
 import os
 import sys
 import io
+from functools import lru_cache
+from types import MappingProxyType
+
+from autosave import AUTOSAVE_ENABLED, Autosaver, get_autosaver, use_autosaver
+from datacache import load_json
+from inventory import Inventory
+from iodriver import ask, clear_screen, get_driver, pause, say, use_driver
+from journal import Journal, RecordingDriver, checkpoint, replay, replaying, resume, use_journal
+from rng import AliasTable, SessionRNG, get_rng, use_rng
+from saveformat import migration, stamp, upgraded
+from savefile import read_save, save_log
+from savestore import get_profile, get_store, use_sqlite
 
 # === System Setup ===
 def setup_windows_encoding():
@@ -34,133 +44,201 @@ class Colors:
     END = '\033[0m'
 
 def roll_dice(sides, modifier=0):
-    return random.randint(1, sides) + modifier
-
-def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    return get_rng().roll(sides, modifier)
 
 def print_separator():
-    print(f"{Colors.WHITE}" + "="*60 + f"{Colors.END}")
+    say(f"{Colors.WHITE}" + "="*60 + f"{Colors.END}")
 
 # === Data & Config ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-SAVE_FILE = os.path.join(BASE_DIR, "save.json")
-
-def get_monsters(conjunction_active=False):
-    monsters = {
-        "drowner": {
-            "name": "Drowner", "hp": 25, "min_dmg": 3, "max_dmg": 7,
-            "type": "Necrophage", "desc": "พรายน้ำ ตัวเหม็นคาว แพ้ไฟ",
-            "weakness": "Igni", "loot": "Drowner Brain", "exp": 20
-        },
-        "ghoul": {
-            "name": "Ghoul", "hp": 30, "min_dmg": 4, "max_dmg": 9,
-            "type": "Necrophage", "desc": "กินซากศพ เคลื่อนที่ไว",
-            "weakness": "Necrophage Oil", "loot": "Ghoul Blood", "exp": 25
-        },
-        "bandit": {
-            "name": "Bandit Leader", "hp": 40, "min_dmg": 5, "max_dmg": 10,
-            "type": "Human", "desc": "โจรป่าดักปล้นนักเดินทาง",
-            "weakness": "Axii", "loot": "Oren Pouch", "exp": 30
-        },
-        "bear": {
-            "name": "Grizzly Bear", "hp": 60, "min_dmg": 8, "max_dmg": 14,
-            "type": "Beast", "desc": "หมีดุร้าย พละกำลังมหาศาล",
-            "weakness": "Quen", "loot": "Bear Fat", "exp": 40
-        },
-        "bruxa": {
-            "name": "Bruxa", "hp": 55, "min_dmg": 10, "max_dmg": 18,
-            "type": "Vampire", "desc": "แวมไพร์สาว ล่องหนได้",
-            "weakness": "Yrden", "loot": "Vampire Fang", "exp": 60
-        },
-        "fiend": {
-            "name": "Fiend", "hp": 100, "min_dmg": 12, "max_dmg": 22,
-            "type": "Relict", "desc": "อสูรสามตา สะกดจิตได้",
-            "weakness": "Samum Bomb", "loot": "Fiend Eye", "exp": 100
-        }
-    }
+SAVE_FILE = os.path.join(BASE_DIR, "save.sav")
+LEGACY_SAVE_FILE = os.path.join(BASE_DIR, "save.json")  # เซฟ JSON ก่อนมี save.sav
+JOURNAL_FILE = os.path.join(BASE_DIR, "save.journal")
+
+PACK_FILE = os.path.join(BASE_DIR, "data", "witcher_pack.json")
+
+@lru_cache(maxsize=None)
+def load_pack():
+    # มอนสเตอร์และสูตรยาอยู่ใน data/witcher_pack.json (โหลดผ่านแคชไบนารี)
+    return load_json(PACK_FILE)
+
+@lru_cache(maxsize=None)
+def get_monsters(conjunction_active=False, difficulty=1.0):
+    # template ของมอนสเตอร์เป็นแบบอ่านอย่างเดียว สร้างครั้งเดียวต่อ (conjunction, difficulty)
+    monsters = {}
+    for key, base in load_pack()["monsters"].items():
+        monster = dict(base)
+        if conjunction_active:
+            monster['name'] = f"Chaos {monster['name']}"
+            monster['hp'] = int(monster['hp'] * 1.5)
+            monster['min_dmg'] += 4
+            monster['desc'] += f" {Colors.RED}[Conjunction]{Colors.END}"
+        if difficulty != 1.0:
+            monster['hp'] = max(1, int(monster['hp'] * difficulty))
+            monster['min_dmg'] = int(monster['min_dmg'] * difficulty)
+            monster['max_dmg'] = max(1, int(monster['max_dmg'] * difficulty))
+        monsters[key] = MappingProxyType(monster)
+    return MappingProxyType(monsters)
+
+class Monster:
+    # instance ต่อการต่อสู้: เก็บแค่ HP ที่เปลี่ยนได้ ที่เหลืออ่านจาก template
+    __slots__ = ("template", "hp")
+
+    def __init__(self, template):
+        self.template = template
+        self.hp = template['hp']
+
+    def __getitem__(self, key):
+        if key == 'hp':
+            return self.hp
+        return self.template[key]
+
+def spawn_monster(monster_key, conjunction_active=False, difficulty=1.0):
+    return Monster(get_monsters(conjunction_active, difficulty)[monster_key])
+
+QUEST_WEIGHT = 3  # มอนสเตอร์ที่รับเควสต์ไว้มีน้ำหนักเพิ่มต่อหนึ่งเควสต์ (มอนสเตอร์ปกติ = 1)
+DEFAULT_REGION = "wilderness"
+
+@lru_cache(maxsize=None)
+def encounter_table(region=DEFAULT_REGION, conjunction_active=False):
+    # ตารางสุ่มมอนสเตอร์ของภูมิภาค (น้ำหนักจาก pack คูณ conjunction_weights ตอน Conjunction)
+    pack = load_pack()
+    weights = dict(pack["regions"][region])
     if conjunction_active:
-        for key in monsters:
-            monsters[key]['name'] = f"Chaos {monsters[key]['name']}"
-            monsters[key]['hp'] = int(monsters[key]['hp'] * 1.5)
-            monsters[key]['min_dmg'] += 4
-            monsters[key]['desc'] += f" {Colors.RED}[Conjunction]{Colors.END}"
-    return monsters
-
+        for key, factor in pack["conjunction_weights"].items():
+            if key in weights:
+                weights[key] *= factor
+    return AliasTable(weights)
+
+def pick_encounter(player, conjunction_active=False, region=DEFAULT_REGION):
+    """สุ่มมอนสเตอร์ที่จะเจอ: ตารางของภูมิภาคผสมกับเควสต์ที่รับไว้ (ครั้งละ O(1))"""
+    table = encounter_table(region, conjunction_active)
+    quests = player.active_quests
+    if quests:
+        rng = get_rng()
+        quest_weight = QUEST_WEIGHT * len(quests)
+        if rng.random() * (table.total + quest_weight) >= table.total:
+            return rng.choice(quests)
+    return table.sample()
+
+@lru_cache(maxsize=None)
 def get_recipes():
-    return {
-        "Swallow": {"ingredients": {"Drowner Brain": 1, "Dwarven Spirit": 1}, "desc": "ฟื้นฟู HP"},
-        "Thunderbolt": {"ingredients": {"Ghoul Blood": 1, "Dwarven Spirit": 1}, "desc": "เพิ่มพลังโจมตี"},
-        "Cat": {"ingredients": {"Fiend Eye": 1, "Dwarven Spirit": 1}, "desc": "มองในที่มืด/คริติคอล"}
-    }
+    # อ่านอย่างเดียวเหมือน get_monsters: ตารางนี้ใช้ร่วมกันทั้งโปรเซส (และทุก worker ที่ fork มา)
+    return MappingProxyType({
+        name: MappingProxyType(dict(recipe, ingredients=MappingProxyType(dict(recipe["ingredients"]))))
+        for name, recipe in load_pack()["recipes"].items()
+    })
+
+@lru_cache(maxsize=None)
+def item_categories():
+    # หมวดของไอเทม: ยาและวัตถุดิบมาจากสูตรยา ที่เหลือจาก item_categories ใน pack
+    pack = load_pack()
+    categories = dict(pack["item_categories"])
+    for potion, recipe in pack["recipes"].items():
+        categories[potion] = "potion"
+        for ing in recipe["ingredients"]:
+            categories[ing] = "ingredient"
+    return MappingProxyType(categories)
+
+@lru_cache(maxsize=None)
+def recipes_by_ingredient():
+    # ดัชนี วัตถุดิบ -> ชื่อยาที่ใช้วัตถุดิบนั้น
+    index = {}
+    for potion, recipe in get_recipes().items():
+        for ing in recipe["ingredients"]:
+            index.setdefault(ing, []).append(potion)
+    return MappingProxyType({ing: tuple(potions) for ing, potions in index.items()})
+
+def max_brews(inventory, potion_name):
+    """จำนวนครั้งที่ปรุงยานี้ได้จากวัตถุดิบในกระเป๋า"""
+    recipe = get_recipes().get(potion_name)
+    if not recipe or not recipe["ingredients"]:
+        return 0
+    return min(inventory.count(ing) // qty for ing, qty in recipe["ingredients"].items())
+
+def plan_brews(inventory):
+    """{ชื่อยา: จำนวนสูงสุดที่ปรุงได้} ดูเฉพาะสูตรที่ใช้วัตถุดิบที่มีอยู่ (แต่ละยาคิดแยกกัน)"""
+    index = recipes_by_ingredient()
+    plan = {}
+    for ing in inventory.items_in("ingredient"):
+        for potion in index.get(ing, ()):
+            if potion not in plan:
+                plan[potion] = max_brews(inventory, potion)
+    return {potion: n for potion, n in plan.items() if n > 0}
+
+def new_inventory(items=()):
+    return Inventory(items, item_categories().get)
+
+def load_inventory(quantities):
+    return Inventory.from_quantities(quantities, item_categories().get)
+
+@lru_cache(maxsize=None)
+def starting_inventory(school):
+    # กระเป๋าเริ่มต้นของแต่ละสำนัก สร้างครั้งเดียวแล้ว copy ให้ตัวละครใหม่
+    extra_items = SCHOOL_STATS.get(school, DEFAULT_SCHOOL_STATS)[4]
+    return new_inventory(STARTING_ITEMS + extra_items)
 
 # --- Class Witcher ---
+STARTING_ITEMS = ("Witcher Silver Sword", "Bread", "Dwarven Spirit")
+
+# สำนัก: (max_hp, base_dmg, sign_power, crit_chance, ไอเทมเพิ่ม, คำอธิบาย)
+SCHOOL_STATS = {
+    "Wolf":    (110, 8, 1, 5, (), "สมดุล (Geralt's Path)"),
+    "Griffin": (90, 6, 3, 5, (), "เชี่ยวชาญ Sign"),
+    "Bear":    (150, 9, 0, 0, (), "ถึกทน โจมตีหนัก เชื่องช้า"),
+    "Cat":     (80, 10, 1, 15, (), "โจมตีรุนแรง แต่เปราะบาง"),
+    "Viper":   (100, 7, 1, 10, ("Thunderbolt",), "นักลอบสังหาร เชี่ยวชาญยาพิษ"),
+    "Lynx":    (95, 7, 1, 25, (), "สำนักใหม่ ความเร็วและคริติคอลสูงสุด"),
+}
+DEFAULT_SCHOOL_STATS = (100, 6, 1, 5, (), "")
+
 class Witcher:
+    __slots__ = (
+        "name", "school", "desc", "level", "exp", "gold", "inventory", "active_quests",
+        "max_hp", "hp", "base_dmg", "sign_power", "crit_chance", "temp_buff",
+    )
+
     def __init__(self, name, school):
+        max_hp, base_dmg, sign_power, crit_chance, _, desc = \
+            SCHOOL_STATS.get(school, DEFAULT_SCHOOL_STATS)
         self.name = name
         self.school = school
+        self.desc = desc
         self.level = 1
         self.exp = 0
         self.gold = 100
-        self.inventory = ["Witcher Silver Sword", "Bread", "Dwarven Spirit"]
+        self.inventory = starting_inventory(school).copy()
         self.active_quests = []
         
-        self.max_hp = 100
-        self.base_dmg = 6
-        self.sign_power = 1
-        self.crit_chance = 5
+        self.max_hp = max_hp
+        self.base_dmg = base_dmg
+        self.sign_power = sign_power
+        self.crit_chance = crit_chance
         self.temp_buff = 0  # บัฟชั่วคราวจากการดื่มยาก่อนสู้
-        
-        if school == "Wolf":
-            self.max_hp = 110
-            self.base_dmg = 8
-            self.desc = "สมดุล (Geralt's Path)"
-        elif school == "Griffin":
-            self.sign_power = 3
-            self.max_hp = 90
-            self.desc = "เชี่ยวชาญ Sign"
-        elif school == "Bear":
-            self.max_hp = 150
-            self.base_dmg = 9
-            self.sign_power = 0
-            self.crit_chance = 0
-            self.desc = "ถึกทน โจมตีหนัก เชื่องช้า"
-        elif school == "Cat":
-            self.max_hp = 80
-            self.base_dmg = 10
-            self.crit_chance = 15
-            self.desc = "โจมตีรุนแรง แต่เปราะบาง"
-        elif school == "Viper":
-            self.max_hp = 100
-            self.base_dmg = 7
-            self.crit_chance = 10
-            self.inventory.append("Thunderbolt")
-            self.desc = "นักลอบสังหาร เชี่ยวชาญยาพิษ"
-        elif school == "Lynx":
-            self.max_hp = 95
-            self.base_dmg = 7
-            self.crit_chance = 25
-            self.desc = "สำนักใหม่ ความเร็วและคริติคอลสูงสุด"
-        
-        self.hp = self.max_hp
+        self.hp = max_hp
 
     def to_dict(self):
-        return {
+        return stamp("witcher", {
             "name": self.name, "school": self.school, "level": self.level,
-            "exp": self.exp, "gold": self.gold, "inventory": self.inventory,
-            "active_quests": self.active_quests, "max_hp": self.max_hp,
+            "exp": self.exp, "gold": self.gold, "inventory": self.inventory.quantities(),
+            "active_quests": list(self.active_quests), "max_hp": self.max_hp,
             "base_dmg": self.base_dmg, "sign_power": self.sign_power,
             "crit_chance": self.crit_chance
-        }
+        })
 
     @classmethod
     def from_dict(cls, data):
-        player = cls(data["name"], data["school"])
+        data = upgraded("witcher", data)
+        # ไม่ผ่าน __init__: ไม่ต้องสร้างกระเป๋าเริ่มต้นที่จะถูกทับอยู่ดี
+        player = cls.__new__(cls)
+        player.name = data["name"]
+        player.school = data["school"]
+        player.desc = SCHOOL_STATS.get(player.school, DEFAULT_SCHOOL_STATS)[5]
         player.level = data["level"]
         player.exp = data["exp"]
         player.gold = data["gold"]
-        player.inventory = data["inventory"]
-        player.active_quests = data.get("active_quests", [])
+        player.inventory = load_inventory(data["inventory"])
+        player.active_quests = list(data["active_quests"])
         player.max_hp = data["max_hp"]
         player.base_dmg = data["base_dmg"]
         player.sign_power = data["sign_power"]
@@ -173,16 +251,16 @@ class Witcher:
     def take_damage(self, dmg):
         self.hp -= dmg
         if self.hp < 0: self.hp = 0
-        print(f"{Colors.RED}{self.name} โดนโจมตี {dmg} หน่วย! (เหลือ HP: {self.hp}){Colors.END}")
+        say(f"{Colors.RED}{self.name} โดนโจมตี {dmg} หน่วย! (เหลือ HP: {self.hp}){Colors.END}")
 
     def heal(self, amount):
         self.hp += amount
         if self.hp > self.max_hp: self.hp = self.max_hp
-        print(f"{Colors.GREEN}ฟื้นฟู {amount} HP (HP: {self.hp}){Colors.END}")
+        say(f"{Colors.GREEN}ฟื้นฟู {amount} HP (HP: {self.hp}){Colors.END}")
 
     def gain_exp(self, amount):
         self.exp += amount
-        print(f"ได้รับ {amount} EXP")
+        say(f"ได้รับ {amount} EXP")
         # Level up logic check
         req_exp = self.level * 100
         if self.exp >= req_exp:
@@ -194,7 +272,7 @@ class Witcher:
         self.max_hp += 10
         self.base_dmg += 2
         self.hp = self.max_hp
-        print(f"\n{Colors.YELLOW}*** LEVEL UP! Rank {self.level} ***{Colors.END}")
+        say(f"\n{Colors.YELLOW}*** LEVEL UP! Rank {self.level} ***{Colors.END}")
 
     def use_sign(self, sign_name, enemy=None):
         dmg = 0
@@ -202,204 +280,373 @@ class Witcher:
         
         if sign_name == "Igni":
             dmg = 10 + (self.sign_power * 6)
-            print(f"{Colors.ORANGE}Igni!{Colors.END} พ่นไฟใส่ศัตรู")
+            say(f"{Colors.ORANGE}Igni!{Colors.END} พ่นไฟใส่ศัตรู")
         elif sign_name == "Aard":
             dmg = 4 + (self.sign_power * 2)
             effect = "stun"
-            print(f"{Colors.CYAN}Aard!{Colors.END} กระแทกศัตรู")
+            say(f"{Colors.CYAN}Aard!{Colors.END} กระแทกศัตรู")
         elif sign_name == "Quen":
-            print(f"{Colors.YELLOW}Quen!{Colors.END} สร้างเกราะ")
+            say(f"{Colors.YELLOW}Quen!{Colors.END} สร้างเกราะ")
             return 0, "shield"
         elif sign_name == "Yrden":
             effect = "slow"
-            print(f"{Colors.PURPLE}Yrden!{Colors.END} วางกับดักหนืด")
+            say(f"{Colors.PURPLE}Yrden!{Colors.END} วางกับดักหนืด")
         elif sign_name == "Axii":
             if enemy:
-                print(f"{Colors.WHITE}Axii!{Colors.END} สะกดจิต {enemy['name']} ให้มึนงง!")
+                say(f"{Colors.WHITE}Axii!{Colors.END} สะกดจิต {enemy['name']} ให้มึนงง!")
                 effect = "hypnotize"
             else:
-                print(f"{Colors.WHITE}Axii!{Colors.END} (ใช้ในการเจรจา)")
+                say(f"{Colors.WHITE}Axii!{Colors.END} (ใช้ในการเจรจา)")
         
         return dmg, effect
 
-    def brew_potion(self, potion_name):
+    def brew_potion(self, potion_name, count=1):
         recipes = get_recipes()
         if potion_name not in recipes:
-            print("ไม่รู้จักสูตรยานี้")
+            say("ไม่รู้จักสูตรยานี้")
             return
 
         ingredients_needed = recipes[potion_name]["ingredients"]
         for ing, qty in ingredients_needed.items():
-            if self.inventory.count(ing) < qty:
-                print(f"{Colors.RED}ขาดวัตถุดิบ: {ing}{Colors.END}")
+            if not self.inventory.has(ing, qty * count):
+                say(f"{Colors.RED}ขาดวัตถุดิบ: {ing}{Colors.END}")
                 return
         
         for ing, qty in ingredients_needed.items():
-            for _ in range(qty):
-                self.inventory.remove(ing)
+            self.inventory.take(ing, qty * count)
         
-        self.inventory.append(potion_name)
-        print(f"{Colors.GREEN}ปรุงยา {potion_name} สำเร็จ!{Colors.END}")
+        self.inventory.add(potion_name, count)
+        amount = f" x{count}" if count > 1 else ""
+        say(f"{Colors.GREEN}ปรุงยา {potion_name}{amount} สำเร็จ!{Colors.END}")
+        autosave(self)
+
+    def brew_max(self, potion_name):
+        # ปรุงยาให้ได้มากที่สุดเท่าที่วัตถุดิบพอ
+        count = max_brews(self.inventory, potion_name)
+        if count == 0:
+            self.brew_potion(potion_name)  # แจ้งว่าไม่รู้จักสูตร/ขาดวัตถุดิบอะไร
+            return
+        self.brew_potion(potion_name, count)
+
+@migration("witcher", 1)
+def _witcher_v1_to_v2(data):
+    # v2: กระเป๋าเก็บเป็น {ชื่อ: จำนวน} เสมอ (เซฟก่อนมี Inventory เป็น list) และมี active_quests เสมอ
+    if not isinstance(data["inventory"], dict):
+        data["inventory"] = new_inventory(data["inventory"]).quantities()
+    data.setdefault("active_quests", [])
+    return data
+
+# --- World State ---
+class World:
+    def __init__(self, player=None):
+        self.player = player
+        self.battles = 0
+        self.conjunction = False
+        self.region = DEFAULT_REGION
+
+    def to_dict(self):
+        # hp/temp_buff ไม่อยู่ใน Witcher.to_dict() แต่ต้องใช้ตอนเล่น journal ซ้ำ
+        return {
+            "player": self.player.to_dict(), "hp": self.player.hp,
+            "temp_buff": self.player.temp_buff, "battles": self.battles,
+            "conjunction": self.conjunction, "region": self.region
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        player = Witcher.from_dict(data["player"])
+        player.hp = data["hp"]
+        player.temp_buff = data["temp_buff"]
+        world = cls(player)
+        world.battles = data["battles"]
+        world.conjunction = data["conjunction"]
+        world.region = data.get("region", DEFAULT_REGION)
+        return world
 
 # === Game Systems ===
+def save_state(player):
+    data = player.to_dict()
+    data["rng"] = get_rng().to_dict()
+    return data
+
+def write_save(data):
+    # เขียน state ลง SQLite (สล็อต 0 ของ profile) หรือไฟล์เซฟ ใช้ทั้งเมนูบันทึกและ autosave
+    if replaying():
+        return  # เล่น journal ซ้ำ: เซฟนี้เคยเขียนไปแล้ว และไม่ควรทับเซฟที่ใหม่กว่า
+    if use_sqlite():
+        get_store().put("witcher", get_profile(), 0, data, data["name"], data["level"], data["school"])
+    else:
+        save_log(SAVE_FILE).save(data)
+
 def save_game(player):
     try:
-        print(f"บันทึกที่: {os.path.abspath(SAVE_FILE)}")
-        with open(SAVE_FILE, "w", encoding="utf-8") as f:
-            json.dump(player.to_dict(), f, ensure_ascii=False, indent=4)
-        print(f"{Colors.GREEN}>> บันทึกเกมเรียบร้อยที่ {SAVE_FILE}{Colors.END}")
+        if not use_sqlite():
+            say(f"บันทึกที่: {os.path.abspath(SAVE_FILE)}")
+        saver = get_autosaver()
+        if saver is not None:
+            saver.discard()  # autosave ที่ค้างอยู่เก่ากว่าเซฟนี้ ห้ามเขียนทับทีหลัง
+        write_save(save_state(player))
+        if use_sqlite():
+            say(f"{Colors.GREEN}>> บันทึกเกมเรียบร้อย (profile: {get_profile()}){Colors.END}")
+        else:
+            say(f"{Colors.GREEN}>> บันทึกเกมเรียบร้อยที่ {SAVE_FILE}{Colors.END}")
     except Exception as e:
-        print(f"{Colors.RED}เกิดข้อผิดพลาดในการบันทึก: {e}{Colors.END}")
+        say(f"{Colors.RED}เกิดข้อผิดพลาดในการบันทึก: {e}{Colors.END}")
+
+def autosave(player):
+    """ส่ง snapshot ให้ autosave เขียนเบื้องหลัง (ถ้าเซสชันนี้เปิด autosave ไว้)"""
+    saver = get_autosaver()
+    if saver is not None and not replaying():
+        saver.save(save_state(player))
+
+def read_saved_state():
+    # state ที่บันทึกไว้ของ profile ปัจจุบัน (SQLite) หรือไฟล์เซฟ, None ถ้าไม่มี
+    if use_sqlite():
+        return get_store().get("witcher", get_profile(), 0)
+    path = SAVE_FILE if os.path.exists(SAVE_FILE) else LEGACY_SAVE_FILE
+    if not os.path.exists(path):
+        return None
+    return read_save(path)
 
 def load_game():
-    if not os.path.exists(SAVE_FILE):
-        print(f"{Colors.RED}ไม่พบไฟล์เซฟ{Colors.END}")
-        return None
     try:
-        with open(SAVE_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return Witcher.from_dict(data)
+        data = read_saved_state()
+        if data is None:
+            say(f"{Colors.RED}ไม่พบไฟล์เซฟ{Colors.END}")
+            return None
+        if "rng" in data:
+            use_rng(SessionRNG.from_dict(data["rng"]))
+        return Witcher.from_dict(data)
     except Exception as e:
-        print(f"{Colors.RED}ไฟล์เซฟเสียหาย: {e}{Colors.END}")
+        say(f"{Colors.RED}ไฟล์เซฟเสียหาย: {e}{Colors.END}")
         return None
 
-def combat(player, monster_key, conjunction_active):
-    monsters = get_monsters(conjunction_active)
-    monster = monsters[monster_key].copy()
-    
+# --- Combat (state machine) ---
+# การต่อสู้หนึ่งครั้งเป็น CombatState ที่รอคำตอบของผู้เล่นอยู่ที่ prompt หนึ่ง
+# combat_step(state, action) เดินหนึ่งขั้นแล้วคืน (state, events) ไม่มีการรอ input ข้างใน
+# จึงพักการต่อสู้ไว้ระหว่างรอผู้เล่น (to_dict) แล้วเล่นต่อที่ worker อื่น (from_dict) ได้
+# events: ("hit", ดาเมจ) ("hurt", ดาเมจ) ("victory", monster_key) ("defeat", monster_key)
+# ข้อความบรรยายยังออกผ่าน say() ของเซสชันเหมือนส่วนอื่นของเกม
+COMBAT_PROMPTS = {
+    "action": "Action: ",
+    "sign": "Select: ",
+    "item": "พิมพ์ชื่อไอเทม (หรือ Enter เพื่อปิด): ",
+}
+SIGNS = {"1": "Igni", "2": "Aard", "3": "Quen", "4": "Yrden", "5": "Axii"}
+
+class CombatState:
+    __slots__ = ("player", "monster_key", "conjunction", "monster", "shield", "stunned", "phase")
+
+    def __init__(self, player, monster_key, conjunction_active):
+        self.player = player
+        self.monster_key = monster_key
+        self.conjunction = conjunction_active
+        self.monster = spawn_monster(monster_key, conjunction_active)
+        self.shield = 0
+        self.stunned = False
+        self.phase = "action"  # action / sign / item รอคำตอบ, won / lost จบแล้ว
+
+    @property
+    def prompt(self):
+        return COMBAT_PROMPTS.get(self.phase)
+
+    @property
+    def finished(self):
+        return self.phase in ("won", "lost")
+
+    def to_dict(self):
+        return {
+            "player": self.player.to_dict(), "player_hp": self.player.hp,
+            "temp_buff": self.player.temp_buff, "monster": self.monster_key,
+            "conjunction": self.conjunction, "monster_hp": self.monster.hp,
+            "shield": self.shield, "stunned": self.stunned, "phase": self.phase,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        player = Witcher.from_dict(data["player"])
+        player.hp = data["player_hp"]
+        player.temp_buff = data["temp_buff"]
+        state = cls(player, data["monster"], data["conjunction"])
+        state.monster.hp = data["monster_hp"]
+        state.shield = data["shield"]
+        state.stunned = data["stunned"]
+        state.phase = data["phase"]
+        return state
+
+def start_combat(player, monster_key, conjunction_active):
+    """เปิดการต่อสู้ คืน (state, events) ที่รอคำสั่งแรกของผู้เล่น"""
+    state = CombatState(player, monster_key, conjunction_active)
     print_separator()
-    print(f"{Colors.RED}COMBAT STARTED! VS {monster['name']}{Colors.END}")
-    
+    say(f"{Colors.RED}COMBAT STARTED! VS {state.monster['name']}{Colors.END}")
+
     # แจ้งเตือนบัฟถ้ามี
     if player.temp_buff > 0:
-        print(f"{Colors.YELLOW}>> บัฟโจมตีทำงาน (+{player.temp_buff} Dmg) <<{Colors.END}")
-
-    enemy_hp = monster['hp']
-    player_shield = 0
-    enemy_stunned = False
-    
-    while player.hp > 0 and enemy_hp > 0:
-        print(f"\n{player.name}: {player.hp}/{player.max_hp} HP | {monster['name']}: {enemy_hp} HP")
-        print("1. Fast Attack  2. Strong Attack")
-        print("3. Use Sign     4. Items/Potions")
-        
-        choice = input("Action: ")
-        dmg_dealt = 0
-        
-        # Player Turn
-        if choice == "1":
+        say(f"{Colors.YELLOW}>> บัฟโจมตีทำงาน (+{player.temp_buff} Dmg) <<{Colors.END}")
+
+    events = []
+    _next_turn(state, events)
+    return state, events
+
+def _next_turn(state, events):
+    player, monster = state.player, state.monster
+    if player.hp > 0 and monster.hp > 0:
+        say(f"\n{player.name}: {player.hp}/{player.max_hp} HP | {monster['name']}: {monster.hp} HP")
+        say("1. Fast Attack  2. Strong Attack")
+        say("3. Use Sign     4. Items/Potions")
+        state.phase = "action"
+    else:
+        player.temp_buff = 0  # แพ้แล้ว Reset Buff
+        state.phase = "lost"
+        events.append(("defeat", state.monster_key))
+
+def combat_step(state, action):
+    """ใส่คำตอบของผู้เล่นหนึ่งครั้ง แล้วเดินการต่อสู้ไปจนถึง prompt ถัดไป (หรือจบ)"""
+    player, monster = state.player, state.monster
+    events = []
+    dmg_dealt = 0
+
+    if state.phase == "action":
+        if action == "1":
             if roll_dice(100) <= player.crit_chance:
                 dmg_dealt = (player.base_dmg * 2) + player.temp_buff
-                print(f"{Colors.YELLOW}CRITICAL HIT!{Colors.END}")
+                say(f"{Colors.YELLOW}CRITICAL HIT!{Colors.END}")
             else:
                 dmg_dealt = player.base_dmg + roll_dice(3) + player.temp_buff
-        
-        elif choice == "2":
+
+        elif action == "2":
             if roll_dice(100) > 40: # Hit chance
                 dmg_dealt = player.base_dmg + roll_dice(8) + 2 + player.temp_buff
-                print("ฟันรุนแรง!")
+                say("ฟันรุนแรง!")
             else:
-                print("โจมตีหนักพลาดเป้า!")
-        
-        elif choice == "3":
-            print("Signs: (1)Igni (2)Aard (3)Quen (4)Yrden (5)Axii")
-            s = input("Select: ")
-            s_dmg, effect = 0, ""
-            if s=="1": s_dmg, effect = player.use_sign("Igni", monster)
-            if s=="2": s_dmg, effect = player.use_sign("Aard", monster)
-            if s=="3": s_dmg, effect = player.use_sign("Quen", monster)
-            if s=="4": s_dmg, effect = player.use_sign("Yrden", monster)
-            if s=="5": s_dmg, effect = player.use_sign("Axii", monster)
-            
-            dmg_dealt = s_dmg
-            if effect == "shield": player_shield = 20
-            if effect == "stun": enemy_stunned = True 
-            if effect == "hypnotize": 
-                enemy_stunned = True
-                print(f"{monster['name']} ยืนนิ่งด้วยความมึนงง!")
-            
-            if monster['weakness'] == "Igni" and s=="1": dmg_dealt *= 1.5
-            if monster['weakness'] == "Axii" and s=="5": 
-                print(f"{Colors.GREEN}Axii ได้ผลดีเยี่ยมกับ {monster['name']}!{Colors.END}")
-                enemy_stunned = True 
-        
-        elif choice == "4":
-            print(f"Inventory: {player.inventory}")
-            use = input("พิมพ์ชื่อไอเทม (หรือ Enter เพื่อปิด): ")
-            
-            # Fix Cancelling inventory ---
-            if use == "":
-                continue
-
+                say("โจมตีหนักพลาดเป้า!")
+
+        elif action == "3":
+            say("Signs: (1)Igni (2)Aard (3)Quen (4)Yrden (5)Axii")
+            state.phase = "sign"
+            return state, events
+
+        elif action == "4":
+            say(f"Inventory: {player.inventory}")
+            state.phase = "item"
+            return state, events
+
+    elif state.phase == "sign":
+        s_dmg, effect = 0, ""
+        if action in SIGNS:
+            s_dmg, effect = player.use_sign(SIGNS[action], monster)
+
+        dmg_dealt = s_dmg
+        if effect == "shield": state.shield = 20
+        if effect == "stun": state.stunned = True
+        if effect == "hypnotize":
+            state.stunned = True
+            say(f"{monster['name']} ยืนนิ่งด้วยความมึนงง!")
+
+        if monster['weakness'] == "Igni" and action=="1": dmg_dealt *= 1.5
+        if monster['weakness'] == "Axii" and action=="5":
+            say(f"{Colors.GREEN}Axii ได้ผลดีเยี่ยมกับ {monster['name']}!{Colors.END}")
+            state.stunned = True
+
+    elif state.phase == "item":
+        use = action
+        if use in player.inventory and use == "Swallow":
+            player.heal(30)
+            player.inventory.remove(use)
+        elif use in player.inventory and use == "Thunderbolt":
+            say("พลังโจมตีเพิ่มขึ้นชั่วคราว!")
+            dmg_dealt += 10
+            player.inventory.remove(use)
+        else:
+            # Enter ปิดกระเป๋า / ไอเทมใช้ไม่ได้ / ไม่มีไอเทม: ไม่เสียเทิร์น
             if use in player.inventory:
-                if use == "Swallow":
-                    player.heal(30)
-                    player.inventory.remove(use)
-                elif use == "Thunderbolt":
-                    print("พลังโจมตีเพิ่มขึ้นชั่วคราว!")
-                    dmg_dealt += 10 
-                    player.inventory.remove(use)
-                else:
-                    print("ไอเทมนี้ใช้ในต่อสู้ไม่ได้")
-                    continue # ไม่เสียเทิร์นถ้าเลือกผิด
-            else:
-                print("ไม่มีไอเทมนั้น")
-                continue # ไม่เสียเทิร์น
+                say("ไอเทมนี้ใช้ในต่อสู้ไม่ได้")
+            elif use != "":
+                say("ไม่มีไอเทมนั้น")
+            _next_turn(state, events)
+            return state, events
 
-        # Apply Damage
-        if dmg_dealt > 0:
-            enemy_hp -= int(dmg_dealt)
-            print(f"ทำดาเมจ {int(dmg_dealt)} หน่วย")
-        
-        if enemy_hp <= 0:
-            print(f"\n{Colors.GREEN}VICTORY!{Colors.END}")
-            print(f"ได้รับ: {monster['loot']} และ {monster['exp']} XP")
-            player.inventory.append(monster['loot'])
-            player.gain_exp(monster['exp'])
-            player.temp_buff = 0 # รีเซ็ตบัฟหลังจบการต่อสู้
-            
-            # Check Quest Completion
-            if monster_key in player.active_quests:
-                print(f"{Colors.YELLOW}>> เควสต์กำจัด {monster['name']} สำเร็จ! รับรางวัล 100 Gold <<{Colors.END}")
-                player.gold += 100
-                player.active_quests.remove(monster_key)
-            return True
-
-        # Enemy Turn
-        if enemy_stunned:
-            print(f"{monster['name']} ติดสถานะมึนงง/สะกดจิต! (ข้ามเทิร์น)")
-            enemy_stunned = False
+    else:
+        raise ValueError(f"การต่อสู้จบไปแล้ว ({state.phase})")
+
+    # Apply Damage
+    if dmg_dealt > 0:
+        monster.hp -= int(dmg_dealt)
+        say(f"ทำดาเมจ {int(dmg_dealt)} หน่วย")
+        events.append(("hit", int(dmg_dealt)))
+
+    if monster.hp <= 0:
+        say(f"\n{Colors.GREEN}VICTORY!{Colors.END}")
+        say(f"ได้รับ: {monster['loot']} และ {monster['exp']} XP")
+        player.inventory.append(monster['loot'])
+        player.gain_exp(monster['exp'])
+        player.temp_buff = 0 # รีเซ็ตบัฟหลังจบการต่อสู้
+
+        # Check Quest Completion
+        if state.monster_key in player.active_quests:
+            say(f"{Colors.YELLOW}>> เควสต์กำจัด {monster['name']} สำเร็จ! รับรางวัล 100 Gold <<{Colors.END}")
+            player.gold += 100
+            player.active_quests.remove(state.monster_key)
+        autosave(player)
+        state.phase = "won"
+        events.append(("victory", state.monster_key))
+        return state, events
+
+    # Enemy Turn
+    if state.stunned:
+        say(f"{monster['name']} ติดสถานะมึนงง/สะกดจิต! (ข้ามเทิร์น)")
+        state.stunned = False
+    else:
+        enemy_dmg = roll_dice(monster['max_dmg'], monster['min_dmg'])
+        if state.shield > 0:
+            say(f"{Colors.YELLOW}Quen รับดาเมจแทน!{Colors.END}")
+            state.shield = 0
+            enemy_dmg = 0
+
+        player.take_damage(enemy_dmg) # method exists
+        events.append(("hurt", enemy_dmg))
+
+    _next_turn(state, events)
+    return state, events
+
+def combat(player, monster_key, conjunction_active, policy=None):
+    # policy(player, monster, enemy_hp) -> (choice, arg) ใช้แทน ask() ในโหมด headless
+    state, _ = start_combat(player, monster_key, conjunction_active)
+    arg = None
+    while not state.finished:
+        if policy is None:
+            action = ask(state.prompt)
+        elif state.phase == "action":
+            action, arg = policy(player, state.monster, state.monster.hp)
         else:
-            enemy_dmg = roll_dice(monster['max_dmg'], monster['min_dmg'])
-            if player_shield > 0:
-                print(f"{Colors.YELLOW}Quen รับดาเมจแทน!{Colors.END}")
-                player_shield = 0
-                enemy_dmg = 0
-            
-            player.take_damage(enemy_dmg) # method exists
-            
-    # ถ้าแพ้แล้ว Reset Buff
-    player.temp_buff = 0
-    return False
+            action = arg
+        combat_step(state, action)
+    return state.phase == "won"
 
 # --- Town & Interaction ---
 def alchemy_menu(player):
     print_separator()
-    print("--- ALCHEMY STATION ---")
+    say("--- ALCHEMY STATION ---")
     recipes = get_recipes()
     for name, data in recipes.items():
-        print(f"{name}: {data['desc']}")
+        say(f"{name}: {data['desc']}")
         req_str = ", ".join([f"{k} x{v}" for k,v in data['ingredients'].items()])
-        print(f"  ต้องการ: {req_str}")
+        say(f"  ต้องการ: {req_str}")
     
-    print(f"\nวัตถุดิบที่มี: {[i for i in player.inventory if 'Brain' in i or 'Blood' in i or 'Spirit' in i or 'Eye' in i]}")
-    choice = input("พิมพ์ชื่อยาเพื่อปรุง (หรือ Enter เพื่อออก): ")
-    if choice:
+    have_str = ", ".join([f"{i} x{player.inventory.count(i)}" for i in player.inventory.items_in("ingredient")])
+    say(f"\nวัตถุดิบที่มี: {have_str}")
+    plan = plan_brews(player.inventory)
+    if plan:
+        say(f"{Colors.GREEN}ปรุงได้ตอนนี้: {', '.join([f'{k} x{v}' for k, v in plan.items()])}{Colors.END}")
+    choice = ask("พิมพ์ชื่อยาเพื่อปรุง (ต่อท้าย ' max' เพื่อปรุงให้มากที่สุด) หรือ Enter เพื่อออก: ")
+    if choice.endswith(" max"):
+        player.brew_max(choice[:-len(" max")].strip())
+    elif choice:
         player.brew_potion(choice)
 
 def shop_menu(player):
     print_separator()
-    print(f"--- MERCHANT (Gold: {player.gold}) ---")
+    say(f"--- MERCHANT (Gold: {player.gold}) ---")
     items = {
         "1": {"name": "Bread", "price": 5, "type": "food"},
         "2": {"name": "Dwarven Spirit", "price": 15, "type": "ingredient"},
@@ -407,225 +654,264 @@ def shop_menu(player):
         "4": {"name": "Witcher Steel Sword", "price": 100, "type": "weapon"}
     }
     for k, v in items.items():
-        print(f"{k}. {v['name']} - {v['price']} Gold")
+        say(f"{k}. {v['name']} - {v['price']} Gold")
     
-    buy = input("เลือกซื้อ (1-4) หรือกด Enter เพื่อออก: ")
+    buy = ask("เลือกซื้อ (1-4) หรือกด Enter เพื่อออก: ")
     if buy in items:
         item = items[buy]
         if player.gold >= item['price']:
             player.gold -= item['price']
             player.inventory.append(item['name'])
-            print(f"ซื้อ {item['name']} สำเร็จ!")
+            say(f"ซื้อ {item['name']} สำเร็จ!")
+            autosave(player)
         else:
-            print("เงินไม่พอ!")
+            say("เงินไม่พอ!")
 
 def notice_board(player):
     print_separator()
-    print("--- NOTICE BOARD ---")
+    say("--- NOTICE BOARD ---")
     contracts = ["drowner", "ghoul", "bandit", "bear"]
-    daily_contract = random.choice(contracts)
+    daily_contract = get_rng().choice(contracts)
     
-    print(f"ประกาศ: ชาวบ้านเดือดร้อนจาก {daily_contract}!")
-    print(f"รางวัล: 100 Gold")
+    say(f"ประกาศ: ชาวบ้านเดือดร้อนจาก {daily_contract}!")
+    say(f"รางวัล: 100 Gold")
     
     if daily_contract in player.active_quests:
-        print("(คุณรับงานนี้ไปแล้ว)")
+        say("(คุณรับงานนี้ไปแล้ว)")
     else:
-        confirm = input("ดึงป้ายประกาศรับงาน? (y/n): ")
+        confirm = ask("ดึงป้ายประกาศรับงาน? (y/n): ")
         if confirm.lower() == 'y':
             player.active_quests.append(daily_contract)
-            print(f"รับงานกำจัด {daily_contract} แล้ว! ไปหามันในป่า")
+            say(f"รับงานกำจัด {daily_contract} แล้ว! ไปหามันในป่า")
 
 def talk_to_npc(player):
     print_separator()
     npcs = ["ชาวบ้านขี้เมา", "ยามหน้าเมือง", "หญิงสาวลึกลับ"]
-    npc = random.choice(npcs)
-    print(f"คุณเดินเข้าไปคุยกับ {npc}...")
+    npc = get_rng().choice(npcs)
+    say(f"คุณเดินเข้าไปคุยกับ {npc}...")
     
     if npc == "ชาวบ้านขี้เมา":
-        print("'เฮ้... วิทเชอร์... มีเศษเงินสัก 5 โอเรนไหม?'")
-        choice = input("1. ให้เงิน  2. ใช้ Axii ไล่ไป: ")
+        say("'เฮ้... วิทเชอร์... มีเศษเงินสัก 5 โอเรนไหม?'")
+        choice = ask("1. ให้เงิน  2. ใช้ Axii ไล่ไป: ")
         if choice == "1":
             if player.gold >= 5:
                 player.gold -= 5
-                print("เขาขอบคุณและให้ข่าวลือ: 'ข้าเห็นปีศาจตาสามดวงในป่าลึก...' (ได้เบาะแส Fiend)")
+                say("เขาขอบคุณและให้ข่าวลือ: 'ข้าเห็นปีศาจตาสามดวงในป่าลึก...' (ได้เบาะแส Fiend)")
         elif choice == "2":
             player.use_sign("Axii")
-            print("ชาวบ้านเดินจากไปแบบงงๆ")
+            say("ชาวบ้านเดินจากไปแบบงงๆ")
             
     elif npc == "ยามหน้าเมือง":
-        print("'ระวังตัวด้วย ช่วงนี้โจรชุกชุม'")
-        print("(คุณได้ข้อมูลตำแหน่ง Bandit)")
+        say("'ระวังตัวด้วย ช่วงนี้โจรชุกชุม'")
+        say("(คุณได้ข้อมูลตำแหน่ง Bandit)")
     
     elif npc == "หญิงสาวลึกลับ":
-        print("'เจ้าดูเหนื่อยนะ... สนใจสมุนไพรไหม?'")
+        say("'เจ้าดูเหนื่อยนะ... สนใจสมุนไพรไหม?'")
         player.inventory.append("Dwarven Spirit")
-        print("นางยัดขวดเหล้าใส่มือคุณแล้วเดินหนีไป")
+        say("นางยัดขวดเหล้าใส่มือคุณแล้วเดินหนีไป")
 
 def explore_town(player):
-    print(f"\n{Colors.CYAN}คุณกำลังเดินสำรวจเมือง Novigrad...{Colors.END}")
-    event = random.randint(1, 4)
+    say(f"\n{Colors.CYAN}คุณกำลังเดินสำรวจเมือง Novigrad...{Colors.END}")
+    event = get_rng().randint(1, 4)
     if event == 1:
-        print("คุณพบถุงเงินตกอยู่!")
-        found = random.randint(5, 20)
+        say("คุณพบถุงเงินตกอยู่!")
+        found = get_rng().randint(5, 20)
         player.gold += found
-        print(f"ได้รับ {found} Gold")
+        say(f"ได้รับ {found} Gold")
     elif event == 2:
-        print("นักเลงท้องถิ่นพยายามหาเรื่อง!")
-        choice = input("1. ชกต่อย  2. ใช้ Axii: ")
+        say("นักเลงท้องถิ่นพยายามหาเรื่อง!")
+        choice = ask("1. ชกต่อย  2. ใช้ Axii: ")
         if choice == "2":
             player.use_sign("Axii")
-            print("นักเลงขอโทษและวิ่งหนีไป (ได้รับ XP นิดหน่อย)")
+            say("นักเลงขอโทษและวิ่งหนีไป (ได้รับ XP นิดหน่อย)")
             player.gain_exp(10)
         else:
-            print("คุณต่อยมันร่วงในหมัดเดียว")
+            say("คุณต่อยมันร่วงในหมัดเดียว")
     else:
-        print("บรรยากาศในเมืองคึกคัก... แต่ไม่มีอะไรเกิดขึ้นเป็นพิเศษ")
+        say("บรรยากาศในเมืองคึกคัก... แต่ไม่มีอะไรเกิดขึ้นเป็นพิเศษ")
 
 def town_hub(player):
     in_town = True
     while in_town:
         clear_screen()
-        print(f"{Colors.BOLD}{Colors.BLUE}--- TOWN HUB ---{Colors.END}")
-        print(f"Player: {player.name} ({player.school}) | Gold: {player.gold}")
-        print("Quests:", player.active_quests)
-        print("1. รับงานที่ป้ายประกาศ (Notice Board)")
-        print("2. ร้านค้า (Merchant)")
-        print("3. ปรุงยา (Alchemy)")
-        print("4. เดินเล่น/คุยกับ NPC")
-        print("5. ออกจากเมือง (ไปล่า)")
-        print("6. บันทึกเกม (Save)")
+        say(f"{Colors.BOLD}{Colors.BLUE}--- TOWN HUB ---{Colors.END}")
+        say(f"Player: {player.name} ({player.school}) | Gold: {player.gold}")
+        say("Quests:", player.active_quests)
+        say("1. รับงานที่ป้ายประกาศ (Notice Board)")
+        say("2. ร้านค้า (Merchant)")
+        say("3. ปรุงยา (Alchemy)")
+        say("4. เดินเล่น/คุยกับ NPC")
+        say("5. ออกจากเมือง (ไปล่า)")
+        say("6. บันทึกเกม (Save)")
         
-        c = input("เลือก: ")
-        if c == "1": notice_board(player); input("Enter...")
-        elif c == "2": shop_menu(player); input("Enter...")
-        elif c == "3": alchemy_menu(player); input("Enter...")
+        c = ask("เลือก: ")
+        if c == "1": notice_board(player); ask("Enter...")
+        elif c == "2": shop_menu(player); ask("Enter...")
+        elif c == "3": alchemy_menu(player); ask("Enter...")
         elif c == "4": 
-            sub = input("1. คุยกับ NPC  2. เดินสำรวจ: ")
+            sub = ask("1. คุยกับ NPC  2. เดินสำรวจ: ")
             if sub == "1": talk_to_npc(player)
             else: explore_town(player)
-            input("Enter...")
+            ask("Enter...")
         elif c == "5": in_town = False
-        elif c == "6": save_game(player); input("Enter...")
+        elif c == "6": save_game(player); ask("Enter...")
 
 # --- Feature: Inventory & Stats Menu ---
 def inventory_menu(player):
     print_separator()
-    print(f"{Colors.BOLD}--- INVENTORY & STATS ---{Colors.END}")
-    print(f"Name: {player.name} | School: {player.school} | Level: {player.level}")
-    print(f"HP: {player.hp}/{player.max_hp} | Base DMG: {player.base_dmg} | Crit: {player.crit_chance}%")
-    print(f"Gold: {player.gold}")
-    print(f"\nInventory: {player.inventory}")
+    say(f"{Colors.BOLD}--- INVENTORY & STATS ---{Colors.END}")
+    say(f"Name: {player.name} | School: {player.school} | Level: {player.level}")
+    say(f"HP: {player.hp}/{player.max_hp} | Base DMG: {player.base_dmg} | Crit: {player.crit_chance}%")
+    say(f"Gold: {player.gold}")
+    say(f"\nInventory: {player.inventory}")
     
-    print("\n[ดื่มยาเตรียมตัวก่อนสู้ได้ที่นี่]")
-    use = input("พิมพ์ชื่อยา (Swallow/Thunderbolt) หรือ Enter เพื่อออก: ")
+    say("\n[ดื่มยาเตรียมตัวก่อนสู้ได้ที่นี่]")
+    use = ask("พิมพ์ชื่อยา (Swallow/Thunderbolt) หรือ Enter เพื่อออก: ")
     
     if use in player.inventory:
         if use == "Swallow":
             player.inventory.remove(use)
             player.heal(30)
-            print("ดื่ม Swallow แล้ว HP ฟื้นฟู")
+            say("ดื่ม Swallow แล้ว HP ฟื้นฟู")
         elif use == "Thunderbolt":
             player.inventory.remove(use)
             player.temp_buff = 10
-            print(f"{Colors.GREEN}ดื่ม Thunderbolt แล้ว! (ดาเมจจะ +10 ในการต่อสู้ครั้งถัดไป){Colors.END}")
+            say(f"{Colors.GREEN}ดื่ม Thunderbolt แล้ว! (ดาเมจจะ +10 ในการต่อสู้ครั้งถัดไป){Colors.END}")
         else:
-            print("ไอเทมนี้ใช้ที่นี่ไม่ได้")
+            say("ไอเทมนี้ใช้ที่นี่ไม่ได้")
     elif use != "":
-        print("ไม่มีไอเทมนั้น")
+        say("ไม่มีไอเทมนั้น")
 
 # --- Main Loop ---
 def main_menu():
     clear_screen()
-    print(f"{Colors.BOLD}=== THE WITCHER: PATH OF DESTINY ==={Colors.END}")
-    print("1. New Game")
-    print("2. Load Game")
-    print("3. Exit")
+    say(f"{Colors.BOLD}=== THE WITCHER: PATH OF DESTINY ==={Colors.END}")
+    say("1. New Game")
+    say("2. Load Game")
+    say("3. Exit")
     
-    choice = input("Select: ")
+    choice = ask("Select: ")
     if choice == "2":
         loaded = load_game()
         if loaded:
-            print(f"โหลดเซฟสำเร็จ! {loaded.name}")
-            time.sleep(1)
+            say(f"โหลดเซฟสำเร็จ! {loaded.name}")
+            pause(1)
             return loaded
         else:
-            input("Enter เพื่อเริ่มเกมใหม่...")
+            ask("Enter เพื่อเริ่มเกมใหม่...")
             
     if choice == "3": sys.exit()
     
     # New Game Creation
     clear_screen()
-    name = input("ตั้งชื่อ : ")
-    print("\nเลือกสำนัก (School):")
-    print("1. Wolf (สมดุล) - Geralt's choice")
-    print("2. Griffin (เวทมนตร์)")
-    print("3. Bear (ถึกทน)")
-    print("4. Cat (โจมตีแรง ตัวบาง)")
-    print("5. Viper (พิษ/คริติคอล)")
-    print("6. Lynx (คล่องแคล่วกึ่งสมดุล)")
+    name = ask("ตั้งชื่อ : ")
+    say("\nเลือกสำนัก (School):")
+    say("1. Wolf (สมดุล) - Geralt's choice")
+    say("2. Griffin (เวทมนตร์)")
+    say("3. Bear (ถึกทน)")
+    say("4. Cat (โจมตีแรง ตัวบาง)")
+    say("5. Viper (พิษ/คริติคอล)")
+    say("6. Lynx (คล่องแคล่วกึ่งสมดุล)")
     
     s_map = {"1":"Wolf", "2":"Griffin", "3":"Bear", "4":"Cat", "5":"Viper", "6":"Lynx"}
-    school = s_map.get(input("เลือก (1-6): "), "Wolf")
+    school = s_map.get(ask("เลือก (1-6): "), "Wolf")
     return Witcher(name, school)
 
-def game_loop():
-    player = main_menu()
-    
-    battles = 0
-    conjunction = False
+def game_loop(world=None):
+    if world is None:
+        world = World()
+    if world.player is None:
+        world.player = main_menu()
+    player = world.player
     
     while True:
+        checkpoint(world)
         clear_screen()
-        if battles >= 5 and not conjunction:
-            conjunction = True
-            print(f"{Colors.RED}!!! SECOND CONJUNCTION !!!{Colors.END}")
-            print("มิติวิปริต... มอนสเตอร์แข็งแกร่งขึ้น!")
-            input("กด Enter...")
-
-        print(f"\n--- WILDERNESS ---")
-        print("1. เข้าเมือง (Novigrad)")
-        print("2. ออกล่า (Hunt Monster)")
-        print("3. นั่งสมาธิ (Heal)")
-        print("4. บันทึกเกม")
-        print("5. เช็คกระเป๋า (Inventory)")
-        print("6. ออกจากเกม")
+        if world.battles >= 5 and not world.conjunction:
+            world.conjunction = True
+            say(f"{Colors.RED}!!! SECOND CONJUNCTION !!!{Colors.END}")
+            say("มิติวิปริต... มอนสเตอร์แข็งแกร่งขึ้น!")
+            ask("กด Enter...")
+
+        say(f"\n--- WILDERNESS ---")
+        say("1. เข้าเมือง (Novigrad)")
+        say("2. ออกล่า (Hunt Monster)")
+        say("3. นั่งสมาธิ (Heal)")
+        say("4. บันทึกเกม")
+        say("5. เช็คกระเป๋า (Inventory)")
+        say("6. ออกจากเกม")
         
-        act = input("เลือก: ")
+        act = ask("เลือก: ")
         
         if act == "1":
             town_hub(player)
             
         elif act == "2":
-            monsters = get_monsters(conjunction)
-            possible = list(monsters.keys())
-            if player.active_quests:
-                possible.extend(player.active_quests * 3) 
-            
-            target = random.choice(possible)
-            victory = combat(player, target, conjunction)
+            target = pick_encounter(player, world.conjunction, world.region)
+            victory = combat(player, target, world.conjunction)
             if victory:
-                battles += 1
+                world.battles += 1
             else:
-                print("GAME OVER")
+                say("GAME OVER")
                 break
                 
         elif act == "3":
-            print("นั่งสมาธิข้างกองไฟ...")
+            say("นั่งสมาธิข้างกองไฟ...")
             player.hp = player.max_hp
-            print("HP เต็มแล้ว")
-            input("Enter...")
+            say("HP เต็มแล้ว")
+            ask("Enter...")
             
         elif act == "4":
             save_game(player)
-            input("Enter...")
+            ask("Enter...")
 
         elif act == "5":
             inventory_menu(player)
-            input("Enter...")
+            ask("Enter...")
             
         elif act == "6":
             break
+    return world
+
+def play(seed=None, journal_path=JOURNAL_FILE, autosave=AUTOSAVE_ENABLED):
+    """เริ่มเซสชันใหม่ด้วย RNG ของตัวเอง และบันทึก journal ของทุกคำตอบ"""
+    rng = use_rng(SessionRNG(seed))
+    journal = use_journal(Journal(rng.seed, journal_path))
+    use_driver(RecordingDriver(get_driver(), journal))
+    saver = use_autosaver(Autosaver(write_save) if autosave else None)
+    try:
+        return game_loop()
+    finally:
+        if saver is not None:
+            saver.flush()  # ออกจากเกมหรือหลุดกลางคัน: เขียน autosave ที่ค้างให้เสร็จ
+        journal.close()
+
+def resume_play(journal, autosave=AUTOSAVE_ENABLED):
+    """เล่นต่อจาก journal ที่พักไว้ (เซสชันที่ server.py พักลงดิสก์) ด้วยไดรเวอร์ปัจจุบัน"""
+    live = get_driver()
+    saver = use_autosaver(Autosaver(write_save) if autosave else None)
+    try:
+        return resume(journal, game_loop, World.from_dict, World, live)
+    finally:
+        if saver is not None:
+            saver.flush()
+        journal.close()
+
+def replay_journal(journal):
+    """สร้าง World ขึ้นใหม่จาก journal โดยเล่นซ้ำแบบ headless"""
+    def run(world):
+        use_autosaver(None)  # เล่นซ้ำต้องไม่ทับเซฟจริง
+        return game_loop(world)
+    return replay(journal, run, World.from_dict, World)
 
 if __name__ == "__main__":
-    game_loop()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="The Witcher: Path of Destiny")
+    parser.add_argument("--seed", type=int, default=None, help="seed ของ RNG ประจำเซสชัน")
+    parser.add_argument("--replay", metavar="JOURNAL", help="เล่น journal ซ้ำแล้วแสดงสถานะสุดท้าย")
+    args = parser.parse_args()
+    if args.replay:
+        world = replay_journal(Journal.load(args.replay))
+        say(json.dumps(world.to_dict() if world.player else {}, ensure_ascii=False, indent=4))
+    else:
+        play(args.seed)
\ No newline at end of file